@@ -10,6 +10,73 @@ import Mesh
 import PartDesign
 import Part
 import os
+from gear_params import DEFAULTS
+from workspace import PART_FILES
+
+# This class keeps every gear template document open once per process and
+# resets it between jobs, so a FreeCAD worker never reparses or piles up documents
+class Template_registry():
+
+    # Constructor of the registry which starts without any open template
+    # on_recompute is called with the name of the template just before FreeCAD recomputes it
+    def __init__(self):
+        self.documents = {}
+        self.snapshot = {}
+        self.applied = {}
+        self.pending = {}
+        self.on_recompute = None
+
+    # This function opens a template the first time it is used and starts a new job on it
+    # file:     Path of the .FCStd template (type: string)
+    # filedoc:  Name of the Gear File (type: string)
+    # Returns the FreeCAD document of the template
+    def open(self, file, filedoc):
+        if filedoc not in self.documents:
+            self.documents[filedoc] = FreeCAD.openDocument(file)
+            self.snapshot[filedoc] = {}
+            self.applied[filedoc] = {}
+        FreeCAD.setActiveDocument(filedoc)
+        self.pending[filedoc] = {}
+        return self.documents[filedoc]
+
+    # This function stages a property value for the current job
+    # The value of the template is saved the first time a property is staged so it can be restored
+    # filedoc:  Name of the Gear File (type: string)
+    # fileobj:  Name of Gear Part in FreeCAD (type: string)
+    # prop:     Name of the property (type: string)
+    # value:    New value of the property
+    # Returns nothing
+    def set(self, filedoc, fileobj, prop, value):
+        key = (fileobj, prop)
+        if key not in self.snapshot[filedoc]:
+            self.snapshot[filedoc][key] = getattr(self.documents[filedoc].getObject(fileobj), prop)
+            self.applied[filedoc][key] = self.snapshot[filedoc][key]
+        self.pending[filedoc][key] = value
+
+    # This function applies the staged values of the job and restores every other property
+    # to the template value, then recomputes only if any property really changed
+    # filedoc:  Name of the Gear File (type: string)
+    # Returns nothing
+    def recompute(self, filedoc):
+        document = self.documents[filedoc]
+        changed = False
+        for key, original in self.snapshot[filedoc].items():
+            value = self.pending[filedoc].get(key, original)
+            applied = self.applied[filedoc][key]
+            # FreeCAD quantities are not compared against the strings used to set them
+            if type(applied) is not type(value) or applied != value:
+                fileobj, prop = key
+                setattr(document.getObject(fileobj), prop, value)
+                self.applied[filedoc][key] = value
+                changed = True
+        self.pending[filedoc] = {}
+        if self.on_recompute:
+            self.on_recompute(filedoc)
+        if changed:
+            document.recompute()
+
+# Templates opened by this process
+templates = Template_registry()
 
 # This class contains parameters and functions to generate and export a Base Gear
 class Gear_initial():
@@ -21,11 +88,12 @@ class Gear_initial():
         self.num_teeth = kwargs.get("num_teeth")
         self.pitch_dia = kwargs.get("pitch_dia")
         self.hole_dia = kwargs.get("hole_dia")
-        self.angle_teeth = kwargs.get("angle_teeth", 0)
-        self.pressure_angle = kwargs.get("pressure_angle", 20)
-        self.clearance = kwargs.get("clearance", 0.12)
-        self.double_helix = kwargs.get("double_helix", False)
+        self.angle_teeth = kwargs.get("angle_teeth", DEFAULTS["angle_teeth"])
+        self.pressure_angle = kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])
+        self.clearance = kwargs.get("clearance", DEFAULTS["clearance"])
+        self.double_helix = kwargs.get("double_helix", DEFAULTS["double_helix"])
         self.ID = kwargs.get("ID")
+        self.output_dir = kwargs.get("output_dir") or PART_FILES
     
     # This function performs and computes Model modification of Base Gear
     # filedoc:  Name of the Gear File (type: string) 
@@ -33,14 +101,13 @@ class Gear_initial():
     # kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
     # Returns nothing  
     def Model_Modification(self, filedoc, fileobj, **kwargs):
-        FreeCAD.getDocument(filedoc).getObject(fileobj).height = '{} mm'.format(self.height)
-        FreeCAD.getDocument(filedoc).getObject(fileobj).teeth = self.num_teeth
-        FreeCAD.getDocument(filedoc).getObject(fileobj).beta = '{} deg'.format(self.angle_teeth)
-        FreeCAD.getDocument(filedoc).getObject(fileobj).module  = '{} mm'.format(self.pitch_dia / self.num_teeth)
-        FreeCAD.getDocument(filedoc).getObject('Cylinder').Radius = '{} mm'.format(self.hole_dia /2)
-        FreeCAD.getDocument(filedoc).getObject('Cylinder').Height = '{} mm'.format(self.height + 1)
-        FreeCAD.getDocument(filedoc).getObject(fileobj).clearance = self.clearance 
-        FreeCAD.ActiveDocument.recompute()
+        templates.set(filedoc, fileobj, 'height', '{} mm'.format(self.height))
+        templates.set(filedoc, fileobj, 'teeth', self.num_teeth)
+        templates.set(filedoc, fileobj, 'beta', '{} deg'.format(self.angle_teeth))
+        templates.set(filedoc, fileobj, 'module', '{} mm'.format(self.pitch_dia / self.num_teeth))
+        templates.set(filedoc, 'Cylinder', 'Radius', '{} mm'.format(self.hole_dia /2))
+        templates.set(filedoc, 'Cylinder', 'Height', '{} mm'.format(self.height + 1))
+        templates.set(filedoc, fileobj, 'clearance', self.clearance)
 
     # This function finds the gears that are to be edited according to  
     # the method chosen and executes the model modification function
@@ -49,7 +116,7 @@ class Gear_initial():
     # Returns nothing
     # Raises a Value Error if gear type is not chosen correctly
     def GearMod(self, gear_mod: str, **kwargs):
-        directory = os.path.join(os.path.dirname(__file__), 'Part_files\\')
+        directory = PART_FILES
         if gear_mod == "rack":
             partname = 'Rack_Gear' + '.FCStd'
             filedoc = "Rack_Gear"
@@ -73,20 +140,20 @@ class Gear_initial():
             
         file = os.path.join(directory, partname)
 
-        # Opening the gear file and modifying it
-        FreeCAD.openDocument(file)
+        # Opening the gear file once per process and modifying it
+        templates.open(file, filedoc)
         self.Model_Modification(filedoc, fileobj, **kwargs)
 
-    # This function exports the Gear file that was generated as an .stl
+    # This function recomputes and exports the Gear file that was generated as an .stl
+    # The .stl is written to the output directory of the job, Part_files by default
     # filedoc:      Name of the Gear File (type: string) 
     # nameoffile:   Name of the saved generated .stl file (type:string)
     # Returns nothing
     def Export_Gear(self, filedoc, nameoffile):
+        templates.recompute(filedoc)
         Gear=[]
         Gear.append(FreeCAD.getDocument(filedoc).getObject("Cut"))
-        direcetory = os.path.dirname(__file__)
-        filedir = os.path.join(direcetory, 'Part_files\\')
-        Mesh.export(Gear, filedir + nameoffile + ".stl")
+        Mesh.export(Gear, os.path.join(self.output_dir, nameoffile + ".stl"))
         del Gear
    
    # This function contains general paramters of base gear in dictionary
@@ -124,8 +191,10 @@ class Gear_angle(Gear_initial):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # Helix Gear Attributes
+        # Helix Gear Attributes, a negative helix angle gives teeth of the other hand
         self.double_helix = False
+        if kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"]):
+            self.angle_teeth = -self.angle_teeth
 
         self.GearMod(gear_mod="helix", **self.getParameters())
         super().Export_Gear('Involute_Gear', self.ID)
@@ -139,8 +208,10 @@ class Gear_double_helix(Gear_initial):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # Double Helix Gear Attributes
+        # Double Helix Gear Attributes, a negative helix angle gives teeth of the other hand
         self.double_helix = True
+        if kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"]):
+            self.angle_teeth = -self.angle_teeth
 
         self.Gear_Mod_(**self.getParameters())
 
@@ -150,8 +221,7 @@ class Gear_double_helix(Gear_initial):
     # Returns nothing
     def Gear_Mod_(self, **kwargs):
         self.GearMod(gear_mod="double_helix", **kwargs)
-        FreeCAD.getDocument('Involute_Gear').getObject('involutegear').double_helix = kwargs.get("double_helix")
-        FreeCAD.ActiveDocument.recompute()
+        templates.set('Involute_Gear', 'involutegear', 'double_helix', kwargs.get("double_helix"))
         super().Export_Gear('Involute_Gear', self.ID)
 
 # This class contains parameters and functions to generate and export a Bevel Gear
@@ -167,8 +237,8 @@ class Gear_bevel(Gear_initial):
         # Bevel Gear Attributes
         self.reset_origin = True
         self.double_helix = False
-        self.pitch_angle = kwargs.get("pitch_angle", 45)
-        self.backlash = kwargs.get("backlash",0)
+        self.pitch_angle = kwargs.get("pitch_angle", DEFAULTS["pitch_angle"])
+        self.backlash = kwargs.get("backlash", DEFAULTS["backlash"])
 
         self.Gear_Mod_(**self.getParameters())
     
@@ -187,10 +257,9 @@ class Gear_bevel(Gear_initial):
     # Returns nothing
     def Gear_Mod_(self, **kwargs):
         self.GearMod(gear_mod="bevel",**kwargs)
-        FreeCAD.getDocument('Bevel_Gear').getObject('bevelgear').backlash = '{} mm'.format(kwargs.get("backlash"))
-        FreeCAD.getDocument('Bevel_Gear').getObject('bevelgear').reset_origin = kwargs.get("reset_origin")
-        FreeCAD.getDocument('Bevel_Gear').getObject('bevelgear').pitch_angle = '{} deg'.format(kwargs.get("pitch_angle"))
-        FreeCAD.ActiveDocument.recompute()
+        templates.set('Bevel_Gear', 'bevelgear', 'backlash', '{} mm'.format(kwargs.get("backlash")))
+        templates.set('Bevel_Gear', 'bevelgear', 'reset_origin', kwargs.get("reset_origin"))
+        templates.set('Bevel_Gear', 'bevelgear', 'pitch_angle', '{} deg'.format(kwargs.get("pitch_angle")))
         super().Export_Gear('Bevel_Gear', self.ID)
 
 # This class contains parameters and functions to generate and export a Worm Gear
@@ -204,7 +273,7 @@ class Gear_worm(Gear_initial):
         super().__init__(**kwargs)
 
         # Worm Gear Attributes
-        self.reverse_pitch = kwargs.get("reverse_pitch", False)
+        self.reverse_pitch = kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"])
         self.double_helix = False
 
         self.Gear_Mod_(**self.getParameters())
@@ -224,9 +293,8 @@ class Gear_worm(Gear_initial):
     # Returns nothing
     def Gear_Mod_(self, **kwargs):
         self.GearMod(gear_mod="worm", **kwargs)
-        FreeCAD.getDocument('Worm_Gear').getObject('wormgear').reverse_pitch = kwargs.get("reverse_pitch")
-        FreeCAD.getDocument('Worm_Gear').getObject('wormgear').diameter = '{} mm'.format(kwargs.get("pitch_dia"))
-        FreeCAD.ActiveDocument.recompute()
+        templates.set('Worm_Gear', 'wormgear', 'reverse_pitch', kwargs.get("reverse_pitch"))
+        templates.set('Worm_Gear', 'wormgear', 'diameter', '{} mm'.format(kwargs.get("pitch_dia")))
         super().Export_Gear('Worm_Gear', self.ID)
 
 # This class contains parameters and functions to generate and export a Rack Gear
@@ -240,11 +308,11 @@ class Gear_rack(Gear_initial):
         super().__init__(**kwargs)
 
         #   Rack Gear Attributes
-        self.add_ending = kwargs.get("add_endings", False)
-        self.simp = kwargs.get("simplified", False)
-        self.double_helix = kwargs.get("double_helix", False)
-        self.thickness = kwargs.get("thickness", 5)
-        self.head = kwargs.get("head", 0)
+        self.add_ending = kwargs.get("add_endings", DEFAULTS["add_endings"])
+        self.simp = kwargs.get("simplified", DEFAULTS["simplified"])
+        self.double_helix = kwargs.get("double_helix", DEFAULTS["double_helix"])
+        self.thickness = kwargs.get("thickness", DEFAULTS["thickness"])
+        self.head = kwargs.get("head", DEFAULTS["head"])
 
         self.Gear_Mod_(**self.getParameters())
     
@@ -264,18 +332,17 @@ class Gear_rack(Gear_initial):
     # kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
     # Returns nothing 
     def Model_Modification(self, filedoc, fileobj, **kwargs):
-        directory = os.path.join(os.path.dirname(__file__), 'Part_files\\')
+        directory = PART_FILES
         partname = 'Rack_Gear' + '.FCStd'
         file = os.path.join(directory, partname)
 
-        #   Getting the file
-        FreeCAD.openDocument(file)
-        FreeCAD.getDocument(filedoc).getObject(fileobj).height = '{} mm'.format(kwargs.get("height"))
-        FreeCAD.getDocument(filedoc).getObject(fileobj).teeth = kwargs.get("num_teeth")
-        FreeCAD.getDocument(filedoc).getObject(fileobj).beta = '{} deg'.format(kwargs.get("angle_teeth"))
-        FreeCAD.getDocument(filedoc).getObject(fileobj).module  = '{} mm'.format(kwargs.get('pitch_dia') / kwargs.get("num_teeth"))#* math.cos(kwargs.get('angle_teeth')))
-        FreeCAD.getDocument(filedoc).getObject(fileobj).clearance = kwargs.get("clearance")
-        FreeCAD.ActiveDocument.recompute()
+        #   Getting the file once per process
+        templates.open(file, filedoc)
+        templates.set(filedoc, fileobj, 'height', '{} mm'.format(kwargs.get("height")))
+        templates.set(filedoc, fileobj, 'teeth', kwargs.get("num_teeth"))
+        templates.set(filedoc, fileobj, 'beta', '{} deg'.format(kwargs.get("angle_teeth")))
+        templates.set(filedoc, fileobj, 'module', '{} mm'.format(kwargs.get('pitch_dia') / kwargs.get("num_teeth")))#* math.cos(kwargs.get('angle_teeth')))
+        templates.set(filedoc, fileobj, 'clearance', kwargs.get("clearance"))
     
     # This function calls the Gear modification method from base class and applies changes
     # then applies Rack gear specific changes and exports the generated gear with name as ID
@@ -283,23 +350,22 @@ class Gear_rack(Gear_initial):
     # Returns nothing
     def Gear_Mod_(self, **kwargs):
         self.Model_Modification("Rack_Gear", 'involuterack', **kwargs)
-        FreeCAD.getDocument('Rack_Gear').getObject('involuterack').head = kwargs.get("head")
-        FreeCAD.getDocument('Rack_Gear').getObject('involuterack').thickness = '{} mm'.format(kwargs.get("thickness"))
-        FreeCAD.getDocument('Rack_Gear').getObject('involuterack').add_endings = kwargs.get("add_endings")
-        FreeCAD.getDocument('Rack_Gear').getObject('involuterack').double_helix = kwargs.get("double_helix")
-        FreeCAD.getDocument('Rack_Gear').getObject('involuterack').simplified = kwargs.get("simplified")
-        FreeCAD.ActiveDocument.recompute()
-        self.Export_Gear('Rack_Gear', "Rack", self.ID)
+        templates.set('Rack_Gear', 'involuterack', 'head', kwargs.get("head"))
+        templates.set('Rack_Gear', 'involuterack', 'thickness', '{} mm'.format(kwargs.get("thickness")))
+        templates.set('Rack_Gear', 'involuterack', 'add_endings', kwargs.get("add_endings"))
+        templates.set('Rack_Gear', 'involuterack', 'double_helix', kwargs.get("double_helix"))
+        templates.set('Rack_Gear', 'involuterack', 'simplified', kwargs.get("simplified"))
+        self.Export_Gear('Rack_Gear', self.ID)
 
     # As this model does not have any hole
-    # This function exports the Rack Gear file that was generated as an .stl
+    # This function recomputes and exports the Rack Gear file that was generated as an .stl
+    # The .stl is written to the output directory of the job, Part_files by default
     # filedoc:      Name of the Gear File (type: string) 
     # nameoffile:   Name of the saved generated .stl file (type:string)
     # Returns nothing
     def Export_Gear(self, filedoc, nameoffile):
+        templates.recompute(filedoc)
         Gear=[]
         Gear.append(FreeCAD.getDocument(filedoc).getObject("Body"))
-        directory = os.path.dirname(__file__)
-        filedir = os.path.join(directory, 'Part_files\\')
-        Mesh.export(Gear, filedir + nameoffile + ".stl")
+        Mesh.export(Gear, os.path.join(self.output_dir, nameoffile + ".stl"))
         del Gear
\ No newline at end of file
@@ -7,16 +7,19 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 import Gear_types
+from gear_params import TEMPLATES
+from workspace import PART_FILES
 import json
+import time
+
+# Prefix of the result lines written in worker mode (see worker_pool.py)
+RESULT_PREFIX = "GEARJOB "
 
 # This function selects Gear Types and calling their respective Gear Generation method
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
 # Returns nothing
 # Raises ValueError when Gear type is not defined
-def main():
-
-    # Json values are loaded and gear type is chosen
-    inp = sys.stdin.read()
-    my_kwargs = json.loads(inp)
+def generate(my_kwargs):
     gear_type = my_kwargs.get("gear_type")
 
     # Gear generation method is selected according to method chosen by user
@@ -24,7 +27,7 @@ def main():
         raise ValueError(f"Gear Type not defined. {my_kwargs}")
     elif gear_type == "spur":
         Gear_types.Gear_involute(**my_kwargs)
-    elif gear_type == "helix": 
+    elif gear_type == "helix":
         Gear_types.Gear_angle(**my_kwargs)
     elif gear_type == "double_helix":
         Gear_types.Gear_double_helix(**my_kwargs)
@@ -33,7 +36,93 @@ def main():
     elif gear_type == "worm":
         Gear_types.Gear_worm(**my_kwargs)
     elif gear_type == "rack":
-        Gear_types.Gear_rack(**my_kwargs)  
+        Gear_types.Gear_rack(**my_kwargs)
+
+# This function reads the gears to generate from stdin
+# The input is a single json object, a json array of objects or one json object per line
+# Returns the gear parameters (type: dict) or a list of them for a batch
+def read_input():
+    inp = sys.stdin.read()
+    try:
+        return json.loads(inp)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in inp.splitlines() if line.strip()]
+
+# This function generates a single gear, or every gear of a batch, from the json read on stdin
+# Returns nothing
+def main():
+
+    # Json values are loaded and gear type is chosen
+    my_kwargs = read_input()
+    if isinstance(my_kwargs, list):
+        run_batch(my_kwargs)
+    else:
+        generate(my_kwargs)
+
+# This function writes one result line for the worker pool or a batch
+# result:   Result of a job or command (type: dict)
+# Returns nothing
+def reply(result):
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+# This function generates a batch of gears in this FreeCAD session
+# Gears are grouped by template so each template is modified by consecutive jobs,
+# and one result line is written per gear as soon as it is done
+# specs:    List of gear parameters (type: list of dict)
+# Returns nothing
+def run_batch(specs):
+    order = sorted(range(len(specs)), key=lambda index: TEMPLATES.get(specs[index].get("gear_type"), ""))
+    for index in order:
+        spec = specs[index]
+        start = time.time()
+        result = {"index": index, "ID": spec.get("ID"),
+            "path": os.path.join(spec.get("output_dir") or PART_FILES, f"{spec.get('ID')}.stl")}
+        try:
+            generate(spec)
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["time"] = time.time() - start
+        reply(result)
+
+# This function keeps FreeCAD running and generates one gear per json line read on stdin
+# The commands "ping" and "exit" are used by the worker pool for health checks and shutdown
+# Replies with an "event" key report the progress of a job before its result
+# Returns nothing
+def serve():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        # A line which is not a json object is answered with an error result, like a failed job,
+        # so the worker keeps running and the pool still gets one reply per line
+        start = time.time()
+        job = {}
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("A job is a json object")
+            job = message
+            command = job.get("command")
+            if command == "ping":
+                reply({"status": "pong"})
+                continue
+            elif command == "exit":
+                break
+
+            # Progress of the job is written as event lines before its result
+            Gear_types.templates.on_recompute = lambda filedoc: reply({"event": "recompute_started",
+                "ID": job.get("ID"), "template": filedoc})
+            generate(job)
+            reply({"ID": job.get("ID"), "status": "ok", "time": time.time() - start})
+        except Exception as e:
+            reply({"ID": job.get("ID"), "status": "error", "error": f"{type(e).__name__}: {e}",
+                "time": time.time() - start})
 
-# This line runs the main function
-main()
\ No newline at end of file
+# This line runs the worker loop when started by the worker pool, else the main function
+if os.environ.get("GEAR_WORKER"):
+    serve()
+else:
+    main()
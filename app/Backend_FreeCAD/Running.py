@@ -5,21 +5,64 @@
 
 import sys, json
 import subprocess
-import os, decimal
+import os, decimal, time
+sys.path.append(os.path.dirname(__file__))
+from worker_pool import WorkerPool, RESULT_PREFIX
+from gear_params import DEFAULTS, gear_id, normalize, WHEEL_SUFFIX, WORM_WHEEL_STARTS
+from workspace import Workspace, PART_FILES
+from artifact_cache import stl_info
+
+# Size of the FreeCAD worker pool, 0 launches FreeCADCmd once per gear instead
+POOL_SIZE = int(os.environ.get("FREECAD_POOL_SIZE", 2))
+
+# Number of gears a worker generates before it is replaced by a fresh one
+POOL_MAX_JOBS = int(os.environ.get("FREECAD_POOL_MAX_JOBS", 100))
+
+# Seconds a single gear may take before its worker is killed
+POOL_TIMEOUT = float(os.environ.get("FREECAD_POOL_TIMEOUT", 300))
+
+# Seconds between two pings of the idle workers, 0 turns the health checks off
+POOL_HEALTH_INTERVAL = float(os.environ.get("FREECAD_POOL_HEALTH_INTERVAL", 60))
+
+# Seconds a worker may take to answer a ping before it is replaced
+POOL_PING_TIMEOUT = float(os.environ.get("FREECAD_POOL_PING_TIMEOUT", 10))
+
+freecad = None
+pool = None
 # ---------------------------------------------------------------------------------
 # This little script will look for freecad so we don't have to manually code
 # in the path
+# Returns the path of FreeCADCmd.exe
+# Raises OSError when FreeCADCmd.exe can't be found
+def find_freecad():
+    global freecad
+    if freecad:
+        return freecad
+
+    for root, dir, files in os.walk(r"C:\Program Files"):
+        if "FreeCADCmd.exe" in files:
+            freecad = os.path.join(root, "FreeCADCmd.exe")
+            break
+
+    if freecad:
+        print(f"Found FreeCadCmd.exe at {freecad}")
+    else:
+        raise OSError("Can't find FreeCADCmd.exe")
+    return freecad
 
-for root, dir, files in os.walk(r"C:\Program Files"):
-      if "FreeCADCmd.exe" in files:
-         freecad = os.path.join(root, "FreeCADCmd.exe")
-         break
-         
-if freecad:
-    print(f"Found FreeCadCmd.exe at {freecad}")
-    
-else:
-    raise OSError("Can't find FreeCADCmd.exe")
+# This function starts the pool of warm FreeCAD workers on first use, with the health checks
+# of its idle workers
+# Returns the worker pool
+def get_pool():
+    global pool
+    if pool is None:
+        main_python_file = os.path.join(os.path.dirname(__file__), "Main.py")
+        env = dict(os.environ, GEAR_WORKER="1")
+        pool = WorkerPool([find_freecad(), main_python_file], size=POOL_SIZE,
+            max_jobs=POOL_MAX_JOBS, timeout=POOL_TIMEOUT, env=env)
+        if POOL_HEALTH_INTERVAL > 0:
+            pool.start_health_checks(POOL_HEALTH_INTERVAL, POOL_PING_TIMEOUT)
+    return pool
 # ---------------------------------------------------------------------------------
 # This function performs check of pitch diameter
 # my_kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
@@ -49,6 +92,14 @@ def check_angle_teeth(**my_kwargs):
     if not (5 <= angle_teeth <= 45):
         raise ValueError("Invalid Teeth angle. It should be between 5 to 45") 
 
+# This function performs check of the spiral angle of a bevel gear
+# my_kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
+# Raises a Value Error when the angle is neither 0 (straight bevel) nor between 5 and 45 degrees (spiral bevel)
+def check_spiral_angle(**my_kwargs):
+    angle_teeth = int(my_kwargs.get("angle_teeth") or DEFAULTS["angle_teeth"])
+    if angle_teeth != 0 and not (5 <= angle_teeth <= 45):
+        raise ValueError("Invalid Teeth angle. It should be 0 for a straight bevel or between 5 to 45")
+
 # This function performs a check of height
 # my_kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
 # Raises a Value Error when height is not between 5 and 100
@@ -75,15 +126,24 @@ def check_wormheight(**my_kwargs):
     if height < decimal.Decimal(4.5)*decimal.Decimal(my_kwargs.get("pitch_dia"))*decimal.Decimal(3.14)/decimal.Decimal(my_kwargs.get("num_teeth")):
         raise ValueError("Invalid Height")
 
-# This function selects Gear Types and calling their respective Gear Generation method
-# Returns nothing
-# Raises ValueError when Gear type is not defined
-def main(my_kwargs):
+# This function performs check of the number of teeth of the worm wheel made with a worm
+# my_kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
+# Raises a Value Error when wheel teeth is neither 0 (no wheel) nor between 10 and 100, or the worm
+# has too few starts for a wheel
+def check_wheel_teeth(**my_kwargs):
+    wheel_teeth = int(my_kwargs.get("wheel_teeth") or 0)
+    if wheel_teeth and not (10 <= wheel_teeth <= 100):
+        raise ValueError("Invalid Number of Wheel Teeth. It should be 0 or between 10 to 100")
+    if wheel_teeth and int(my_kwargs.get("num_teeth")) < WORM_WHEEL_STARTS:
+        raise ValueError(f"Invalid Number of Wheel Teeth. A worm wheel needs a worm of {WORM_WHEEL_STARTS} starts or more")
 
-    # Json values are loaded and gear type is chosen
+# This function runs every check of the gear type chosen by the user
+# my_kwargs:   Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns nothing
+# Raises ValueError when Gear type is not defined or a parameter is invalid
+def validate(my_kwargs):
     gear_type = my_kwargs.get("gear_type")
 
-    # Gear generation method is selected according to method chosen by user
     if not gear_type:
         raise ValueError(f"Gear Type not defined. {my_kwargs}")
     check_num_teeth(**my_kwargs)
@@ -95,10 +155,143 @@ def main(my_kwargs):
     elif gear_type == "double_helix":
         check_angle_teeth(**my_kwargs)
     elif gear_type == "bevel":
-        check_angle_teeth(**my_kwargs)
+        check_spiral_angle(**my_kwargs)
     elif gear_type == "worm":
         check_wormheight(**my_kwargs)
+        check_wheel_teeth(**my_kwargs)
+
+# This function selects Gear Types and calling their respective Gear Generation method
+# The gear is made in a scratch directory of its own and moved into Part_files once complete,
+# so jobs of the same gear never write the same file and readers never see half an .stl
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# progress:     Function called with the name and details of each stage of the job (type: function)
+# Returns the path of the .stl in Part_files
+# Raises ValueError when Gear type is not defined, RuntimeError when FreeCAD fails
+def main(my_kwargs, progress=None):
+    progress = progress or (lambda stage, **info: None)
+
+    # Gear parameters are checked before FreeCAD is used
+    validate(my_kwargs)
+
+    with Workspace() as workspace:
+        job = dict(my_kwargs, output_dir=workspace.path)
+
+        # Gears with a native generator skip FreeCAD when the fast backend is chosen
+        if normalize(my_kwargs)["backend"] == "native":
+            import native_gear
+            progress("recompute_started", backend="native")
+            native_gear.generate(job)
+
+        # Gear is generated by a warm worker, or by a new FreeCAD process when the pool is disabled
+        elif POOL_SIZE > 0:
+            result = get_pool().submit(job, on_event=lambda event: progress(event["event"],
+                backend="freecad", template=event.get("template")))
+            if result.get("status") != "ok":
+                raise RuntimeError(f"Gear generation failed: {result.get('error')}")
+        else:
+            main_python_file = os.path.join(os.path.dirname(__file__), "Main.py")
+            progress("recompute_started", backend="freecad")
+            completed = subprocess.run(rf'"{find_freecad()}" "{main_python_file}"', input=json.dumps(job).encode("utf-8") )
+            if completed.returncode != 0:
+                raise RuntimeError(f"Gear generation failed: FreeCAD exited with code {completed.returncode}")
+
+        path = workspace.publish(f"{my_kwargs.get('ID')}.stl", PART_FILES)
+        wheel = publish_wheel(workspace, my_kwargs.get('ID'))
+    progress("stl_exported", **stl_info(path))
+    if wheel:
+        progress("wheel_exported", **stl_info(wheel))
+    return path
+
+# This function publishes the worm wheel made with a worm, when there is one
+# workspace:    Workspace of the job (type: Workspace)
+# ID:           ID of the worm (type: string)
+# Returns the path of the .stl of the worm wheel in Part_files, or None
+def publish_wheel(workspace, ID):
+    name = f"{ID}{WHEEL_SUFFIX}.stl"
+    if not os.path.exists(workspace.file(name)):
+        return None
+    return workspace.publish(name, PART_FILES)
+
+# This function generates many gears in a single FreeCAD session
+# The whole batch is validated before FreeCAD is started, the gears are made in a scratch
+# directory and each one is moved into Part_files as soon as it is done
+# specs:        List of gear parameters, an ID is made for the gears without one (type: list of dict)
+# on_result:    Function called with the result of each gear as soon as it is done
+# Returns a list with the result (index, ID, path, status, time and error) of each gear
+# Raises ValueError listing every invalid gear of the batch
+def main_batch(specs, on_result=None):
+    specs = [dict(spec) for spec in specs]
+    errors = []
+    for index, spec in enumerate(specs):
+        try:
+            validate(spec)
+            spec.setdefault("ID", gear_id(spec))
+        except (ValueError, TypeError) as e:
+            errors.append(f"Gear {index}: {e}")
+    if errors:
+        raise ValueError("Invalid batch. " + "; ".join(errors))
+
+    results = []
+    with Workspace() as workspace:
+
+        # This function publishes the .stl of a finished gear and reports its result
+        # result:   Result of one gear (type: dict)
+        # Returns nothing
+        def finish(result):
+            if result["status"] == "ok":
+                try:
+                    result["path"] = workspace.publish(f"{result['ID']}.stl", PART_FILES)
+                    publish_wheel(workspace, result['ID'])
+                except OSError as e:
+                    result["status"] = "error"
+                    result["error"] = f"{type(e).__name__}: {e}"
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+        # Gears of the native backend are generated here, the others in one FreeCAD session
+        freecad_specs = []
+        for index, spec in enumerate(specs):
+            spec["output_dir"] = workspace.path
+            if normalize(spec)["backend"] != "native":
+                freecad_specs.append(dict(spec, index=index))
+                continue
+            import native_gear
+            start = time.time()
+            result = {"index": index, "ID": spec["ID"], "status": "ok"}
+            try:
+                native_gear.generate(spec)
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["time"] = time.time() - start
+            finish(result)
+
+        if freecad_specs:
+            main_python_file = os.path.join(os.path.dirname(__file__), "Main.py")
+            process = subprocess.Popen([find_freecad(), main_python_file], stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE, text=True)
+            process.stdin.write(json.dumps(freecad_specs))
+            process.stdin.close()
+
+            done = set()
+            for line in process.stdout:
+                if line.startswith(RESULT_PREFIX):
+                    result = json.loads(line[len(RESULT_PREFIX):])
+                    done.add(result["index"])
+                    result["index"] = freecad_specs[result["index"]]["index"]
+                    finish(result)
+            process.wait()
+
+            # Gears without a result were lost when FreeCAD stopped before making them
+            for index, spec in enumerate(freecad_specs):
+                if index not in done:
+                    finish({"index": spec["index"], "ID": spec["ID"], "status": "error",
+                        "error": f"FreeCAD exited with code {process.returncode} before the gear was made"})
+    return sorted(results, key=lambda result: result["index"])
 
-    sys.path.append(os.path.dirname(__file__))
-    main_python_file = os.path.join(os.path.dirname(__file__), "Main.py")
-    subprocess.run(rf'"{freecad}" "{main_python_file}"', input=json.dumps(my_kwargs).encode("utf-8") )
\ No newline at end of file
+# This lets the nightly catalogue run a batch from the command line:
+# python Running.py < catalogue.jsonl
+if __name__ == "__main__":
+    catalogue = [json.loads(line) for line in sys.stdin if line.strip()]
+    main_batch(catalogue, on_result=lambda result: print(json.dumps(result), flush=True))
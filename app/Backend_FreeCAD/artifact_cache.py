@@ -0,0 +1,94 @@
+# =============================================================================
+# File Name     : artifact_cache.py
+# Description   : This module keeps generated gears (.stl and preview .gifs)
+#                 addressed by their canonical parameters so they are made once
+# =============================================================================
+
+import os
+import struct
+import sys
+import threading
+sys.path.append(os.path.dirname(__file__))
+from gear_params import gear_id
+
+# Suffixes of the three preview .gifs of a gear
+PREVIEW_SUFFIXES = ["", "_side_1", "_side_2"]
+
+# This function reads the number of triangles and the size of an .stl file
+# Binary files give their triangle count in the header, text files are counted by facet
+# path: Path of the .stl file (type: string)
+# Returns a dictionary with the triangles and the size in bytes
+def stl_info(path):
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        header = file.read(84)
+        triangles = struct.unpack("<I", header[80:84])[0] if len(header) == 84 else 0
+        if size != 84 + 50 * triangles:
+            file.seek(0)
+            triangles = sum(line.lstrip().startswith(b"facet") for line in file)
+    return {"triangles": triangles, "size": size}
+
+# This class contains the functions to find already generated gears and count hits and misses
+class ArtifactCache:
+
+    # Constructor of the cache
+    # stl_dir:  Directory of the generated .stl files (type: string)
+    # gif_dir:  Directory of the served preview .gifs (type: string)
+    def __init__(self, stl_dir, gif_dir):
+        self.stl_dir = stl_dir
+        self.gif_dir = gif_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    # This function gets the path of the .stl of a gear
+    # ID:   ID of the gear (type: string)
+    # Returns the path as a string
+    def stl_path(self, ID):
+        return os.path.join(self.stl_dir, f"{ID}.stl")
+
+    # This function gets the path of the 2D outline of a gear
+    # ID:   ID of the gear (type: string)
+    # fmt:  File format of the outline, svg or dxf (type: string)
+    # Returns the path as a string
+    def outline_path(self, ID, fmt):
+        return os.path.join(self.stl_dir, f"{ID}.{fmt}")
+
+    # This function gets the paths of the preview .gifs of a gear
+    # ID:   ID of the gear (type: string)
+    # Returns a list of paths
+    def preview_paths(self, ID):
+        return [os.path.join(self.gif_dir, f"{ID}{suffix}.gif") for suffix in PREVIEW_SUFFIXES]
+
+    # This function checks if the .stl of a gear was already generated
+    # ID:   ID of the gear (type: string)
+    # Returns True if the .stl exists else False
+    def has_stl(self, ID):
+        return os.path.isfile(self.stl_path(ID))
+
+    # This function checks if all preview .gifs of a gear were already rendered
+    # ID:   ID of the gear (type: string)
+    # Returns True if every .gif exists else False
+    def has_previews(self, ID):
+        return all(os.path.isfile(path) for path in self.preview_paths(ID))
+
+    # This function looks up a gear by its full parameters and counts the hit or miss
+    # params:   Dictionary with elements containg numbers (real and integer) and boolean value
+    # Returns the ID of the gear and True if the .stl and previews already exist
+    def lookup(self, params):
+        ID = gear_id(params)
+        hit = self.has_stl(ID) and self.has_previews(ID)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return ID, hit
+
+    # This function gets the hit and miss counts of the cache
+    # Returns a dictionary with hits, misses and hit rate
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,119 @@
+# =============================================================================
+# File Name     : assembly.py
+# Description   : This module places the parts of a gear assembly and writes them
+#                 as one .stl, or as a .3mf with one object for each part
+# =============================================================================
+
+import math
+import os
+import sys
+import zipfile
+import numpy as np
+from stl import mesh
+sys.path.append(os.path.dirname(__file__))
+from native_gear import write_stl
+from workspace import PART_FILES, Workspace
+
+# File formats an assembly is written in
+ASSEMBLY_FORMATS = ("stl", "3mf")
+
+# Namespace of the 3D model of a .3mf
+MODEL_NAMESPACE = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+# Parts of a .3mf package besides the model
+CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>\n')
+RELATIONSHIPS = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>\n')
+
+# This function reads the triangles of a part from its .stl
+# path:     Path of the .stl file (type: string)
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+def read_part(path):
+    return mesh.Mesh.from_file(path).vectors.astype(float)
+
+# This function turns and moves the triangles of a part, the turn is about the z axis
+# triangles:    Triangles as a NumPy array of shape (triangles, 3, 3)
+# angle:        Turn in radians, counter clockwise (type: float)
+# offset:       Move in mm after the turn (type: tuple of 3 floats)
+# Returns the placed triangles as a new NumPy array
+def place(triangles, angle=0.0, offset=(0, 0, 0)):
+    cos, sin = math.cos(angle), math.sin(angle)
+    rotation = np.array([[cos, sin, 0], [-sin, cos, 0], [0, 0, 1]])
+    return triangles @ rotation + np.asarray(offset, dtype=float)
+
+# This function writes an assembly as one .stl with a copy of each part at every placement
+# parts:    Parts with their name, triangles and placements, a list of (angle, offset) (type: list of dict)
+# path:     Path of the .stl file (type: string)
+# Returns the path of the .stl file
+def to_stl(parts, path):
+    placed = [place(part["triangles"], angle, offset) for part in parts for angle, offset in part["placements"]]
+    write_stl(np.concatenate(placed), path)
+    return path
+
+# This function gets the 3D model of a .3mf: every part is a mesh object once, and a build item
+# places it with a transform for each of its placements
+# parts:    Parts with their name, triangles and placements (type: list of dict)
+# Returns the model as an XML string
+def model_xml(parts):
+    objects = []
+    items = []
+    for number, part in enumerate(parts, start=1):
+        points, faces = np.unique(np.round(part["triangles"], 6).reshape(-1, 3), axis=0, return_inverse=True)
+        faces = faces.reshape(-1, 3)
+        faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+        vertices = "".join('<vertex x="%.6g" y="%.6g" z="%.6g"/>' % tuple(point) for point in points)
+        triangles = "".join('<triangle v1="%d" v2="%d" v3="%d"/>' % tuple(face) for face in faces)
+        objects.append(f'<object id="{number}" name="{part["name"]}" type="model"><mesh>'
+            f'<vertices>{vertices}</vertices><triangles>{triangles}</triangles></mesh></object>')
+
+        # Row vectors are multiplied by the matrix, the last row is the move
+        for angle, offset in part["placements"]:
+            cos, sin = math.cos(angle), math.sin(angle)
+            matrix = [cos, sin, 0, -sin, cos, 0, 0, 0, 1] + [float(value) for value in offset]
+            transform = " ".join("%.6g" % value for value in matrix)
+            items.append(f'<item objectid="{number}" transform="{transform}"/>')
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<model unit="millimeter" xml:lang="en-US" '
+        f'xmlns="{MODEL_NAMESPACE}"><resources>{"".join(objects)}</resources>'
+        f'<build>{"".join(items)}</build></model>\n')
+
+# This function writes an assembly as a .3mf with one object for each part
+# parts:    Parts with their name, triangles and placements (type: list of dict)
+# path:     Path of the .3mf file (type: string)
+# Returns the path of the .3mf file
+def to_3mf(parts, path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", CONTENT_TYPES)
+        package.writestr("_rels/.rels", RELATIONSHIPS)
+        package.writestr("3D/3dmodel.model", model_xml(parts))
+    return path
+
+# This function writes an assembly to a file
+# parts:    Parts with their name, triangles and placements (type: list of dict)
+# fmt:      File format, stl or 3mf (type: string)
+# path:     Path of the file (type: string)
+# Returns the path of the file
+# Raises a Value Error when the format is not known
+def export(parts, fmt, path):
+    if fmt not in ASSEMBLY_FORMATS:
+        raise ValueError(f"Invalid assembly format {fmt}")
+    return (to_stl if fmt == "stl" else to_3mf)(parts, path)
+
+# This function writes an assembly in every format in a scratch directory and publishes the files
+# parts:        Parts with their name, triangles and placements (type: list of dict)
+# ID:           ID of the assembly, the files are <ID>.stl and <ID>.3mf (type: string)
+# directory:    Served directory, Part_files by default (type: string)
+# Returns the paths of the published files
+def publish(parts, ID, directory=PART_FILES):
+    paths = []
+    with Workspace() as workspace:
+        for fmt in ASSEMBLY_FORMATS:
+            export(parts, fmt, workspace.file(f"{ID}.{fmt}"))
+            paths.append(workspace.publish(f"{ID}.{fmt}", directory))
+    return paths
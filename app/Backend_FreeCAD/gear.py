@@ -5,6 +5,11 @@
 # =============================================================================
 
 import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+from gear_calc import calculate, teeth_number, COLUMNS
+from gear_mesh import analyse
 
 # This class contains the parameters and functions of Base Gear
 class Gear:
@@ -27,15 +32,24 @@ class Gear:
         self.hole_diameter = float(kwargs.get('hole_diameter'))
         self.gear_type = kwargs.get('gear_type')
     
+    # This function calculates every derived quantity of the gear at once with gear_calc
+    # The getters below work out their one quantity with plain arithmetic instead, which is much
+    # faster for a single gear
+    # other_gear: Mating gear, by default the gear itself (type: Gear)
+    # Returns a dictionary of the quantities as floats, 0 for the ones the parameters do not allow
+    def get_quantities(self, other_gear=None):
+        other_gear = other_gear or self
+        result = calculate(self.teeth_number, self.pitch_diameter, self.pressure_angle, self.clearance,
+            other_gear.teeth_number, other_gear.pitch_diameter)
+        values = {name: float(result[name]) for name in COLUMNS}
+        return {name: 0.0 if math.isnan(value) else value for name, value in values.items()}
+
     # This function computes and gets the module of Base Gear
-    # Returns module using pitch diameter and teeth number of gear as float
-    # Raises Exception if error encountered and returns 0
+    # Returns module using pitch diameter and teeth number of gear as float, 0 if there are no teeth
     def get_module(self):
-        try:
-            return float(self.pitch_diameter / self.teeth_number)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        if not self.teeth_number:
+            return 0.0
+        return self.pitch_diameter / self.teeth_number
         
         
     # This function gets addendum of Base gear
@@ -54,65 +68,43 @@ class InvoluteGear(Gear):
         super().__init__(**kwargs)
 
     # This function gets dedendum of spur gear
-    # Returns module*1.25 of the gear
-    # Raises Error if error encountered and returns 0
+    # Returns module*1.25 of the gear, 0 if there is none
     def get_dedendum(self):
-        try:
-            return self.get_module() * 1.25
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return self.get_module() * 1.25
     
     # This function gets tool depth of spur gear
-    # Returns module*2.25 of the gear
-    # Raises Error if error encountered and returns 0
+    # Returns module*2.25 of the gear, 0 if there is none
     def get_tooth_depth(self):
-        try:
-            return self.get_module() * 2.25 
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return self.get_module() * 2.25
 
     # This function gets tip diameter of spur gear
-    # Returns calculated tip diameter (float) of the gear
-    # Raises Error if error encountered and returns 0       
+    # Returns calculated tip diameter (float) of the gear, 0 if there is none
     def get_tip_diameter(self):
-        try:
-            return (float(self.teeth_number) + 2) * self.get_module()
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return (self.teeth_number + 2) * self.get_module()
     
     # This function gets root diameter of spur gear
-    # Returns root diameter of the gear
-    # Raises Error if error encountered and returns 0
+    # Returns root diameter of the gear, 0 if there is none
     def get_root_diameter(self):
-        try:
-            return (self.teeth_number - 2.25) * self.get_module()
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return (self.teeth_number - 2.25) * self.get_module()
 
     # This function gets get_centre_distance diameter of spur gear using other gear
     # other_gear: Other gears root diameter
-    # Returns the calculated root diameter 
-    # Raises Error if error encountered and returns 0    
+    # Returns the calculated centre distance, half the sum of the pitch diameters
     def get_centre_distance(self, other_gear):
-        try:
-            return (self.pitch_diameter + other_gear.pitch_diameter) / 2
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return (self.pitch_diameter + other_gear.pitch_diameter) / 2
         
     # This function gets tip clearance of spur gear
-    # Returns module*0.25 (float) of the gear
-    # Raises Error if error encountered and returns 0    
+    # Returns module*0.25 (float) of the gear, 0 if there is none
     def get_tip_clearance(self):
-        try:
-            return (float(self.get_module()) * 0.25)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return self.get_module() * 0.25
+
+    # This function simulates the gear driving another gear through one mesh cycle
+    # other_gear: Driven gear (type: InvoluteGear)
+    # centre_distance: Distance between the axes, by default the sum of the pitch radii (type: float)
+    # Returns a dictionary with contact ratio, tip interference, smallest backlash and transmission error
+    def get_mesh_analysis(self, other_gear, centre_distance=None):
+        return analyse(round(self.teeth_number), round(other_gear.teeth_number), self.get_module(),
+            self.pressure_angle, self.clearance, centre_distance=centre_distance)
 
     # This function gets properties previously calculated of spur gear
     # and stores in a dictionary
@@ -138,42 +130,27 @@ class BevelGear(Gear):
     
     # This function gets refernece cone angle of bevel gear using other gear
     # other_gear: Other gears teeth number
-    # Returns the calculated refernece cone angle 
-    # Raises Error if error encountered and returns 0  
+    # Returns the calculated refernece cone angle in radians for axes at 90 degrees, 0 if there is none
     def get_my_reference_cone_angle(self, other_gear):
-        try:
-            return (self.teeth_number / other_gear.teeth_number)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return math.atan2(self.teeth_number, other_gear.teeth_number)
     
     # This function gets reference cole angle of other bevel gear
     # other_gear: Other gears teeth number
-    # Returns the other gears calculated reference cone angle 
-    # Raises Error if error encountered and returns 0  
+    # Returns the other gears calculated reference cone angle in radians, 0 if there is none
     def get_other_reference_cone_angle(self, other_gear):
-        try:
-            return (other_gear.teeth_number / self.teeth_number)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return math.atan2(other_gear.teeth_number, self.teeth_number)
     
     # This function gets total angle value using other gear
     # other_gear: Other gears cone angle
-    # Returns the calculated total angle between gears 
-    # Raises Error if error encountered and returns 0  
+    # Returns the calculated total angle between gears, the sum of both reference cone angles in radians
     def get_axis_single_total(self,other_gear):
-        try:
-            return self.get_my_reference_cone_angle() + other_gear.get_my_reference_cone_angle()
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return self.get_my_reference_cone_angle(other_gear) + self.get_other_reference_cone_angle(other_gear)
         
     # This function gets addendum of gear
-    # Returns the calculated addendum
-    # Raises Error if error encountered and returns 0   
-    def get_addendum(self):
-        return self.pitch_diameter + (2 * self.get_module()* math.cos(self.get_my_reference_cone_angle))
+    # other_gear: Mating gear, by default the gear itself (type: BevelGear)
+    # Returns the calculated outside diameter, pitch diameter + 2 * module * cos(reference cone angle)
+    def get_addendum(self, other_gear=None):
+        return self.pitch_diameter + (2 * self.get_module() * math.cos(self.get_my_reference_cone_angle(other_gear or self)))
 
 # This inherited class contains parameters and functions of Worm Gear
 class WormGear(Gear):
@@ -185,34 +162,22 @@ class WormGear(Gear):
         super().__init__(**kwargs)
         
     # This function gets lead angle of worm gear
-    # Returns module*0.25 (float) of the gear
-    # Raises Error if error encountered and returns 0 
+    # Returns the lead angle in radians, 0 if there is none
     def get_lead_angle(self):
-        try:
-            return math.atan(self.get_module()*self.teeth_number / self.pitch_diameter)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        if not self.pitch_diameter:
+            return 0.0
+        return math.atan(self.get_module() * self.teeth_number / self.pitch_diameter)
         
     # This function gets axial pitch of worm gear
-    # Returns module*0.25 (float) of the gear
-    # Raises Error if error encountered and returns 0 
+    # Returns pi * module * teeth number of the gear, 0 if there is none
     def get_axial_pitch(self):
-        try:
-            return math.pi * self.get_module() * self.teeth_number
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
+        return math.pi * self.get_module() * self.teeth_number
 
 # This class contains utility function of gear     
 class Gear_Utility:
     
     # This function gets teeth number of a gear
-    # Returns float(pitch_diameter / module) of the gear
-    # Raises Error if error encountered and returns 0 
+    # Returns float(pitch_diameter / module) of the gear, 0 if the module is not positive
     def get_teeth_number(module, pitch_diameter):
-        try:
-            return float(pitch_diameter / module)
-        except Exception as e:
-            print(f"Unexpected {e=}, {type(e)}")
-            return 0
\ No newline at end of file
+        value = float(teeth_number(module, pitch_diameter))
+        return 0.0 if math.isnan(value) else value
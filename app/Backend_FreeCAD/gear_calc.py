@@ -0,0 +1,105 @@
+# =============================================================================
+# File Name     : gear_calc.py
+# Description   : This module calculates the derived quantities of many gears at
+#                 once from arrays of their parameters, rows with parameters that
+#                 make no gear are masked instead of raising
+# =============================================================================
+
+import numpy as np
+
+# Derived quantities calculated for every row, in the order of the columns
+COLUMNS = ("module", "addendum", "dedendum", "tooth_depth", "tip_diameter", "root_diameter",
+    "tip_clearance", "centre_distance", "lead_angle", "axial_pitch", "reference_cone_angle",
+    "mate_reference_cone_angle")
+
+# Columns which also depend on the mating gear
+PAIR_COLUMNS = ("centre_distance", "reference_cone_angle", "mate_reference_cone_angle")
+
+# Table columns read by from_table(), named like the attributes of gear.Gear
+TABLE_COLUMNS = {"teeth": "teeth_number", "pitch_diameter": "pitch_diameter",
+    "pressure_angle": "pressure_angle", "clearance": "clearance",
+    "mate_teeth": "mate_teeth_number", "mate_pitch_diameter": "mate_pitch_diameter"}
+
+# This function checks which rows have a positive number of teeth and pitch diameter
+# teeth:            Teeth numbers (type: array)
+# pitch_diameter:   Pitch diameters in mm (type: array)
+# Returns a boolean array, true for the rows which make a gear
+def valid_gears(teeth, pitch_diameter):
+    with np.errstate(invalid="ignore"):
+        return np.isfinite(teeth) & np.isfinite(pitch_diameter) & (teeth > 0) & (pitch_diameter > 0)
+
+# This function calculates the derived quantities of gears given as arrays of their parameters
+# Scalars and arrays of the same length may be mixed. A row is invalid when its teeth number
+# or pitch diameter is not positive, its pressure angle is not between 0 and 90 degrees or its
+# clearance is negative; its quantities are NaN. The pair quantities use the mating gear, the
+# gear itself when none is given, and are also NaN when the mating gear is invalid
+# teeth:                Teeth numbers (type: array)
+# pitch_diameter:       Pitch diameters in mm (type: array)
+# pressure_angle:       Pressure angles in degrees (type: array)
+# clearance:            Clearances in mm (type: array)
+# mate_teeth:           Teeth numbers of the mating gears (type: array)
+# mate_pitch_diameter:  Pitch diameters of the mating gears in mm (type: array)
+# shaft_angle:          Angle between the bevel gear axes in degrees (type: array)
+# Returns a dictionary of float arrays, one per name in COLUMNS, and the boolean arrays
+# "valid" and "pair_valid"
+def calculate(teeth, pitch_diameter, pressure_angle=20.0, clearance=0.0, mate_teeth=None,
+        mate_pitch_diameter=None, shaft_angle=90.0):
+    teeth = np.asarray(teeth, dtype=float)
+    pitch_diameter = np.asarray(pitch_diameter, dtype=float)
+    pressure_angle = np.asarray(pressure_angle, dtype=float)
+    clearance = np.asarray(clearance, dtype=float)
+    mate_teeth = teeth if mate_teeth is None else np.asarray(mate_teeth, dtype=float)
+    mate_pitch_diameter = pitch_diameter if mate_pitch_diameter is None \
+        else np.asarray(mate_pitch_diameter, dtype=float)
+    shaft = np.radians(np.asarray(shaft_angle, dtype=float))
+    shape = np.broadcast(teeth, pitch_diameter, pressure_angle, clearance, mate_teeth, mate_pitch_diameter,
+        shaft).shape
+
+    with np.errstate(invalid="ignore"):
+        valid = valid_gears(teeth, pitch_diameter) & (pressure_angle > 0) & (pressure_angle < 90) \
+            & (clearance >= 0)
+    valid = np.broadcast_to(valid, shape)
+    pair_valid = valid & valid_gears(mate_teeth, mate_pitch_diameter)
+
+    # Invalid rows divide by NaN so they come out as NaN without a warning
+    z = np.where(valid, teeth, np.nan)
+    module = pitch_diameter / z
+    columns = {"module": module, "addendum": module, "dedendum": module * 1.25,
+        "tooth_depth": module * 2.25, "tip_diameter": (z + 2) * module,
+        "root_diameter": (z - 2.25) * module, "tip_clearance": module * 0.25,
+        "lead_angle": np.arctan(module * z / pitch_diameter), "axial_pitch": np.pi * module * z}
+
+    z1 = np.where(pair_valid, teeth, np.nan)
+    z2 = np.where(pair_valid, mate_teeth, np.nan)
+    columns["centre_distance"] = (np.where(pair_valid, pitch_diameter, np.nan) + mate_pitch_diameter) / 2
+    columns["reference_cone_angle"] = np.arctan2(z1 * np.sin(shaft), z2 + z1 * np.cos(shaft))
+    columns["mate_reference_cone_angle"] = np.arctan2(z2 * np.sin(shaft), z1 + z2 * np.cos(shaft))
+
+    result = {name: np.broadcast_to(columns[name], shape).astype(float) for name in COLUMNS}
+    result["valid"] = np.array(valid)
+    result["pair_valid"] = np.array(pair_valid)
+    return result
+
+# This function calculates the derived quantities of the gears in the rows of a table
+# table:    Dictionary of columns or pandas DataFrame with the columns teeth_number and
+#           pitch_diameter, and optionally pressure_angle, clearance, mate_teeth_number and
+#           mate_pitch_diameter (type: dict or DataFrame)
+# Returns the quantities as a DataFrame when a DataFrame is given, else as a dictionary
+def from_table(table, **kwargs):
+    arguments = {name: np.asarray(table[column]) for name, column in TABLE_COLUMNS.items()
+        if column in table}
+    arguments.update(kwargs)
+    result = calculate(**arguments)
+    if hasattr(table, "index") and hasattr(table, "columns"):
+        return type(table)(result, index=table.index)
+    return result
+
+# This function calculates the teeth numbers of gears from their modules and pitch diameters
+# module:           Modules in mm (type: array)
+# pitch_diameter:   Pitch diameters in mm (type: array)
+# Returns the teeth numbers as a float array, NaN where the module is not positive
+def teeth_number(module, pitch_diameter):
+    module = np.asarray(module, dtype=float)
+    with np.errstate(invalid="ignore"):
+        module = np.where(module > 0, module, np.nan)
+    return np.asarray(pitch_diameter, dtype=float) / module
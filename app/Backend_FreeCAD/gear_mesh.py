@@ -0,0 +1,132 @@
+# =============================================================================
+# File Name     : gear_mesh.py
+# Description   : This module simulates two spur gears turning in mesh from their
+#                 2D tooth profiles and reports contact ratio, tip interference,
+#                 backlash and transmission error
+# =============================================================================
+
+import math
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(__file__))
+from gear_profile import involute, tooth
+
+# Gear positions sampled over one mesh cycle, the turn of the driving gear by one tooth
+STEPS = 48
+
+# Points sampled on each flank of the tooth profiles
+SAMPLES = 40
+
+# Gap in mm on the pitch circle below which a tooth pair counts as touching
+CONTACT_TOLERANCE = 0.002
+
+# This function gets the radii of the circles of an involute gear
+# module, teeth, pressure_angle, clearance: As in gear_profile.tooth
+# Returns the pitch, base, tip and root radius
+def radii(module, teeth, pressure_angle, clearance):
+    pitch = module * teeth / 2
+    return pitch, pitch * math.cos(math.radians(pressure_angle)), pitch + module, pitch - (1 + clearance) * module
+
+# This function gets the half angle a tooth spans at some radii, measured from the tooth centre
+# Below the base circle the flank is radial, inside the root circle the gear is solid and outside
+# the tip circle there is no tooth
+# radius:   Radii in mm (type: array)
+# module, teeth, pressure_angle, clearance, backlash: As in gear_profile.tooth
+# Returns the half angles in radians, -inf outside the tip circle
+def half_tooth(radius, module, teeth, pressure_angle, clearance, backlash=0):
+    pitch, base, tip, root = radii(module, teeth, pressure_angle, clearance)
+    alpha = math.radians(pressure_angle)
+    at_pitch = math.pi / (2 * teeth) - backlash / (2 * pitch) + involute(alpha)
+    half = at_pitch - involute(np.arccos(np.clip(base / np.maximum(radius, 1e-12), 0, 1)))
+    half = np.maximum(half, 0)
+    half = np.where(radius < root, math.pi / teeth, half)
+    return np.where(radius > tip, -np.inf, half)
+
+# This function turns the teeth of a driving gear through one mesh cycle and measures, at every step,
+# how far the driven gear could turn either way before it touches the driving gear. The driven gear is
+# at its ideal position, its tooth shape is exact, the driving gear is sampled
+# gear, mate:       Module, teeth, pressure angle, clearance and backlash of the driving and driven gear (type: tuple)
+# centre_distance:  Distance between the axes in mm (type: float)
+# steps:            Positions sampled over the mesh cycle (type: int)
+# Returns the gaps in radians of the driven gear towards and against its turning direction of shape
+# (steps, teeth of the driving gear near the mesh), the radii on the driven gear of the closest
+# points against its turning direction, and the steps
+def sweep_gaps(gear, mate, centre_distance, steps):
+    module, teeth = gear[:2]
+    mate_teeth = mate[1]
+    r, theta = tooth(*gear, flank_points=SAMPLES)
+    mate_tip = radii(*mate[:4])[2]
+
+    # Only the teeth of the driving gear that can reach the tip circle of the driven gear
+    reach = np.arccos(np.clip((centre_distance ** 2 + r.min() ** 2 - mate_tip ** 2)
+        / (2 * centre_distance * r.min()), -1, 1))
+    nearby = np.arange(-int(reach * teeth / (2 * math.pi)) - 1, int(reach * teeth / (2 * math.pi)) + 2)
+
+    turn = 2 * math.pi / teeth * np.arange(steps) / steps
+    angle = theta[None, None, :] + (2 * math.pi * nearby / teeth)[None, :, None] + turn[:, None, None]
+    x = r * np.cos(angle) - centre_distance
+    y = r * np.sin(angle)
+    rho = np.hypot(x, y)
+
+    # Driven gear turns the other way, a space of it faces the driving gear at the start
+    mate_pitch = 2 * math.pi / mate_teeth
+    centres = math.pi + mate_pitch / 2 - turn * teeth / mate_teeth
+    offset = np.mod(np.arctan2(y, x) - centres[:, None, None], mate_pitch)
+    half = half_tooth(rho, *mate)
+    with np.errstate(invalid="ignore"):
+        ahead = np.where(np.isfinite(half), offset - half, np.inf)
+        behind = np.where(np.isfinite(half), mate_pitch - offset - half, np.inf)
+    closest = np.take_along_axis(rho.reshape(steps, -1), behind.reshape(steps, -1).argmin(axis=1)[:, None], axis=1)
+    return ahead.min(axis=2), behind.min(axis=2), closest[:, 0]
+
+# This function simulates a pair of spur gears in mesh
+# The driving gear turns by one tooth in steps; every tooth pair within CONTACT_TOLERANCE of the
+# closest one is in contact. Both gears are also swept as the driving one so the tips of each are
+# checked against the flanks of the other
+# teeth:            Teeth number of the driving gear (type: int)
+# mate_teeth:       Teeth number of the driven gear (type: int)
+# module:           Module in mm (type: float)
+# pressure_angle:   Pressure angle in degrees (type: float)
+# clearance:        Root clearance as a fraction of the module (type: float)
+# backlash:         Backlash of each gear on its pitch circle in mm (type: float)
+# centre_distance:  Distance between the axes in mm, by default the sum of the pitch radii (type: float)
+# steps:            Positions sampled over the mesh cycle (type: int)
+# Returns a dictionary with the contact ratio (average tooth pairs in contact, and the textbook
+# value), tip interference, the smallest backlash and the transmission error peak to peak in mm
+def analyse(teeth, mate_teeth, module, pressure_angle=20, clearance=0.12, backlash=0, centre_distance=None,
+        steps=STEPS):
+    teeth, mate_teeth = int(teeth), int(mate_teeth)
+    gear = (float(module), teeth, float(pressure_angle), float(clearance), float(backlash))
+    mate = (float(module), mate_teeth, float(pressure_angle), float(clearance), float(backlash))
+    pitch, base, tip, root = radii(*gear[:4])
+    mate_pitch, mate_base, mate_tip, mate_root = radii(*mate[:4])
+    if centre_distance is None:
+        centre_distance = pitch + mate_pitch
+
+    ahead, behind, closest = sweep_gaps(gear, mate, centre_distance, steps)
+    back_ahead, back_behind, back_closest = sweep_gaps(mate, gear, centre_distance, steps)
+
+    # Contact ratio and transmission error on the flanks the driving gear pushes on
+    gap = behind.min(axis=1)
+    in_contact = (behind - gap[:, None]) * mate_pitch <= CONTACT_TOLERANCE
+    backlash = min(((ahead.min(axis=1) + gap) * mate_pitch).min(),
+        ((back_ahead.min(axis=1) + back_behind.min(axis=1)) * pitch).min())
+
+    # Contact ratio of the ideal gears from the length of the line of action
+    alpha = math.radians(pressure_angle)
+    working = math.acos(min(1.0, (base + mate_base) / centre_distance))
+    action = math.sqrt(max(tip ** 2 - base ** 2, 0)) + math.sqrt(max(mate_tip ** 2 - mate_base ** 2, 0)) \
+        - centre_distance * math.sin(working)
+    return {"contact_ratio": float(in_contact.sum(axis=1).mean()),
+        "theoretical_contact_ratio": action / (math.pi * module * math.cos(alpha)),
+        "tip_interference": bool((closest < mate_base - 1e-9).any() or (back_closest < base - 1e-9).any()),
+        "min_backlash": float(backlash),
+        "transmission_error": float(np.ptp(gap) * mate_pitch),
+        "centre_distance": float(centre_distance)}
+
+# This function simulates many pairs of spur gears, the profiles of the same gears are sampled once
+# pairs:    Dictionaries with the arguments of analyse() (type: list of dict)
+# Returns a list with the results of analyse() of every pair
+def analyse_batch(pairs):
+    return [analyse(**pair) for pair in pairs]
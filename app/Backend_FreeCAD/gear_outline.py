@@ -0,0 +1,93 @@
+# =============================================================================
+# File Name     : gear_outline.py
+# Description   : This module draws the 2D outline of a gear, teeth, root and bore,
+#                 as SVG or DXF without FreeCAD, for previews and for laser and
+#                 waterjet cutting
+# =============================================================================
+
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(__file__))
+from gear_params import DEFAULTS
+from gear_profile import outline
+
+# Gear types with a 2D outline, the face of helix and double helix gears is drawn
+OUTLINE_TYPES = ["spur", "helix", "double_helix"]
+
+# File formats of the outline
+OUTLINE_FORMATS = ("svg", "dxf")
+
+# Points on each involute flank of the outline, finer than the 3D model for smooth cuts
+OUTLINE_FLANK_POINTS = 24
+
+# Space around the gear in the SVG drawing as a fraction of its tip radius
+SVG_MARGIN = 0.05
+
+# This function computes the outline of a gear from its form fields
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the points of the outline counter clockwise as a NumPy array of shape (points, 2) and
+# the radius of the bore, 0 without a bore
+# Raises a Value Error when the gear type has no outline or the bore cuts into the teeth
+def outline_xy(my_kwargs):
+    gear_type = my_kwargs.get("gear_type")
+    if gear_type not in OUTLINE_TYPES:
+        raise ValueError(f"No 2D outline for {gear_type} gears")
+    teeth = int(my_kwargs.get("num_teeth"))
+    module = float(my_kwargs.get("pitch_dia")) / teeth
+    bore = float(my_kwargs.get("hole_dia") or 0) / 2
+
+    r, theta = outline(module, teeth, float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])),
+        float(my_kwargs.get("clearance", DEFAULTS["clearance"])), flank_points=OUTLINE_FLANK_POINTS)
+    if bore >= r.min():
+        raise ValueError("Invalid Hole Diameter. The bore cuts into the teeth")
+    return np.stack([r * np.cos(theta), r * np.sin(theta)], axis=1), bore
+
+# This function draws the outline of a gear as SVG, in mm with the gear centre in the middle
+# The outline is a red hairline, the usual cut line of laser cutters
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the SVG document as a string
+# Raises a Value Error as outline_xy
+def to_svg(my_kwargs):
+    points, bore = outline_xy(my_kwargs)
+    size = float(np.hypot(points[:, 0], points[:, 1]).max()) * (1 + SVG_MARGIN)
+
+    # SVG counts y downwards
+    path = "M" + " L".join(f"{x:.4f},{-y:.4f}" for x, y in points) + " Z"
+    if bore > 0:
+        path += f" M{bore:.4f},0 A{bore:.4f},{bore:.4f} 0 1 0 {-bore:.4f},0 A{bore:.4f},{bore:.4f} 0 1 0 {bore:.4f},0 Z"
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{2 * size:.4f}mm" height="{2 * size:.4f}mm" '
+        f'viewBox="{-size:.4f} {-size:.4f} {2 * size:.4f} {2 * size:.4f}">\n'
+        f'<path d="{path}" fill="none" fill-rule="evenodd" stroke="red" stroke-width="0.1"/>\n</svg>\n')
+
+# This function draws the outline of a gear as an ASCII DXF (R12) in mm
+# The outline is a closed polyline and the bore a circle, both on layer 0
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the DXF document as a string
+# Raises a Value Error as outline_xy
+def to_dxf(my_kwargs):
+    points, bore = outline_xy(my_kwargs)
+    codes = [(0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1009"), (9, "$INSUNITS"), (70, 4),
+        (0, "ENDSEC"), (0, "SECTION"), (2, "ENTITIES"),
+        (0, "POLYLINE"), (8, "0"), (66, 1), (70, 1), (10, "0.0"), (20, "0.0"), (30, "0.0")]
+    for x, y in points:
+        codes += [(0, "VERTEX"), (8, "0"), (10, f"{x:.4f}"), (20, f"{y:.4f}"), (30, "0.0")]
+    codes += [(0, "SEQEND"), (8, "0")]
+    if bore > 0:
+        codes += [(0, "CIRCLE"), (8, "0"), (10, "0.0"), (20, "0.0"), (30, "0.0"), (40, f"{bore:.4f}")]
+    codes += [(0, "ENDSEC"), (0, "EOF")]
+    return "".join(f"{code}\n{value}\n" for code, value in codes)
+
+# This function writes the outline of a gear to a file
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# fmt:          File format, svg or dxf (type: string)
+# path:         Path of the file (type: string)
+# Returns the path of the file
+# Raises a Value Error when the format is not known, or as outline_xy
+def export(my_kwargs, fmt, path):
+    if fmt not in OUTLINE_FORMATS:
+        raise ValueError(f"Invalid outline format {fmt}")
+    text = to_svg(my_kwargs) if fmt == "svg" else to_dxf(my_kwargs)
+    with open(path, "w", newline="\n") as file:
+        file.write(text)
+    return path
@@ -0,0 +1,84 @@
+# =============================================================================
+# File Name     : gear_pair.py
+# Description   : This module turns a gear and its mating gear into a pair that is
+#                 generated as one job and assembled in mesh at the centre distance
+# =============================================================================
+
+import hashlib
+import json
+import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+from assembly import read_part
+from gear import InvoluteGear
+from gear_params import DEFAULTS, TEMPLATES, gear_id, normalize
+
+# Gear types whose pairs are assembled, on parallel axes
+PAIR_TYPES = ["spur", "helix", "double_helix"]
+
+# This function gives the parameters of a gear and of its mating gear, ready to be generated
+# The mating gear has the module and every other parameter of the gear, only its teeth differ. Helical
+# gears on parallel axes mesh with a gear of the other hand, so the mating gear of a helix or double
+# helix gear has its pitch reversed, and its ID and .stl are those of the gear that meshes
+# params:       Gear parameters (type: dict)
+# mate_teeth:   Teeth of the mating gear (type: int)
+# Returns a list of gear parameters with their IDs: the gear, then its mating gear
+# Raises a Value Error when the gear type is not assembled in pairs
+def pair_gears(params, mate_teeth):
+    if params.get("gear_type") not in PAIR_TYPES:
+        raise ValueError(f"No gear pairs of {params.get('gear_type')} gears")
+    gear = {key: value for key, value in params.items() if key != "ID"}
+    module = float(gear["pitch_dia"]) / int(gear["num_teeth"])
+    mate = dict(gear, num_teeth=int(mate_teeth), pitch_dia=round(int(mate_teeth) * module, 4))
+    if gear["gear_type"] != "spur" and float(gear.get("angle_teeth") or 0):
+        mate["reverse_pitch"] = not gear.get("reverse_pitch", DEFAULTS["reverse_pitch"])
+    gears = [gear, mate]
+    for spec in gears:
+        spec["ID"] = gear_id(spec)
+    return gears
+
+# This function gives the ID of a pair job from the IDs of its gears
+# gears:    Gear parameters of the gear and its mating gear with their IDs (type: list of dict)
+# Returns the ID as a 16 character string
+def pair_id(gears):
+    digest = hashlib.sha256(json.dumps([spec["ID"] for spec in gears]).encode("utf-8")).hexdigest()
+    return "pr" + digest[:14]
+
+# This function tells if the gears of a pair may be generated at the same time
+# Gears made by FreeCAD from the same template are made one after the other, so the template that
+# a worker has open is reused
+# gears:    Gear parameters of the pair (type: list of dict)
+# Returns True when the gears do not share a FreeCAD template
+def concurrent(gears):
+    canonical = [normalize(spec) for spec in gears]
+    templates = [TEMPLATES.get(spec["gear_type"]) for spec in canonical if spec["backend"] == "freecad"]
+    return len(templates) < 2 or len(set(templates)) == len(templates)
+
+# This function gets the centre distance of a pair from gear.py
+# gears:    Gear parameters of the pair (type: list of dict)
+# Returns the centre distance in mm
+def centre_distance(gears):
+    gear, mate = (InvoluteGear(teeth_number=spec["num_teeth"], pitch_diameter=spec["pitch_dia"],
+        pressure_angle=spec.get("pressure_angle", DEFAULTS["pressure_angle"]),
+        clearance=spec.get("clearance", DEFAULTS["clearance"]), hole_diameter=spec.get("hole_dia") or 0,
+        gear_type=spec["gear_type"]) for spec in gears)
+    return gear.get_centre_distance(mate)
+
+# This function gets where the gears of a pair go so that they mesh
+# The gear has a tooth on the x axis. The mating gear sits on the x axis at the centre distance,
+# turned by half a turn and half a tooth pitch so one of its spaces faces that tooth
+# gears:    Gear parameters of the pair (type: list of dict)
+# Returns the placements, a list of (angle, offset), of the gear and of its mating gear
+def placements(gears):
+    mate_teeth = int(gears[1]["num_teeth"])
+    return [[(0.0, (0, 0, 0))], [(math.pi + math.pi / mate_teeth, (centre_distance(gears), 0, 0))]]
+
+# This function gets the parts of the assembly of a pair from the .stl of its gears
+# gears:        Gear parameters of the pair with their IDs (type: list of dict)
+# directory:    Directory of the .stl files of the gears (type: string)
+# Returns the parts with their name, triangles and placements
+def assembly(gears, directory):
+    gear, mate = (read_part(os.path.join(directory, f"{spec['ID']}.stl")) for spec in gears)
+    return [{"name": name, "triangles": triangles, "placements": place}
+        for name, triangles, place in zip(("gear", "mate"), (gear, mate), placements(gears))]
@@ -0,0 +1,108 @@
+# =============================================================================
+# File Name     : gear_params.py
+# Description   : This module holds the default gear parameters and turns a
+#                 parameter dictionary into its canonical form and unique ID
+# =============================================================================
+
+import hashlib
+import json
+
+# Default values used by Gear_types when a parameter is not given
+DEFAULTS = {
+    "angle_teeth": 0,
+    "pressure_angle": 20,
+    "clearance": 0.12,
+    "double_helix": False,
+    "pitch_angle": 45,
+    "backlash": 0,
+    "reverse_pitch": False,
+    "add_endings": False,
+    "simplified": False,
+    "thickness": 5,
+    "head": 0,
+    "wheel_teeth": 0,
+    "backend": "freecad",
+}
+
+# Parameters shared by every gear type
+COMMON_FIELDS = ["height", "num_teeth", "pitch_dia", "hole_dia", "pressure_angle", "clearance"]
+
+# Extra parameters that change the geometry of each gear type
+TYPE_FIELDS = {
+    "spur": [],
+    "helix": ["angle_teeth", "reverse_pitch"],
+    "double_helix": ["angle_teeth", "reverse_pitch"],
+    "bevel": ["angle_teeth", "pitch_angle", "backlash"],
+    "worm": ["angle_teeth", "reverse_pitch", "wheel_teeth"],
+    "rack": ["angle_teeth", "thickness", "head", "add_endings", "simplified", "double_helix"],
+    "ring": ["angle_teeth", "thickness", "head", "double_helix"],
+}
+
+# FreeCAD template document used by each gear type
+TEMPLATES = {"spur": "Involute_Gear", "helix": "Involute_Gear", "double_helix": "Involute_Gear",
+    "bevel": "Bevel_Gear", "worm": "Worm_Gear", "rack": "Rack_Gear"}
+
+# Gear types that the native backend (native_gear.py) can generate without FreeCAD,
+# the ones without a template are only made by it
+NATIVE_TYPES = ["spur", "helix", "double_helix", "bevel", "worm", "rack", "ring"]
+
+# End of the ID of the worm wheel made with a worm (wheel_teeth above 0), it is in <ID>_wheel.stl
+WHEEL_SUFFIX = "_wheel"
+
+# Fewest starts of a worm made with a worm wheel. The module of a worm is pitch_dia / num_teeth, so the
+# throat of the wheel, the root radius of the worm and the clearance, is (starts / 2 - 1) modules
+WORM_WHEEL_STARTS = 3
+
+# Names used by the web forms for some of the parameters
+ALIASES = {"add_ending": "add_endings", "simp": "simplified"}
+
+# One letter at the end of an ID which tells the gear type
+ID_FLAGS = {"spur": "s", "helix": "h", "double_helix": "d", "rack": "r", "worm": "w", "bevel": "b", "ring": "i"}
+
+# Decimals kept of every real number, values closer than this are the same gear
+DECIMALS = 4
+
+# This function rounds a parameter value to its canonical form
+# value:    Parameter value (number, bool or string)
+# Returns the rounded value
+def canonical_value(value):
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    value = round(float(value), DECIMALS)
+    if value.is_integer():
+        return int(value)
+    return value
+
+# This function gives the canonical parameters of a gear: only the fields that change
+# its geometry, with defaults filled in and numbers rounded
+# params:   Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the canonical parameters as a dictionary
+# Raises a Value Error when the gear type is not known
+def normalize(params):
+    gear_type = params.get("gear_type")
+    if gear_type not in TYPE_FIELDS:
+        raise ValueError(f"Invalid gear type {gear_type}")
+
+    params = {ALIASES.get(key, key): value for key, value in params.items()}
+    canonical = {"gear_type": gear_type}
+    for field in COMMON_FIELDS + TYPE_FIELDS[gear_type]:
+        value = params.get(field)
+        if value is None:
+            value = DEFAULTS.get(field)
+        canonical[field] = canonical_value(value)
+
+    # Gear types without a native generator are always made by FreeCAD, those without a template never
+    canonical["backend"] = params.get("backend") or DEFAULTS["backend"]
+    if canonical["gear_type"] not in NATIVE_TYPES:
+        canonical["backend"] = "freecad"
+    elif canonical["gear_type"] not in TEMPLATES:
+        canonical["backend"] = "native"
+    return canonical
+
+# This function gives the unique ID of a gear from all its canonical parameters
+# params:   Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the ID as a 16 character string
+def gear_id(params):
+    canonical = normalize(params)
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+    return "id" + digest[:13] + ID_FLAGS[canonical["gear_type"]]
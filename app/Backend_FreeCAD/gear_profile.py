@@ -0,0 +1,115 @@
+# =============================================================================
+# File Name     : gear_profile.py
+# Description   : This module computes the 2D tooth profiles of involute gears and
+#                 keeps the latest ones, so the native generator, the meshing
+#                 simulation and the outline exports share them
+# =============================================================================
+
+import functools
+import math
+import numpy as np
+
+# Points on each involute flank by default
+FLANK_POINTS = 12
+
+# Most tooth profiles and most gear outlines kept
+PROFILE_CACHE_SIZE = 256
+
+# This function computes the involute function
+# angle:    Pressure angle in radians (float or NumPy array)
+# Returns tan(angle) - angle
+def involute(angle):
+    return np.tan(angle) - angle
+
+# This function gets one tooth of an involute gear in polar coordinates
+# The points go counter clockwise from the middle of the space before the tooth
+# to just before the middle of the space after it
+# module:           Module of the gear in mm (type: float)
+# teeth:            Number of teeth, fractional for the virtual spur gear of a bevel gear (type: float)
+# pressure_angle:   Pressure angle in degrees (type: float)
+# clearance:        Root clearance as a fraction of the module (type: float)
+# backlash:         Backlash on the pitch circle in mm (type: float)
+# head:             Extra addendum as a fraction of the module (type: float)
+# flank_points:     Points on each involute flank (type: int)
+# Returns the radii and angles of the points as two read only NumPy arrays
+def tooth(module, teeth, pressure_angle, clearance, backlash=0, head=0, flank_points=FLANK_POINTS):
+    return _tooth(float(module), float(teeth), float(pressure_angle), float(clearance), float(backlash),
+        float(head), int(flank_points))
+
+# This function gets the outline of a whole gear, one tooth turned to the place of every tooth
+# teeth:    Number of teeth (type: int)
+# module, pressure_angle, clearance, backlash, head, flank_points: As in tooth
+# Returns the radii and angles of the outline, counter clockwise, as two read only NumPy arrays
+def outline(module, teeth, pressure_angle, clearance, backlash=0, head=0, flank_points=FLANK_POINTS):
+    return _outline(float(module), int(teeth), float(pressure_angle), float(clearance), float(backlash),
+        float(head), int(flank_points))
+
+# This function gets the hit and miss counts of the profiles and outlines kept
+# Returns a dictionary with hits, misses, hit rate and the number of entries kept
+def stats():
+    infos = [_tooth.cache_info(), _outline.cache_info()]
+    hits = sum(info.hits for info in infos)
+    misses = sum(info.misses for info in infos)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0,
+        "size": sum(info.currsize for info in infos), "max_size": sum(info.maxsize for info in infos)}
+
+# This function forgets the profiles and outlines kept and their counts
+# Returns nothing
+def clear():
+    _tooth.cache_clear()
+    _outline.cache_clear()
+
+@functools.lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def _tooth(module, teeth, pressure_angle, clearance, backlash, head, flank_points):
+    alpha = math.radians(pressure_angle)
+    r_pitch = module * teeth / 2
+    r_base = r_pitch * math.cos(alpha)
+    r_tip = r_pitch + (1 + head) * module
+    r_root = r_pitch - (1 + clearance) * module
+    half_pitch = math.pi / teeth
+
+    # Half of the tooth angle at radius r follows the involute from the base circle
+    half_tooth_pitch = half_pitch / 2 - backlash / (2 * r_pitch) + involute(alpha)
+    def half_tooth(r):
+        return half_tooth_pitch - involute(np.arccos(np.minimum(r_base / r, 1.0)))
+
+    # The flank starts at the root, radially below the base circle, and ends where the tooth is pointed
+    r_start = max(r_root, r_base)
+    radii = np.linspace(r_start, r_tip, flank_points)
+    half = half_tooth(radii)
+    if half[-1] <= 0:
+        r_tip = float(np.interp(0, half[::-1], radii[::-1])) * 0.999
+        radii = np.linspace(r_start, r_tip, flank_points)
+        half = half_tooth(radii)
+    half = np.minimum(half, half_pitch)
+    if r_root < r_base:
+        # Below the base circle the flank runs down to the root slightly slanted, like a small
+        # fillet, so no face of the gear lies on a radial line
+        radii = np.concatenate([[r_root], radii])
+        half = np.concatenate([[half[0] + 0.1 * (half_pitch - half[0])], half])
+
+    # Root arcs and tip arc are sampled about every 3 degrees
+    root_angle = half_pitch - half[0]
+    root_points = max(2, int(math.degrees(root_angle) / 3) + 1)
+    tip_points = max(2, int(math.degrees(2 * half[-1]) / 3) + 1)
+    root_before = np.linspace(-half_pitch, -half[0], root_points, endpoint=False)
+    tip = np.linspace(-half[-1], half[-1], tip_points)[1:-1]
+    root_after = np.linspace(half[0], half_pitch, root_points, endpoint=False)[1:]
+
+    theta = np.concatenate([root_before, -half, tip, half[::-1], root_after])
+    r = np.concatenate([np.full(root_points, r_root), radii, np.full(tip.size, r_tip), radii[::-1],
+        np.full(root_after.size, r_root)])
+    r.setflags(write=False)
+    theta.setflags(write=False)
+    return r, theta
+
+@functools.lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def _outline(module, teeth, pressure_angle, clearance, backlash, head, flank_points):
+    r, theta = _tooth(module, teeth, pressure_angle, clearance, backlash, head, flank_points)
+    offsets = 2 * math.pi * np.arange(teeth) / teeth
+    r = np.broadcast_to(r, (teeth, r.size)).ravel()
+    theta = (theta[None, :] + offsets[:, None]).ravel()
+    r.setflags(write=False)
+    theta.setflags(write=False)
+    return r, theta
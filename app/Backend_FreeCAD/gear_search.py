@@ -0,0 +1,92 @@
+# =============================================================================
+# File Name     : gear_search.py
+# Description   : This module searches the pairs of gears with whole numbers of
+#                 teeth and standard modules that best give a wanted ratio and
+#                 centre distance
+# =============================================================================
+
+import numpy as np
+
+# Standard modules in mm, series I and II of ISO 54
+MODULES = (0.5, 0.55, 0.6, 0.7, 0.8, 0.9, 1, 1.125, 1.25, 1.375, 1.5, 1.75, 2, 2.25, 2.5, 2.75,
+    3, 3.5, 4, 4.5, 5, 5.5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 18, 20, 22, 25, 28, 32, 36, 40, 45, 50)
+
+# Teeth numbers and pitch diameters in mm the gear forms accept
+TEETH_RANGE = (2, 100)
+PITCH_RANGE = (5, 500)
+
+# This function gets the fewest teeth a gear cut by a rack can have without undercut
+# pressure_angle:   Pressure angle in degrees (type: float)
+# Returns 2 / sin^2(pressure angle) rounded to a whole number, a very large number at 0 degrees
+def min_teeth(pressure_angle):
+    sine = np.sin(np.radians(float(pressure_angle)))
+    if sine <= 0:
+        return np.iinfo(np.int32).max
+    return int(round(2 / sine ** 2))
+
+# This function checks which teeth numbers give a pitch diameter in range with which modules
+# teeth:        Teeth numbers (type: array)
+# modules:      Modules in mm (type: array)
+# pitch_range:  Smallest and largest pitch diameter in mm (type: tuple)
+# Returns a boolean array with a row per teeth number and a column per module
+def pitch_fits(teeth, modules, pitch_range):
+    pitch = teeth[:, None] * modules
+    return (pitch >= pitch_range[0]) & (pitch <= pitch_range[1])
+
+# This function finds the Pareto-best pairs of gears for a wanted ratio and/or centre distance
+# Every pair of teeth numbers in the range is tried with every module at once. A pair is kept when
+# no other pair is at least as good in ratio error, centre distance error and centre distance (size)
+# and better in one of them. The pairs are ranked by ratio error
+# ratio:            Wanted teeth ratio of the mating gear to the gear (type: float)
+# centre_distance:  Wanted centre distance in mm (type: float)
+# pressure_angle:   Pressure angle in degrees, sets the undercut limit (type: float)
+# teeth:            Teeth number of the gear when it is already chosen (type: int)
+# modules:          Modules to try in mm (type: list)
+# teeth_range:      Fewest and most teeth of either gear (type: tuple)
+# pitch_range:      Smallest and largest pitch diameter of either gear in mm (type: tuple)
+# allow_undercut:   Whether gears with fewer teeth than min_teeth() are tried (type: bool)
+# limit:            Most pairs returned (type: int)
+# Returns a list of dictionaries with the teeth, module, pitch diameters, ratio, centre distance
+# and errors of each pair
+# Raises ValueError when neither a positive ratio nor a positive centre distance is given
+def search(ratio=None, centre_distance=None, pressure_angle=20, teeth=None, modules=MODULES,
+        teeth_range=TEETH_RANGE, pitch_range=PITCH_RANGE, allow_undercut=False, limit=10):
+    if ratio is None and centre_distance is None:
+        raise ValueError("A ratio or a centre distance is needed")
+    for name, value in (("ratio", ratio), ("centre distance", centre_distance)):
+        if value is not None and not float(value) > 0:
+            raise ValueError(f"The {name} must be a positive number")
+
+    low, high = teeth_range
+    if not allow_undercut:
+        low = max(low, min_teeth(pressure_angle))
+    wheel = np.arange(low, high + 1, dtype=float)
+    pinion = wheel if teeth is None else np.array([float(teeth)])
+    modules = np.asarray(modules, dtype=float)
+
+    # Teeth and modules which give a pitch diameter in range, on the axes (pinion, wheel, module)
+    valid = pitch_fits(pinion, modules, pitch_range)[:, None, :] & pitch_fits(wheel, modules, pitch_range)[None, :, :]
+    i, j, k = np.nonzero(valid)
+    z1, z2, m = pinion[i], wheel[j], modules[k]
+
+    centre = m * (z1 + z2) / 2
+    # Errors are rounded so pairs with the same ratio are not ordered by floating point noise
+    ratio_error = np.zeros_like(centre) if ratio is None else np.round(np.abs(z2 / z1 - ratio) / ratio, 12)
+    centre_error = np.zeros_like(centre) if centre_distance is None else np.round(np.abs(centre - centre_distance), 9)
+
+    # Sorted by ratio error, no later pair can dominate an earlier one. Equal pairs with fewer
+    # teeth (a larger module) come first
+    order = np.lexsort((z1 + z2, centre, centre_error, ratio_error))
+    candidates = np.arange(len(order))
+    keys = (centre_error[order], centre[order])
+    options = []
+    while len(candidates) and len(options) < limit:
+        best = candidates[0]
+        index = order[best]
+        options.append({"teeth": int(z1[index]), "mate_teeth": int(z2[index]), "module": float(m[index]),
+            "pitch_diameter": float(z1[index] * m[index]), "mate_pitch_diameter": float(z2[index] * m[index]),
+            "ratio": float(z2[index] / z1[index]), "centre_distance": float(centre[index]),
+            "ratio_error": float(ratio_error[index]), "centre_error": float(centre_error[index])})
+        dominated = (keys[0][candidates] >= keys[0][best]) & (keys[1][candidates] >= keys[1][best])
+        candidates = candidates[~dominated]
+    return options
@@ -0,0 +1,133 @@
+# =============================================================================
+# File Name     : gear_strength.py
+# Description   : This module estimates the bending and contact stresses of spur
+#                 gears with the Lewis and Hertz equations, for whole sweeps of
+#                 teeth, modules and face widths at once
+# =============================================================================
+
+import numpy as np
+
+# Lewis form factor of 20 degree full depth teeth against the teeth number (Shigley, table 14-2)
+LEWIS_TEETH = np.array([12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 24, 26, 28, 30, 34, 38, 43, 50, 60,
+    75, 100, 150, 300, 400])
+LEWIS_Y = np.array([0.245, 0.261, 0.277, 0.290, 0.296, 0.303, 0.309, 0.314, 0.322, 0.328, 0.331, 0.337,
+    0.346, 0.353, 0.359, 0.371, 0.384, 0.397, 0.409, 0.422, 0.435, 0.447, 0.460, 0.472, 0.480])
+
+# Typical material values: elastic modulus and allowable bending and contact stress in MPa
+MATERIALS = {
+    "steel": {"name": "Steel", "elastic_modulus": 206000, "poisson": 0.30, "bending": 250, "contact": 1000},
+    "cast_iron": {"name": "Cast Iron", "elastic_modulus": 100000, "poisson": 0.26, "bending": 70, "contact": 500},
+    "bronze": {"name": "Bronze", "elastic_modulus": 110000, "poisson": 0.34, "bending": 90, "contact": 450},
+    "nylon": {"name": "Nylon", "elastic_modulus": 2800, "poisson": 0.40, "bending": 35, "contact": 60},
+    "pla": {"name": "PLA (3D printed)", "elastic_modulus": 3500, "poisson": 0.36, "bending": 25, "contact": 45},
+}
+
+# Columns of the results of evaluate()
+COLUMNS = ("lewis_factor", "tangential_load", "pitch_line_velocity", "velocity_factor", "bending_stress",
+    "contact_stress", "bending_safety", "contact_safety")
+
+# This function gets the Lewis form factor of teeth numbers
+# Teeth numbers between the table rows are interpolated, more than 400 teeth use the last row
+# teeth:    Teeth numbers (type: array)
+# Returns the form factors as a float array, NaN below 12 teeth where the table has none
+def lewis_factor(teeth):
+    teeth = np.asarray(teeth, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where(teeth >= LEWIS_TEETH[0], np.interp(teeth, LEWIS_TEETH, LEWIS_Y), np.nan)
+
+# This function gets the Barth velocity factor of cut teeth
+# velocity: Pitch line velocity in m/s (type: array)
+# Returns (6.1 + v) / 6.1
+def velocity_factor(velocity):
+    return (6.1 + np.asarray(velocity, dtype=float)) / 6.1
+
+# This function gets the elastic coefficient of two materials in sqrt(MPa)
+# material:         Key of the gear material in MATERIALS (type: string)
+# mate_material:    Key of the mating gear material in MATERIALS (type: string)
+# Returns sqrt(1 / (pi * ((1 - v1^2) / E1 + (1 - v2^2) / E2)))
+# Raises ValueError when a material is not known
+def elastic_coefficient(material, mate_material):
+    compliance = 0.0
+    for key in (material, mate_material):
+        if key not in MATERIALS:
+            raise ValueError(f"Unknown material {key}")
+        compliance += (1 - MATERIALS[key]["poisson"] ** 2) / MATERIALS[key]["elastic_modulus"]
+    return np.sqrt(1 / (np.pi * compliance))
+
+# This function estimates the stresses and safety factors of spur gears in mesh
+# Scalars and arrays of the same shape may be mixed. The bending stress is the Lewis equation with the
+# Barth velocity factor, the contact stress the Hertz equation of two cylinders at the pitch point.
+# Rows which make no gear, or have fewer teeth than the Lewis table, are NaN
+# teeth:            Teeth numbers of the gear (type: array)
+# module:           Modules in mm (type: array)
+# face_width:       Face widths, the gear heights, in mm (type: array)
+# torque:           Torque on the gear in N m (type: array)
+# speed:            Speed of the gear in rpm (type: array)
+# pressure_angle:   Pressure angles in degrees (type: array)
+# mate_teeth:       Teeth numbers of the mating gear, by default the gear itself (type: array)
+# material:         Key of the gear material in MATERIALS (type: string)
+# mate_material:    Key of the mating gear material, by default the gear material (type: string)
+# Returns a dictionary of float arrays, one per name in COLUMNS (stresses in MPa, load in N,
+# velocity in m/s), and the boolean array "valid"
+# Raises ValueError when a material is not known
+def evaluate(teeth, module, face_width, torque, speed, pressure_angle=20, mate_teeth=None, material="steel",
+        mate_material=None):
+    mate_material = mate_material or material
+    coefficient = elastic_coefficient(material, mate_material)
+    teeth = np.asarray(teeth, dtype=float)
+    module = np.asarray(module, dtype=float)
+    face_width = np.asarray(face_width, dtype=float)
+    torque = np.asarray(torque, dtype=float)
+    speed = np.asarray(speed, dtype=float)
+    angle = np.radians(np.asarray(pressure_angle, dtype=float))
+    mate_teeth = teeth if mate_teeth is None else np.asarray(mate_teeth, dtype=float)
+
+    with np.errstate(invalid="ignore"):
+        valid = (teeth > 0) & (mate_teeth > 0) & (module > 0) & (face_width > 0) & (torque >= 0) & (speed >= 0) \
+            & (angle > 0) & (angle < np.pi / 2)
+    valid = np.broadcast_to(valid, np.broadcast(valid, teeth, module, face_width).shape)
+
+    # Invalid rows are NaN from here on
+    width = np.where(valid, face_width, np.nan)
+    pitch = teeth * module
+    mate_pitch = mate_teeth * module
+    load = 2000 * torque / pitch
+    velocity = np.pi * pitch * speed / 60000
+    kv = velocity_factor(velocity)
+    y = lewis_factor(teeth)
+    bending = kv * load / (width * module * y)
+
+    # Radii of curvature of the two involutes at the pitch point
+    curvature = 2 / (pitch * np.sin(angle)) + 2 / (mate_pitch * np.sin(angle))
+    contact = coefficient * np.sqrt(kv * load / (width * np.cos(angle)) * curvature)
+
+    with np.errstate(divide="ignore"):
+        columns = {"lewis_factor": y, "tangential_load": load, "pitch_line_velocity": velocity, "velocity_factor": kv,
+            "bending_stress": bending, "contact_stress": contact,
+            "bending_safety": MATERIALS[material]["bending"] / bending,
+            "contact_safety": min(MATERIALS[material]["contact"], MATERIALS[mate_material]["contact"]) / contact}
+    shape = valid.shape
+    result = {name: np.where(valid, np.broadcast_to(columns[name], shape), np.nan) for name in COLUMNS}
+    result["valid"] = np.array(valid & np.isfinite(result["bending_stress"]))
+    return result
+
+# This function evaluates every combination of teeth numbers, modules and face widths
+# teeth:        Teeth numbers (type: list)
+# modules:      Modules in mm (type: list)
+# face_widths:  Face widths in mm (type: list)
+# kwargs:       Torque, speed and the other arguments of evaluate()
+# Returns the results of evaluate() as arrays of shape (teeth, modules, face widths)
+def sweep(teeth, modules, face_widths, **kwargs):
+    grid = np.meshgrid(np.asarray(teeth, dtype=float), np.asarray(modules, dtype=float),
+        np.asarray(face_widths, dtype=float), indexing="ij")
+    if kwargs.get("mate_teeth") is not None and np.ndim(kwargs["mate_teeth"]) == 1:
+        kwargs["mate_teeth"] = np.asarray(kwargs["mate_teeth"], dtype=float)[:, None, None]
+    return evaluate(*grid, **kwargs)
+
+# This function tells which designs are strong enough
+# result:       Results of evaluate() or sweep() (type: dict)
+# min_safety:   Smallest safety factor accepted (type: float)
+# Returns a boolean array, true where both safety factors reach min_safety
+def strong_enough(result, min_safety=1.0):
+    with np.errstate(invalid="ignore"):
+        return result["valid"] & (result["bending_safety"] >= min_safety) & (result["contact_safety"] >= min_safety)
@@ -0,0 +1,212 @@
+# =============================================================================
+# File Name     : gear_train.py
+# Description   : This module plans compound spur and helix gear trains for an
+#                 overall ratio and turns a chosen train into the gears to generate
+# =============================================================================
+
+import functools
+import hashlib
+import json
+import math
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(__file__))
+from gear_params import DEFAULTS, gear_id
+from gear_search import TEETH_RANGE, min_teeth
+
+# Width in log ratio of the bins the trains of each stage count are merged in: of the trains
+# whose ratios are this close, only the one with the fewest teeth is extended by more stages
+RESOLUTION = 1e-3
+
+# Most stages a train may have
+MAX_STAGES = 6
+
+# This function gets the possible stages of a reducing train, one pair of gears per ratio
+# The results are kept, so plans with the same constraints share them
+# teeth_range:          Fewest and most teeth of a gear (type: tuple)
+# module:               Module of every gear in mm (type: float)
+# pressure_angle:       Pressure angle in degrees, gears that would undercut are left out (type: float)
+# max_centre_distance:  Largest centre distance of a stage in mm, or None (type: float)
+# max_diameter:         Largest tip diameter of a gear in mm, or None (type: float)
+# max_stage_ratio:      Largest ratio of a stage, or None (type: float)
+# Returns the log ratios in increasing order and the teeth of the driving and driven gears
+def stage_options(teeth_range, module, pressure_angle, max_centre_distance=None, max_diameter=None,
+        max_stage_ratio=None):
+    return _stage_options(tuple(teeth_range), float(module), float(pressure_angle), max_centre_distance,
+        max_diameter, max_stage_ratio)
+
+@functools.lru_cache(maxsize=32)
+def _stage_options(teeth_range, module, pressure_angle, max_centre_distance, max_diameter, max_stage_ratio):
+    teeth = np.arange(max(teeth_range[0], min_teeth(pressure_angle)), teeth_range[1] + 1)
+    driver, driven = (grid.ravel() for grid in np.meshgrid(teeth, teeth, indexing="ij"))
+    keep = driven > driver
+    if max_stage_ratio is not None:
+        keep &= driven <= max_stage_ratio * driver
+    if max_centre_distance is not None:
+        keep &= module * (driver + driven) / 2 <= max_centre_distance
+    if max_diameter is not None:
+        keep &= (driven + 2) * module <= max_diameter
+    driver, driven = driver[keep], driven[keep]
+
+    # Pairs with the same ratio give the same train, the one with the fewest teeth is kept.
+    # Equal fractions divide to exactly the same float
+    ratio = driven / driver
+    order = np.lexsort((driver + driven, ratio))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ratio[order][1:] != ratio[order][:-1]
+    order = order[first]
+    options = (np.log(ratio[order]), driver[order], driven[order])
+    for array in options:
+        array.setflags(write=False)
+    return options
+
+# This function plans compound trains of up to max_stages stages for an overall ratio
+# The trains are built one stage at a time by dynamic programming over the log ratio, cut in
+# bins of RESOLUTION: of the partial trains in a bin only the one with the fewest teeth is kept
+# and extended, and partial trains that can no longer reach the ratio are dropped. Every
+# partial train is finished by the stages nearest to the ratio still missing
+# ratio:                Wanted overall speed reduction, below 1 for a train that speeds up (type: float)
+# max_stages:           Most stages of a train (type: int)
+# teeth_range:          Fewest and most teeth of a gear (type: tuple)
+# module:               Module of every gear in mm (type: float)
+# pressure_angle:       Pressure angle in degrees (type: float)
+# max_centre_distance:  Largest centre distance of a stage in mm (type: float)
+# max_diameter:         Largest tip diameter of a gear in mm (type: float)
+# max_stage_ratio:      Largest ratio of a stage (type: float)
+# tolerance:            Relative ratio error within which trains are ranked by fewer stages and
+#                       teeth instead of by error (type: float)
+# limit:                Most trains returned (type: int)
+# Returns a list of trains as dictionaries with the ratio, error, teeth and stages
+# Raises ValueError when the ratio or the stage count is not possible
+def plan(ratio, max_stages=3, teeth_range=TEETH_RANGE, module=1, pressure_angle=20, max_centre_distance=None,
+        max_diameter=None, max_stage_ratio=None, tolerance=1e-3, limit=5):
+    if not float(ratio) > 0 or float(ratio) == 1:
+        raise ValueError("The ratio must be a positive number other than 1")
+    if not 1 <= int(max_stages) <= MAX_STAGES:
+        raise ValueError(f"The number of stages must be between 1 and {MAX_STAGES}")
+    max_stages = int(max_stages)
+    target = abs(math.log(ratio))
+    logs, driver, driven = stage_options(teeth_range, module, pressure_angle, max_centre_distance,
+        max_diameter, max_stage_ratio)
+    if not len(logs):
+        raise ValueError("No stage fits the constraints")
+    stage_teeth = driver + driven
+
+    # Stages which move a partial train by the same number of bins, only the one with the fewest
+    # teeth is used to extend partial trains
+    shifts = np.round(logs / RESOLUTION).astype(int)
+    order = np.lexsort((stage_teeth, shifts))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = shifts[order][1:] != shifts[order][:-1]
+    extending = order[first]
+
+    # Partial trains per bin below the ratio: teeth, exact log ratio, and for every stage count
+    # the bin of the partial train extended and the stage added
+    size = int(target / RESOLUTION) + 1
+    teeth = np.full(size, np.inf)
+    teeth[0] = 0
+    exact = np.zeros(size)
+    history = {}
+    found = []
+    for stages in range(1, max_stages + 1):
+        trains = np.flatnonzero(np.isfinite(teeth))
+        if not len(trains):
+            break
+
+        # Every partial train finished by the two stages around the ratio it misses
+        nearest = np.searchsorted(logs, target - exact[trains])
+        for option in (nearest - 1, nearest):
+            option = option.clip(0, len(logs) - 1)
+            error = np.abs(np.expm1(exact[trains] + logs[option] - target))
+            best = np.argsort(error, kind="stable")[:limit * 4]
+            found += [(stages, trains[i], option[i]) for i in best]
+        if stages == max_stages:
+            break
+
+        # Every partial train extended by every stage, keeping the fewest teeth per bin
+        grown = np.full(size, np.inf)
+        grown_exact = np.zeros(size)
+        parent = np.zeros(size, dtype=int)
+        added = np.zeros(size, dtype=int)
+        for option in extending:
+            shift = shifts[option]
+            if shift >= size:
+                continue
+            candidate = teeth[:size - shift] + stage_teeth[option]
+            better = np.flatnonzero(candidate < grown[shift:])
+            grown[better + shift] = candidate[better]
+            grown_exact[better + shift] = exact[better] + logs[option]
+            parent[better + shift] = better
+            added[better + shift] = option
+
+        # Partial trains the remaining stages can not bring up to the ratio
+        grown[:max(0, int((target - (max_stages - stages) * logs[-1]) / RESOLUTION))] = np.inf
+        history[stages] = (parent, added)
+        teeth, exact = grown, grown_exact
+
+    trains = {}
+    for stages, train, option in found:
+        pairs = [(int(driver[option]), int(driven[option]))]
+        for level in range(stages - 1, 0, -1):
+            parent, added = history[level]
+            pairs.append((int(driver[added[train]]), int(driven[added[train]])))
+            train = parent[train]
+        pairs = sorted(pairs, key=lambda pair: pair[1] / pair[0], reverse=True)
+        if ratio < 1:
+            pairs = [(b, a) for a, b in pairs]
+
+        # Trains with the same driving and driven gears in other pairs are the same reducer
+        same_gears = (tuple(sorted(a for a, b in pairs)), tuple(sorted(b for a, b in pairs)))
+        trains.setdefault(same_gears, pairs)
+
+    results = [describe(pairs, ratio, module) for pairs in trains.values()]
+    results.sort(key=lambda train: (train["error"] > tolerance, train["error"] if train["error"] > tolerance else 0,
+        len(train["stages"]), train["teeth"], train["error"]))
+    return results[:limit]
+
+# This function describes a train of stages
+# pairs:    Teeth of the driving and driven gear of each stage (type: list of tuples)
+# ratio:    Wanted overall ratio (type: float)
+# module:   Module of every gear in mm (type: float)
+# Returns a dictionary with the overall ratio, its relative error, the total teeth and the stages
+def describe(pairs, ratio, module):
+    achieved = math.prod(b / a for a, b in pairs)
+    stages = [{"teeth": a, "mate_teeth": b, "ratio": b / a, "module": module, "pitch_diameter": a * module,
+        "mate_pitch_diameter": b * module, "centre_distance": module * (a + b) / 2} for a, b in pairs]
+    return {"ratio": achieved, "error": abs(achieved / ratio - 1), "teeth": sum(a + b for a, b in pairs),
+        "stages": stages}
+
+# This function gives the parameters of every gear of a train, ready to be generated
+# train:        Train as returned by plan(), or a list of stages with teeth and mate_teeth (type: dict or list)
+# module:       Module of every gear in mm (type: float)
+# gear:         Parameters shared by the gears: height, hole_dia, pressure_angle, clearance,
+#               angle_teeth (a helix angle makes helix gears), reverse_pitch (hand of the driving
+#               gears) and backend (type: dict)
+# Returns a list of gear parameters with their IDs, the driving then the driven gear of each stage
+# Helical gears on parallel axes mesh with a gear of the other hand, so the driven gear of every stage
+# has its pitch reversed from the driving gear, as the mating gear of gear_pair.pair_gears
+def train_gears(train, module, **gear):
+    stages = train["stages"] if isinstance(train, dict) else train
+    angle_teeth = float(gear.pop("angle_teeth", 0) or 0)
+    reverse_pitch = bool(gear.pop("reverse_pitch", DEFAULTS["reverse_pitch"]))
+    gears = []
+    for stage in stages:
+        hands = ((int(stage["teeth"]), reverse_pitch), (int(stage["mate_teeth"]), not reverse_pitch))
+        for teeth, reversed_hand in hands:
+            spec = dict(gear, gear_type="helix" if angle_teeth else "spur", num_teeth=teeth,
+                pitch_dia=round(teeth * float(module), 4))
+            if angle_teeth:
+                spec["angle_teeth"] = angle_teeth
+                spec["reverse_pitch"] = reversed_hand
+            spec["ID"] = gear_id(spec)
+            gears.append(spec)
+    return gears
+
+# This function gives the ID of a train job from the IDs of its gears
+# gears:    Gear parameters with their IDs (type: list of dict)
+# Returns the ID as a 16 character string
+def train_id(gears):
+    digest = hashlib.sha256(json.dumps([spec["ID"] for spec in gears]).encode("utf-8")).hexdigest()
+    return "tr" + digest[:14]
+
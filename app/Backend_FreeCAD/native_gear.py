@@ -0,0 +1,401 @@
+# =============================================================================
+# File Name     : native_gear.py
+# Description   : This module generates involute gears as .stl with NumPy only,
+#                 as a fast backend that does not need FreeCAD
+# =============================================================================
+
+import math
+import os
+import sys
+import numpy as np
+from stl import mesh, Mode
+sys.path.append(os.path.dirname(__file__))
+from gear import WormGear
+from gear_params import DEFAULTS, NATIVE_TYPES, WHEEL_SUFFIX, WORM_WHEEL_STARTS
+from gear_profile import FLANK_POINTS, outline, tooth
+from workspace import PART_FILES
+
+# Largest rotation in degrees between two layers of a helical gear
+TWIST_STEP = 1.5
+
+# Fewest layers of a worm wheel, so its throat follows the worm
+THROAT_LAYERS = 24
+
+# This function builds the triangles of a solid lofted through layers of a closed outline
+# Each layer has an outer outline and an inner one (the bore) with the same number of points
+# outer:    Outer points of every layer, counter clockwise (NumPy array of shape (layers, points, 3))
+# inner:    Inner points of every layer (NumPy array of shape (layers, points, 3))
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+def loft(outer, inner):
+    o0, o1 = outer[:-1], outer[1:]
+    i0, i1 = inner[:-1], inner[1:]
+    o0n, o1n = np.roll(o0, -1, axis=1), np.roll(o1, -1, axis=1)
+    i0n, i1n = np.roll(i0, -1, axis=1), np.roll(i1, -1, axis=1)
+    bottom, bottom_n = inner[0], np.roll(inner[0], -1, axis=0)
+    top, top_n = inner[-1], np.roll(inner[-1], -1, axis=0)
+    outer_b, outer_bn = outer[0], np.roll(outer[0], -1, axis=0)
+    outer_t, outer_tn = outer[-1], np.roll(outer[-1], -1, axis=0)
+
+    triangles = [
+        # Outer wall facing outwards
+        np.stack([o0, o0n, o1n], axis=-2), np.stack([o0, o1n, o1], axis=-2),
+        # Bore wall facing the axis
+        np.stack([i0, i1n, i0n], axis=-2), np.stack([i0, i1, i1n], axis=-2),
+    ]
+    triangles = [t.reshape(-1, 3, 3) for t in triangles]
+    triangles += [
+        # Bottom face facing down and top face facing up
+        np.stack([outer_b, bottom_n, outer_bn], axis=-2), np.stack([outer_b, bottom, bottom_n], axis=-2),
+        np.stack([outer_t, outer_tn, top_n], axis=-2), np.stack([outer_t, top_n, top], axis=-2),
+    ]
+    triangles = np.concatenate(triangles)
+
+    # Triangles without area (radial flanks, no bore) are left out
+    area = np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)
+    return triangles[area > 1e-12]
+
+# This function builds the triangles of a solid between an upper and a lower chain of points, like a rack
+# Each point of the upper chain has a point of the lower chain below it, in every layer
+# top:      Upper points of every layer, from left to right (NumPy array of shape (layers, points, 3))
+# bottom:   Lower points of every layer (NumPy array of shape (layers, points, 3))
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+def slab(top, bottom):
+    # The two chains make one counter clockwise ring: the top from right to left, the bottom back
+    ring = np.concatenate([top[:, ::-1], bottom], axis=1)
+    r0, r1 = ring[:-1], ring[1:]
+    r0n, r1n = np.roll(r0, -1, axis=1), np.roll(r1, -1, axis=1)
+    t0, t0n, b0, b0n = top[0, :-1], top[0, 1:], bottom[0, :-1], bottom[0, 1:]
+    t1, t1n, b1, b1n = top[-1, :-1], top[-1, 1:], bottom[-1, :-1], bottom[-1, 1:]
+
+    triangles = [
+        # Walls around the ring facing outwards
+        np.stack([r0, r0n, r1n], axis=-2).reshape(-1, 3, 3), np.stack([r0, r1n, r1], axis=-2).reshape(-1, 3, 3),
+        # Bottom face facing down and top face facing up, one strip between the chains for each point
+        np.stack([t0, t0n, b0n], axis=-2), np.stack([t0, b0n, b0], axis=-2),
+        np.stack([t1, b1n, t1n], axis=-2), np.stack([t1, b1, b1n], axis=-2),
+    ]
+    triangles = np.concatenate(triangles)
+    area = np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)
+    return triangles[area > 1e-12]
+
+# This function turns polar outlines of every layer into 3D points
+# r:        Radii of the outline (NumPy array of shape (points,) or (layers, points))
+# theta:    Angles of the outline (NumPy array of shape (points,) or (layers, points))
+# z:        Height of every layer (NumPy array of shape (layers,))
+# Returns the points as a NumPy array of shape (layers, points, 3)
+def layers_xyz(r, theta, z):
+    r, theta = np.broadcast_arrays(np.atleast_2d(r), np.atleast_2d(theta))
+    r = np.broadcast_to(r, (len(z), r.shape[-1]))
+    theta = np.broadcast_to(theta, (len(z), theta.shape[-1]))
+    return np.stack([r * np.cos(theta), r * np.sin(theta), np.broadcast_to(z[:, None], r.shape)], axis=-1)
+
+# This function gets the helix rotation, or shift, of the layers of a helical or double helical gear
+# twist:            Rotation or shift at the top of a helical gear (type: float)
+# step:             Largest rotation or shift between two layers (type: float)
+# height:           Height of the gear (type: float)
+# double_helix:     True when the teeth turn back in the middle of the gear (type: bool)
+# Returns the height and the rotation of every layer as two NumPy arrays
+def helix_layers(twist, step, height, double_helix=False):
+    steps = max(1, math.ceil(abs(twist) / step))
+    if double_helix:
+        steps = 2 * max(1, math.ceil(steps / 2))
+        z = np.linspace(0, height, steps + 1)
+        return z, twist * np.minimum(z, height - z) / height
+    z = np.linspace(0, height, steps + 1)
+    return z, twist * z / height
+
+# This function builds the triangles of a spur, helix or double helix gear
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the bore cuts into the teeth
+def involute_gear(**my_kwargs):
+    gear_type = my_kwargs.get("gear_type")
+    teeth = int(my_kwargs.get("num_teeth"))
+    pitch_dia = float(my_kwargs.get("pitch_dia"))
+    height = float(my_kwargs.get("height"))
+    hole_dia = float(my_kwargs.get("hole_dia") or 0)
+    module = pitch_dia / teeth
+    clearance = float(my_kwargs.get("clearance", DEFAULTS["clearance"]))
+    angle_teeth = 0.0 if gear_type == "spur" else float(my_kwargs.get("angle_teeth", DEFAULTS["angle_teeth"]))
+
+    r, theta = outline(module, teeth, float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])), clearance)
+    if hole_dia / 2 >= r.min():
+        raise ValueError("Invalid Hole Diameter. The bore cuts into the teeth")
+
+    # Helix twist of the teeth: the pitch circle turns by height * tan(angle) along the gear, the other
+    # way for teeth of the other hand when the pitch is reversed
+    hand = -1 if my_kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"]) else 1
+    twist = hand * height * math.tan(math.radians(angle_teeth)) / (pitch_dia / 2)
+    z, rotation = helix_layers(twist, math.radians(TWIST_STEP), height, gear_type == "double_helix")
+    theta = theta[None, :] + rotation[:, None]
+    return loft(layers_xyz(r, theta, z), layers_xyz(hole_dia / 2, theta, z))
+
+# This function builds the triangles of a straight or spiral bevel gear
+# The teeth at the back of the gear are those of the virtual spur gear on the back cone (Tredgold's
+# approximation), with the pitch circle on the bottom face. The tooth surfaces are made of lines through
+# the apex of the pitch cone, cut by the bottom face and the top face at the gear height. A spiral angle
+# turns the teeth along a logarithmic spiral, which crosses the pitch cone at the same angle everywhere
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the gear reaches the apex of its pitch cone or the bore cuts into the teeth
+def bevel_gear(**my_kwargs):
+    teeth = int(my_kwargs.get("num_teeth"))
+    pitch_dia = float(my_kwargs.get("pitch_dia"))
+    height = float(my_kwargs.get("height"))
+    hole_dia = float(my_kwargs.get("hole_dia") or 0)
+    module = pitch_dia / teeth
+    pitch_angle = math.radians(float(my_kwargs.get("pitch_angle", DEFAULTS["pitch_angle"])))
+    spiral = math.radians(float(my_kwargs.get("angle_teeth", DEFAULTS["angle_teeth"])))
+
+    # Virtual spur gear on the back cone, its angles are spread over the real pitch
+    r_pitch = pitch_dia / 2
+    rho, phi = tooth(module, teeth / math.cos(pitch_angle), float(my_kwargs.get("pressure_angle",
+        DEFAULTS["pressure_angle"])), float(my_kwargs.get("clearance", DEFAULTS["clearance"])),
+        float(my_kwargs.get("backlash", DEFAULTS["backlash"])))
+    theta = (phi / math.cos(pitch_angle) + (2 * math.pi * np.arange(teeth) / teeth)[:, None]).ravel()
+    rho = np.tile(rho, teeth)
+
+    # Points on the back cone, the height measured from the pitch circle, and the apex above them
+    r_back = rho * math.cos(pitch_angle)
+    z_back = (rho - r_pitch / math.cos(pitch_angle)) * math.sin(pitch_angle)
+    apex = r_pitch / math.tan(pitch_angle)
+    if height >= apex:
+        raise ValueError("Invalid Height. The gear reaches the apex of its pitch cone")
+
+    # Every point slides along its line to the apex; the spiral turns it by the log of its distance
+    cone = r_pitch / math.sin(pitch_angle)
+    twist = math.tan(spiral) / math.sin(pitch_angle) * math.log(apex / (apex - height))
+    steps = max(1, math.ceil(abs(twist) / math.radians(TWIST_STEP)))
+    z = np.linspace(0, height, steps + 1)
+    scale = (apex - z[:, None]) / (apex - z_back)
+    r = scale * r_back
+    if hole_dia / 2 >= r[-1].min():
+        raise ValueError("Invalid Hole Diameter. The bore cuts into the teeth")
+    theta = theta - math.tan(spiral) / math.sin(pitch_angle) * np.log(scale * np.hypot(r_back, apex - z_back) / cone)
+    return loft(layers_xyz(r, theta, z), layers_xyz(hole_dia / 2, theta, z))
+
+# This function gets the worm of a worm gear as WormGear, for its lead and lead angle
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the worm (type: WormGear)
+def worm_of(**my_kwargs):
+    return WormGear(teeth_number=my_kwargs.get("num_teeth"), pitch_diameter=my_kwargs.get("pitch_dia"),
+        pressure_angle=my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"]),
+        clearance=my_kwargs.get("clearance", DEFAULTS["clearance"]), hole_diameter=my_kwargs.get("hole_dia") or 0,
+        gear_type="worm")
+
+# This function gets the cross section of a worm, with one thread for each start
+# The threads have straight flanks in the axial section (a rack of the module), which turn with the lead
+# into spirals in the cross section
+# module:           Module of the worm in mm (type: float)
+# starts:           Number of starts (type: int)
+# pressure_angle:   Pressure angle in degrees (type: float)
+# clearance:        Root clearance as a fraction of the module (type: float)
+# lead:             Lead of the worm in mm, the advance of a thread in one turn (type: float)
+# Returns the radii and angles of the cross section, counter clockwise, as two NumPy arrays
+def worm_section(module, starts, pressure_angle, clearance, lead):
+    r_pitch = module * starts / 2
+    half_pitch = math.pi / starts
+    radii = np.linspace(r_pitch - (1 + clearance) * module, r_pitch + module, FLANK_POINTS)
+
+    # Half of the thread thickness in the axial section, turned into an angle by the lead
+    half_width = math.pi * module / 4 - (radii - r_pitch) * math.tan(math.radians(pressure_angle))
+    half = np.clip(2 * math.pi * half_width / lead, 0.01 * half_pitch, 0.95 * half_pitch)
+
+    # Root arcs and tip arc are sampled about every 3 degrees
+    root_points = max(2, int(math.degrees(half_pitch - half[0]) / 3) + 1)
+    tip_points = max(2, int(math.degrees(2 * half[-1]) / 3) + 1)
+    root_before = np.linspace(-half_pitch, -half[0], root_points, endpoint=False)
+    tip = np.linspace(-half[-1], half[-1], tip_points)[1:-1]
+    root_after = np.linspace(half[0], half_pitch, root_points, endpoint=False)[1:]
+    theta = np.concatenate([root_before, -half, tip, half[::-1], root_after])
+    r = np.concatenate([np.full(root_points, radii[0]), radii, np.full(tip.size, radii[-1]), radii[::-1],
+        np.full(root_after.size, radii[0])])
+
+    offsets = 2 * math.pi * np.arange(starts) / starts
+    return np.tile(r, starts), (theta[None, :] + offsets[:, None]).ravel()
+
+# This function builds the triangles of a worm, its cross section turns once per lead along the axis
+# The number of teeth is the number of starts and the lead is the axial pitch of WormGear
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the bore cuts into the threads
+def worm_gear(**my_kwargs):
+    starts = int(my_kwargs.get("num_teeth"))
+    height = float(my_kwargs.get("height"))
+    hole_dia = float(my_kwargs.get("hole_dia") or 0)
+    module = float(my_kwargs.get("pitch_dia")) / starts
+    lead = worm_of(**my_kwargs).get_axial_pitch()
+
+    r, theta = worm_section(module, starts, float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])),
+        float(my_kwargs.get("clearance", DEFAULTS["clearance"])), lead)
+    if r.min() <= 0:
+        raise ValueError(f"Invalid Number of Teeth. With a module of pitch diameter / starts, the threads of a "
+            f"worm of {starts} starts reach its axis")
+    if hole_dia / 2 >= r.min():
+        raise ValueError("Invalid Hole Diameter. The bore cuts into the threads")
+
+    # Right hand threads, left hand ones when the pitch is reversed
+    hand = -1 if my_kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"]) else 1
+    twist = hand * 2 * math.pi * height / lead
+    steps = max(1, math.ceil(abs(twist) / math.radians(TWIST_STEP)))
+    z = np.linspace(0, height, steps + 1)
+    theta = theta[None, :] + (twist * z / height)[:, None]
+    return loft(layers_xyz(r, theta, z), layers_xyz(hole_dia / 2, theta, z))
+
+# This function builds the triangles of the throated worm wheel that meshes with a worm
+# The wheel is a helical gear of the module of the worm, its helix angle is the lead angle of the worm.
+# Its teeth are made with a longer head and cut by the throat, a torus around the worm axis at the
+# centre distance whose radius is the root radius of the worm and the clearance, so the tips follow
+# the worm. Worms of fewer than 3 starts have no root, see WORM_WHEEL_STARTS. The face width is 2 * module * sqrt(starts + 1), at
+# most 80% of the throat diameter, with the throat in the middle of the wheel
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value,
+#               wheel_teeth is the number of teeth of the wheel
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the worm has no throat (fewer than 3 starts) or the bore cuts into the teeth
+def worm_wheel(**my_kwargs):
+    starts = int(my_kwargs.get("num_teeth"))
+    teeth = int(my_kwargs.get("wheel_teeth"))
+    hole_dia = float(my_kwargs.get("hole_dia") or 0)
+    module = float(my_kwargs.get("pitch_dia")) / starts
+    lead_angle = worm_of(**my_kwargs).get_lead_angle()
+
+    clearance = float(my_kwargs.get("clearance", DEFAULTS["clearance"]))
+    r_worm = module * starts / 2
+    r_wheel = module * teeth / 2
+    throat = r_worm - (1 + clearance) * module + clearance * module
+    if throat <= 0:
+        raise ValueError(f"Invalid Number of Teeth. A worm wheel needs a worm of {WORM_WHEEL_STARTS} starts or more")
+    face = min(2 * module * math.sqrt(starts + 1), 1.6 * throat)
+
+    r, theta = outline(module, teeth, float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])),
+        clearance, head=1)
+    if hole_dia / 2 >= r.min():
+        raise ValueError("Invalid Hole Diameter. The bore cuts into the teeth")
+
+    # Same hand as the worm, the pitch circle turns by face * tan(lead angle) across the wheel
+    hand = -1 if my_kwargs.get("reverse_pitch", DEFAULTS["reverse_pitch"]) else 1
+    twist = hand * face * math.tan(lead_angle) / r_wheel
+    steps = max(THROAT_LAYERS, math.ceil(abs(twist) / math.radians(TWIST_STEP)))
+    y = np.linspace(-face / 2, face / 2, steps + 1)
+    r_throat = r_worm + r_wheel - np.sqrt(throat ** 2 - y ** 2)
+    r = np.minimum(r[None, :], r_throat[:, None])
+    theta = theta[None, :] + (twist * y / face)[:, None]
+    z = y + face / 2
+    return loft(layers_xyz(r, theta, z), layers_xyz(hole_dia / 2, theta, z))
+
+# This function builds the triangles of a rack, its teeth along x on top of a body of the given thickness
+# The teeth have straight flanks of the pressure angle, and the pitch line is at y = 0. With add_endings
+# the rack is num_teeth pitches long and ends in half a space on both sides, else it ends at the flanks
+# of the first and last tooth. The teeth lean by the teeth angle along the height, a double helix rack
+# leans back in the middle. The native rack has no fillets, so it is always the simplified rack
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the thickness of the body is not positive
+def rack_gear(**my_kwargs):
+    teeth = int(my_kwargs.get("num_teeth"))
+    height = float(my_kwargs.get("height"))
+    module = float(my_kwargs.get("pitch_dia")) / teeth
+    clearance = float(my_kwargs.get("clearance", DEFAULTS["clearance"]))
+    thickness = float(my_kwargs.get("thickness", DEFAULTS["thickness"]))
+    head = float(my_kwargs.get("head") or DEFAULTS["head"])
+    angle_teeth = float(my_kwargs.get("angle_teeth", DEFAULTS["angle_teeth"]))
+    if thickness <= 0:
+        raise ValueError("Invalid Thickness. The rack needs a body below its teeth")
+
+    # Upright flanks lean a little, so every strip of the end faces has a width
+    slope = max(math.tan(math.radians(float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])))), 1e-3)
+
+    # Half of the tooth width at the root and at the tip, the tip is cut short where the tooth is pointed
+    pitch = math.pi * module
+    y_root = -(1 + clearance) * module
+    y_tip = min((1 + head) * module, 0.999 * pitch / (4 * slope))
+    half_root = min(pitch / 4 - y_root * slope, 0.499 * pitch)
+    half_tip = pitch / 4 - y_tip * slope
+
+    # Every tooth is a trapezoid around the middle of its pitch
+    middle = pitch * (np.arange(teeth) + 0.5)
+    x = (middle[:, None] + np.array([-half_root, -half_tip, half_tip, half_root])).ravel()
+    y = np.tile([y_root, y_tip, y_tip, y_root], teeth)
+    if my_kwargs.get("add_endings", DEFAULTS["add_endings"]):
+        x = np.concatenate([[0], x, [teeth * pitch]])
+        y = np.concatenate([[y_root], y, [y_root]])
+
+    # Straight teeth stay straight when they are shifted, so one layer for each helix is enough
+    twist = height * math.tan(math.radians(angle_teeth))
+    z, shift = helix_layers(twist, math.inf, height, bool(my_kwargs.get("double_helix", DEFAULTS["double_helix"])))
+    x = x[None, :] + shift[:, None]
+    top = np.stack([x, np.broadcast_to(y, x.shape), np.broadcast_to(z[:, None], x.shape)], axis=-1)
+    bottom = top.copy()
+    bottom[..., 1] = y_root - thickness
+    return slab(top, bottom)
+
+# This function builds the triangles of an internal (ring) gear with a rim of the given thickness
+# The spaces of a ring are shaped like the teeth of a spur gear of the same module and number of teeth,
+# so the outline of that gear is used with its head and clearance swapped
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# Returns the triangles as a NumPy array of shape (triangles, 3, 3)
+# Raises a Value Error when the rim is not positive or the teeth reach the axis
+def ring_gear(**my_kwargs):
+    teeth = int(my_kwargs.get("num_teeth"))
+    pitch_dia = float(my_kwargs.get("pitch_dia"))
+    height = float(my_kwargs.get("height"))
+    module = pitch_dia / teeth
+    clearance = float(my_kwargs.get("clearance", DEFAULTS["clearance"]))
+    thickness = float(my_kwargs.get("thickness", DEFAULTS["thickness"]))
+    head = float(my_kwargs.get("head") or DEFAULTS["head"])
+    angle_teeth = float(my_kwargs.get("angle_teeth", DEFAULTS["angle_teeth"]))
+    if thickness <= 0:
+        raise ValueError("Invalid Thickness. The ring needs a rim around its teeth")
+    if pitch_dia / 2 - (1 + head) * module <= 0:
+        raise ValueError("Invalid Head. The teeth of the ring reach its axis")
+
+    r, theta = outline(module, teeth, float(my_kwargs.get("pressure_angle", DEFAULTS["pressure_angle"])), head,
+        head=clearance)
+    r_rim = pitch_dia / 2 + (1 + clearance) * module + thickness
+
+    twist = height * math.tan(math.radians(angle_teeth)) / (pitch_dia / 2)
+    z, rotation = helix_layers(twist, math.radians(TWIST_STEP), height,
+        bool(my_kwargs.get("double_helix", DEFAULTS["double_helix"])))
+    theta = theta[None, :] + rotation[:, None]
+    return loft(layers_xyz(r_rim, theta, z), layers_xyz(r, theta, z))
+
+# Native generators of each gear type
+GENERATORS = {"spur": involute_gear, "helix": involute_gear, "double_helix": involute_gear, "bevel": bevel_gear,
+    "worm": worm_gear, "rack": rack_gear, "ring": ring_gear}
+
+# This function writes triangles to a binary .stl file
+# triangles:    Triangles as a NumPy array of shape (triangles, 3, 3)
+# path:         Path of the .stl file (type: string)
+# Returns the numpy-stl mesh that was written
+def write_stl(triangles, path):
+    data = np.zeros(len(triangles), dtype=mesh.Mesh.dtype)
+    data["vectors"] = triangles
+    gear = mesh.Mesh(data)
+    gear.save(path, mode=Mode.BINARY)
+    return gear
+
+# This function generates a gear without FreeCAD and exports it as an .stl named after its ID
+# A worm with wheel_teeth also gets its worm wheel, written next to it as <ID>_wheel.stl
+# my_kwargs:    Dictionary with elements containg numbers (real and integer) and boolean value
+# path:         Path of the .stl file, by default <ID>.stl in the output directory of the job or Part_files (type: string)
+# Returns the path of the .stl file
+# Raises a Value Error when the gear type has no native generator
+def generate(my_kwargs, path=None):
+    gear_type = my_kwargs.get("gear_type")
+    if gear_type not in NATIVE_TYPES:
+        raise ValueError(f"No native generator for {gear_type} gears")
+    if path is None:
+        path = os.path.join(my_kwargs.get("output_dir") or PART_FILES, f"{my_kwargs.get('ID')}.stl")
+
+    triangles = GENERATORS[gear_type](**my_kwargs)
+    if gear_type == "worm" and int(my_kwargs.get("wheel_teeth") or 0):
+        write_stl(worm_wheel(**my_kwargs), wheel_path(path))
+    write_stl(triangles, path)
+    return path
+
+# This function gets the path of the worm wheel made with a worm
+# path:     Path of the .stl of the worm (type: string)
+# Returns the path of the .stl of the worm wheel
+def wheel_path(path):
+    root, ext = os.path.splitext(path)
+    return root + WHEEL_SUFFIX + ext
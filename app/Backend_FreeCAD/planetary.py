@@ -0,0 +1,148 @@
+# =============================================================================
+# File Name     : planetary.py
+# Description   : This module plans planetary gear sets (sun, planets and ring) for
+#                 a ratio, checks that they can be assembled and places their parts
+# =============================================================================
+
+import hashlib
+import json
+import math
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.dirname(__file__))
+from assembly import read_part
+from gear_params import DEFAULTS, gear_id
+from gear_search import TEETH_RANGE, min_teeth
+
+# Fewest and most planets of a set
+PLANET_RANGE = (2, 12)
+
+# This function checks that a planetary set can be assembled
+# The ring has the teeth of the sun and of two planets, the planets are equally spaced when the
+# teeth of the sun and the ring together divide by the number of planets, and neighbouring planets
+# must not touch with their tips
+# sun:      Teeth of the sun (type: int)
+# planet:   Teeth of a planet (type: int)
+# ring:     Teeth of the ring (type: int)
+# planets:  Number of planets (type: int)
+# Returns nothing
+# Raises a Value Error naming the condition that is not met
+def check(sun, planet, ring, planets):
+    if not PLANET_RANGE[0] <= planets <= PLANET_RANGE[1]:
+        raise ValueError(f"The number of planets must be between {PLANET_RANGE[0]} and {PLANET_RANGE[1]}")
+    if ring != sun + 2 * planet:
+        raise ValueError("The ring must have the teeth of the sun and of two planets")
+    if (sun + ring) % planets:
+        raise ValueError("The planets can not be equally spaced: the teeth of the sun and the ring together "
+            "must divide by the number of planets")
+    if (sun + planet) * math.sin(math.pi / planets) <= planet + 2:
+        raise ValueError("Neighbouring planets touch each other")
+
+# This function plans planetary sets for a ratio: the ring is held, the sun drives and the carrier
+# of the planets is driven, which gives a ratio of 1 + ring / sun
+# Every sun and planet in the teeth range is tried at once with NumPy
+# ratio:            Wanted speed reduction from the sun to the carrier, above 2 (type: float)
+# planets:          Number of planets (type: int)
+# module:           Module of every gear in mm (type: float)
+# teeth_range:      Fewest and most teeth of a gear, the ring included (type: tuple)
+# pressure_angle:   Pressure angle in degrees, suns and planets that would undercut are left out (type: float)
+# tolerance:        Relative ratio error within which sets are ranked by fewer teeth instead of by error (type: float)
+# limit:            Most sets returned (type: int)
+# Returns a list of sets as dictionaries with the ratio, error, teeth, centre distance and size
+# Raises ValueError when the ratio or the number of planets is not possible
+def plan(ratio, planets=3, module=1, teeth_range=TEETH_RANGE, pressure_angle=20, tolerance=1e-3, limit=5):
+    if not float(ratio) > 2:
+        raise ValueError("The ratio of a planetary set must be above 2")
+    planets = int(planets)
+    if not PLANET_RANGE[0] <= planets <= PLANET_RANGE[1]:
+        raise ValueError(f"The number of planets must be between {PLANET_RANGE[0]} and {PLANET_RANGE[1]}")
+
+    teeth = np.arange(max(teeth_range[0], min_teeth(pressure_angle)), teeth_range[1] + 1)
+    sun, planet = (grid.ravel() for grid in np.meshgrid(teeth, teeth, indexing="ij"))
+    ring = sun + 2 * planet
+    keep = (ring <= teeth_range[1]) & ((sun + ring) % planets == 0)
+    keep &= (sun + planet) * math.sin(math.pi / planets) > planet + 2
+    sun, planet, ring = sun[keep], planet[keep], ring[keep]
+    if not len(sun):
+        raise ValueError("No planetary set fits the constraints")
+
+    error = np.abs((1 + ring / sun) / ratio - 1)
+    close = error <= tolerance
+    order = np.lexsort((error, ring, np.where(close, 0, error), ~close))[:int(limit)]
+    return [describe(int(sun[i]), int(planet[i]), planets, module, ratio) for i in order]
+
+# This function describes a planetary set
+# sun:      Teeth of the sun (type: int)
+# planet:   Teeth of a planet (type: int)
+# planets:  Number of planets (type: int)
+# module:   Module of every gear in mm (type: float)
+# ratio:    Wanted ratio, by default the ratio of the set (type: float)
+# Returns a dictionary with the ratio, its relative error, the teeth, the centre distance of the
+# planets and the outer diameter of the ring teeth
+def describe(sun, planet, planets, module, ratio=None):
+    ring = sun + 2 * planet
+    achieved = 1 + ring / sun
+    return {"ratio": achieved, "error": abs(achieved / (ratio or achieved) - 1), "sun": sun, "planet": planet,
+        "ring": ring, "planets": planets, "module": module, "centre_distance": module * (sun + planet) / 2,
+        "ring_diameter": module * ring}
+
+# This function gives the parameters of the sun, planet and ring of a set, ready to be generated
+# The planets are all the same gear, made once
+# stage:    Set as returned by plan() or describe(), with the teeth and number of planets (type: dict)
+# module:   Module of every gear in mm (type: float)
+# gear:     Parameters shared by the gears: height, hole_dia, pressure_angle, clearance, thickness of
+#           the ring rim and backend of the sun and planet (type: dict)
+# Returns a list of gear parameters with their IDs: sun, planet and ring
+# Raises a Value Error when the set can not be assembled
+def planetary_gears(stage, module, **gear):
+    sun, planet, planets = int(stage["sun"]), int(stage["planet"]), int(stage["planets"])
+    ring = sun + 2 * planet
+    check(sun, planet, ring, planets)
+    thickness = gear.pop("thickness", DEFAULTS["thickness"])
+    gears = []
+    for teeth in (sun, planet):
+        gears.append(dict(gear, gear_type="spur", num_teeth=teeth, pitch_dia=round(teeth * float(module), 4)))
+    gears.append(dict(gear, gear_type="ring", num_teeth=ring, pitch_dia=round(ring * float(module), 4),
+        thickness=thickness, backend="native"))
+    for spec in gears:
+        spec["ID"] = gear_id(spec)
+    return gears
+
+# This function gives the ID of a planetary job from the IDs of its gears and the number of planets
+# gears:    Gear parameters of the sun, planet and ring with their IDs (type: list of dict)
+# planets:  Number of planets (type: int)
+# Returns the ID as a 16 character string
+def planetary_id(gears, planets):
+    digest = hashlib.sha256(json.dumps([[spec["ID"] for spec in gears], int(planets)]).encode("utf-8")).hexdigest()
+    return "pl" + digest[:14]
+
+# This function gets where the gears of a set go so that they mesh
+# The sun has a tooth on the x axis. Planet k sits at 2 pi k / planets on the centre distance, turned
+# so a space faces the sun wherever a sun tooth is; the ring is turned to fit the first planet and,
+# with equally spaced planets, fits every other one
+# sun:      Teeth of the sun (type: int)
+# planet:   Teeth of a planet (type: int)
+# planets:  Number of planets (type: int)
+# module:   Module of every gear in mm (type: float)
+# Returns the placements, a list of (angle, offset), of the sun, the planet and the ring
+def placements(sun, planet, planets, module):
+    ring = sun + 2 * planet
+    distance = module * (sun + planet) / 2
+    carrier = 2 * math.pi * np.arange(planets) / planets
+    planet_places = [(float(angle * (1 + sun / planet) + math.pi + math.pi / planet),
+        (distance * math.cos(angle), distance * math.sin(angle), 0)) for angle in carrier]
+    return [[(0.0, (0, 0, 0))], planet_places, [(math.pi * (planet + 1) / ring, (0, 0, 0))]]
+
+# This function gets the parts of the assembly of a set from the .stl of its gears, the planet
+# mesh is read once and placed at every planet
+# gears:        Gear parameters of the sun, planet and ring with their IDs (type: list of dict)
+# planets:      Number of planets (type: int)
+# directory:    Directory of the .stl files of the gears (type: string)
+# Returns the parts with their name, triangles and placements
+def assembly(gears, planets, directory):
+    sun, planet, ring = (spec["num_teeth"] for spec in gears)
+    module = gears[0]["pitch_dia"] / sun
+    places = placements(sun, planet, planets, module)
+    return [{"name": name, "triangles": read_part(os.path.join(directory, f"{spec['ID']}.stl")), "placements": place}
+        for name, spec, place in zip(("sun", "planet", "ring"), gears, places)]
@@ -0,0 +1,217 @@
+# =============================================================================
+# File Name     : worker_pool.py
+# Description   : This module keeps a pool of long-lived FreeCAD worker processes
+#                 that take gear jobs as JSON lines instead of one launch per gear
+# =============================================================================
+
+import json
+import queue
+import subprocess
+import threading
+import time
+
+# Every reply from a worker starts with this prefix so it can be told apart
+# from anything else FreeCAD prints on stdout
+RESULT_PREFIX = "GEARJOB "
+
+# This exception is raised when a worker process dies or stops answering
+class WorkerError(RuntimeError):
+    pass
+
+# This class wraps a single FreeCAD worker process running Main.py in worker mode
+class FreeCADWorker:
+
+    # Constructor of the worker which starts the process and its stdout reader
+    # command:  Command list used to start the worker process
+    # env:      Environment of the worker process (type: dict)
+    def __init__(self, command, env=None):
+        self.jobs_done = 0
+        self.started = time.time()
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            env=env, text=True, bufsize=1)
+        self._replies = queue.Queue()
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    # This function reads the stdout of the worker and keeps only the reply lines
+    # Returns nothing
+    def _read_replies(self):
+        for line in self.process.stdout:
+            if line.startswith(RESULT_PREFIX):
+                self._replies.put(json.loads(line[len(RESULT_PREFIX):]))
+        self._replies.put(None)
+
+    # This function checks if the worker process is still running
+    # Returns True if the process has not exited else False
+    def is_alive(self):
+        return self.process.poll() is None
+
+    # This function sends one message to the worker and waits for its reply
+    # Progress events the worker writes before its reply are passed to on_event
+    # message:  Job or command for the worker (type: dict)
+    # timeout:  Seconds to wait for the reply (type: float)
+    # on_event: Function called with every progress event of the job (type: function)
+    # Returns the reply of the worker as a dictionary
+    # Raises WorkerError if the worker died or did not answer in time
+    def request(self, message, timeout=None, on_event=None):
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise WorkerError(f"Worker is not accepting jobs: {e}")
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                reply = self._replies.get(timeout=None if deadline is None else max(0, deadline - time.time()))
+            except queue.Empty:
+                self.close()
+                raise WorkerError(f"Worker did not answer within {timeout} s")
+            if reply is None:
+                raise WorkerError(f"Worker exited with code {self.process.poll()}")
+            if "event" not in reply:
+                return reply
+            if on_event:
+                on_event(reply)
+
+    # This function sends a job to the worker and counts it
+    # job:      Gear parameters (type: dict)
+    # timeout:  Seconds to wait for the result (type: float)
+    # on_event: Function called with every progress event of the job (type: function)
+    # Returns the result of the job as a dictionary
+    def run(self, job, timeout=None, on_event=None):
+        result = self.request(job, timeout, on_event)
+        self.jobs_done += 1
+        return result
+
+    # This function checks that the worker is alive and answering
+    # timeout:  Seconds to wait for the answer (type: float)
+    # Returns True if the worker answered the ping else False
+    def ping(self, timeout=10):
+        if not self.is_alive():
+            return False
+        try:
+            return self.request({"command": "ping"}, timeout).get("status") == "pong"
+        except WorkerError:
+            return False
+
+    # This function stops the worker process
+    # Returns nothing
+    def close(self):
+        if self.is_alive():
+            try:
+                self.process.stdin.write(json.dumps({"command": "exit"}) + "\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (BrokenPipeError, OSError, ValueError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+# This class contains a pool of warm FreeCAD workers that are handed out one job at a time
+class WorkerPool:
+
+    # Constructor of the pool which starts all the workers
+    # command:      Command list used to start one worker process
+    # size:         Number of workers in the pool (type: int)
+    # max_jobs:     Jobs a worker runs before it is replaced by a fresh one (type: int)
+    # timeout:      Seconds a single job may take (type: float)
+    # env:          Environment of the worker processes (type: dict)
+    # Raises ValueError when the size of the pool is less than 1
+    def __init__(self, command, size=2, max_jobs=100, timeout=300, env=None):
+        if size < 1:
+            raise ValueError("Worker pool needs at least one worker")
+        self.command = command
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.env = env
+        self.recycled = 0
+        self.replaced = 0
+        self._idle = queue.Queue()
+        self._stop_checks = threading.Event()
+        self._checker = None
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    # This function starts a new worker process
+    # Returns the new worker
+    def _spawn(self):
+        return FreeCADWorker(self.command, self.env)
+
+    # This function takes an idle worker and replaces it if it is not running anymore
+    # Returns a running worker
+    def _acquire(self):
+        worker = self._idle.get()
+        if not worker.is_alive():
+            worker.close()
+            worker = self._spawn()
+        return worker
+
+    # This function gives a worker back to the pool, recycling it after max_jobs jobs
+    # worker:   Worker that finished a job
+    # Returns nothing
+    def _release(self, worker):
+        if not worker.is_alive() or worker.jobs_done >= self.max_jobs:
+            worker.close()
+            worker = self._spawn()
+            self.recycled += 1
+        self._idle.put(worker)
+
+    # This function runs one gear job on the next free worker
+    # job:      Gear parameters (type: dict)
+    # on_event: Function called with every progress event of the job (type: function)
+    # Returns the result of the job as a dictionary
+    # Raises WorkerError if the worker died or timed out while running the job
+    def submit(self, job, on_event=None):
+        worker = self._acquire()
+        try:
+            return worker.run(job, self.timeout, on_event)
+        finally:
+            self._release(worker)
+
+    # This function pings every idle worker and replaces the ones that do not answer
+    # timeout:  Seconds to wait for each answer (type: float)
+    # Returns the number of workers that were replaced
+    def health_check(self, timeout=10):
+        replaced = 0
+        workers = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            if not worker.ping(timeout):
+                worker.close()
+                worker = self._spawn()
+                replaced += 1
+            self._idle.put(worker)
+        self.replaced += replaced
+        return replaced
+
+    # This function starts a daemon thread which runs the health check of the idle workers at an
+    # interval, so a worker that hangs while idle is replaced before a job is given to it
+    # interval: Seconds between two health checks (type: float)
+    # timeout:  Seconds to wait for each answer (type: float)
+    # Returns nothing
+    def start_health_checks(self, interval, timeout=10):
+        def check():
+            while not self._stop_checks.wait(interval):
+                try:
+                    self.health_check(timeout)
+                except OSError:
+                    # The worker could not be started again, the next check tries once more
+                    continue
+        self._checker = threading.Thread(target=check, daemon=True)
+        self._checker.start()
+
+    # This function stops the health checks and all idle workers of the pool
+    # Returns nothing
+    def close(self):
+        self._stop_checks.set()
+        if self._checker:
+            self._checker.join()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,110 @@
+# =============================================================================
+# File Name     : workspace.py
+# Description   : This module gives every job its own scratch directory and moves
+#                 finished files into the served directories in one atomic step
+# =============================================================================
+
+import errno
+import os
+import shutil
+import tempfile
+import time
+
+# Directory of the FreeCAD templates and of the served .stl files
+PART_FILES = os.path.join(os.path.dirname(__file__), "Part_files")
+
+# Prefix of the scratch directories, used to find abandoned ones
+PREFIX = "gearjob_"
+
+# Seconds after which a scratch directory is considered abandoned
+STALE_AGE = float(os.environ.get("GEAR_SCRATCH_MAX_AGE", 3600))
+
+# This function chooses where scratch directories are made: GEAR_SCRATCH_DIR if it is set,
+# else the tmpfs /dev/shm when there is one, else the temporary directory of the system
+# Returns the path of the scratch root
+def scratch_root():
+    root = os.environ.get("GEAR_SCRATCH_DIR")
+    if root:
+        return root
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", "gear_scratch")
+    return os.path.join(tempfile.gettempdir(), "gear_scratch")
+
+# This function moves a finished file to where it is served, readers see either the old
+# file or the whole new one. Across file systems the file is first copied next to its
+# destination and then renamed over it
+# source:       Path of the finished file (type: string)
+# destination:  Path where the file is served (type: string)
+# Returns the destination path
+def publish(source, destination):
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        handle, partial = tempfile.mkstemp(prefix="." + os.path.basename(destination) + ".",
+            suffix=".tmp", dir=os.path.dirname(destination))
+        os.close(handle)
+        try:
+            shutil.copyfile(source, partial)
+            os.replace(partial, destination)
+        except BaseException:
+            os.remove(partial)
+            raise
+        os.remove(source)
+    return destination
+
+# This function removes the scratch directories left behind by jobs that did not finish
+# root:     Scratch root, by default scratch_root() (type: string)
+# max_age:  Seconds since the last change after which a directory is removed (type: float)
+# Returns the number of directories removed
+def clean_stale(root=None, max_age=STALE_AGE):
+    root = root or scratch_root()
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    now = time.time()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            stale = name.startswith(PREFIX) and os.path.isdir(path) and now - os.path.getmtime(path) > max_age
+        except OSError:
+            continue
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+# This class contains the scratch directory of one job, which is removed when the job ends
+class Workspace:
+
+    # Constructor of the workspace
+    # root: Scratch root, by default scratch_root() (type: string)
+    def __init__(self, root=None):
+        self.root = root or scratch_root()
+        self.path = None
+
+    # This function makes the scratch directory
+    # Returns the workspace
+    def __enter__(self):
+        os.makedirs(self.root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=PREFIX, dir=self.root)
+        return self
+
+    # This function removes the scratch directory and everything not published
+    # Returns nothing
+    def __exit__(self, *exc):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    # This function gets the path of a file in the scratch directory
+    # name: Name of the file (type: string)
+    # Returns the path as a string
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    # This function moves a finished file of the workspace into a served directory
+    # name:         Name of the file (type: string)
+    # directory:    Served directory (type: string)
+    # Returns the path of the published file
+    def publish(self, name, directory):
+        return publish(self.file(name), os.path.join(directory, name))
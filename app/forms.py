@@ -7,10 +7,15 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, DecimalField, SubmitField, IntegerField, SelectField, PasswordField
 from wtforms import validators
 from wtforms.fields.simple import BooleanField
-from wtforms.validators import DataRequired, NumberRange, ValidationError, EqualTo, Email
+from wtforms.validators import DataRequired, InputRequired, NumberRange, ValidationError, EqualTo, Email
 from app.models import User
+from app.Backend_FreeCAD.gear_strength import MATERIALS
+from app.Backend_FreeCAD.gear_params import WORM_WHEEL_STARTS
 import decimal
 
+# Generators a gear can be made with: FreeCAD, or NumPy without FreeCAD (native_gear.py)
+BACKEND_CHOICES = [("freecad", "FreeCAD"), ("native", "Fast (without FreeCAD)")]
+
 # This class contains erros, parameters and validation of a Base Gear Form
 class GearForm(FlaskForm):
     name = None
@@ -57,7 +62,9 @@ class SpurForm(GearForm):
 
     # Defining range and type of Gear Attributes and Submit button
     GearType = StringField(default = "spur_gear")
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
     submit = SubmitField('Generate')
+    outline = SubmitField('Export 2D (SVG/DXF)')
 
 # This class contains erros, parameters and validation specific to Angle Gear Form
 class AngleForm(GearForm):
@@ -76,7 +83,9 @@ class HelixForm(AngleForm):
 
     # Defining type of Helix Gear Attribute and Submit button
     GearType = StringField(default="helix_gear")    
-    submit = SubmitField('Generate')  
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
+    submit = SubmitField('Generate')
+    outline = SubmitField('Export 2D (SVG/DXF)')  
 
     # This function performs validation of angle of teeth
     # form: Intake is form data
@@ -96,7 +105,9 @@ class DoubleHelixForm(AngleForm):
 
     # Definingtype of Double Helix Gear Attributes and Submit button
     GearType = StringField(default = "double_helix_gear")
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
     submit = SubmitField('Generate')
+    outline = SubmitField('Export 2D (SVG/DXF)')
 
     # This function performs validation of angle of teeth
     # form: Intake is form data
@@ -118,24 +129,53 @@ class BevelForm(AngleForm):
     reset_origin_error = "Invalid Input. Input can only be True or False"
     pitch_angle_error = "Invalid Input. Input can only be between 5 and 50"
 
-    # Defining range and type of Bevel Gear Attributes and Submit button
+    # Defining range and type of Bevel Gear Attributes and Submit button, a teeth angle of 0 makes a straight bevel gear
+    angle_teeth = IntegerField('Spiral Angle [degrees]', validators=[NumberRange(min=0, max=45, message=AngleForm.angle_teeth_error), InputRequired()], default=20)
     backlash = DecimalField('Backlash [mm]', validators=[NumberRange(min=0, max=30, message=backlash_error)], default=0)
     reset_origin = BooleanField('Reset Origin', validators=[], default=False)
     pitch_angle = IntegerField('Pitch Angle [degrees]',  validators=[NumberRange(min=5, max=50, message=pitch_angle_error), DataRequired()], default=45)
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
     submit = SubmitField('Generate')
 
+    # This function performs validation of the spiral angle
+    # form: Intake is form data
+    # Raises a Validation Error when the angle is neither 0 (straight bevel) nor between 5 and 45 degrees
+    def validate_angle_teeth(form, field):
+        angle_teeth = form.data.get("angle_teeth")
+        if not isinstance(angle_teeth, int):
+            angle_teeth = int(angle_teeth)
+
+        if angle_teeth != 0 and not (5 <= angle_teeth <= 45):
+            raise ValidationError("Invalid Teeth angle. It should be 0 for a straight bevel or between 5 to 45")
+
 # This inherited class contains erros, parameters and validation specific to Worm Gear Form
 class WormForm(GearForm):
     name = "Worm Gear"
 
     # Attribute Error
     height_error = "Invalid Input. Input can only be between 1 and 500"
+    wheel_teeth_error = "Invalid Input. Input can only be 0 or between 10 and 100"
 
     # Defining range and type of Worm Gear Attributes and Submit button
     height = DecimalField('Gear Height/Thickness [mm]', validators=[NumberRange(min=1, max=500, message=height_error), DataRequired()], default=50)
     reverse_pitch = BooleanField('Reverse Pitch', validators=[], default=False)
+    wheel_teeth = IntegerField('Worm Wheel Teeth (0 for none)', validators=[NumberRange(min=0, max=100, message=wheel_teeth_error)], default=0)
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
     submit = SubmitField('Generate')
 
+    # This function performs validation of the number of teeth of the worm wheel
+    # form: Intake is form data
+    # Raises a Validation Error when wheel teeth is neither 0 nor between 10 and 100, the worm has too few
+    # starts (teeth) for a wheel or the wheel is asked of FreeCAD
+    def validate_wheel_teeth(form, field):
+        if field.data and field.data < 10:
+            raise ValidationError(form.wheel_teeth_error)
+        if field.data and (form.num_teeth.data or 0) < WORM_WHEEL_STARTS:
+            raise ValidationError(f"A worm wheel needs a worm of {WORM_WHEEL_STARTS} teeth (starts) or more, "
+                "the module is the pitch diameter / teeth")
+        if field.data and form.data.get("backend") != "native":
+            raise ValidationError("The worm wheel is only made by the fast generator")
+
     # This function performs validation of worm gear height
     # form: Intake is form data
     # Raises a Validation Error when angle teeth is not between 5 and 45 degrees
@@ -164,6 +204,7 @@ class RackForm(AngleForm):
     double_helix = BooleanField('Double Helix', validators=[], default=False)
     thickness = DecimalField('Thickness [mm]', validators=[NumberRange(min=0, max=30, message=thickness_error)], default=10)
     head = DecimalField('Head [mm]', validators=[NumberRange(min=0, max=30, message=head_error)], default=10)
+    backend = SelectField('Generator', choices=BACKEND_CHOICES, default="freecad")
     submit = SubmitField('Generate')
 
     # This function performs validation of height
@@ -174,6 +215,24 @@ class RackForm(AngleForm):
         if not (5 <= height <= 100):
             raise ValidationError("Invalid thickness. It should be between 5 to 100")
 
+# This inherited class contains erros, parameters and validation specific to Ring (internal) Gear Form
+# Ring gears are only made by the fast generator
+class RingForm(AngleForm):
+    name = "Ring Gear"
+
+    # Attribute Error
+    double_helix_error = "Invalid Input. Input can only be True or False"
+    thickness_error = "Invalid Input. Input can only be between 0.5 and 50"
+    head_error = "Invalid Input. Input can only be between 0 and 1"
+
+    # Defining range and type of Ring Gear Attributes and Submit button
+    GearType = StringField(default = "ring_gear")
+    angle_teeth = IntegerField('Angle Teeth [degrees]', validators=[NumberRange(min=0, max=45, message=AngleForm.angle_teeth_error)], default=0)
+    double_helix = BooleanField('Double Helix', validators=[], default=False)
+    thickness = DecimalField('Rim Thickness [mm]', validators=[NumberRange(min=0.5, max=50, message=thickness_error), DataRequired()], default=5)
+    head = DecimalField('Head [module]', validators=[NumberRange(min=0, max=1, message=head_error)], default=0)
+    submit = SubmitField('Generate')
+
 # This class defines type of login details required and Submit button
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -206,42 +265,58 @@ class RegistrationForm(FlaskForm):
         if user is not None:
             raise ValidationError('Please use a different email address.')
         
+# This class contains the load and material of a gear for the strength calculation
+class StrengthForm(FlaskForm):
+
+    # Attribute Error
+    torque_error = "Invalid Input. Input can only be between 0 and 100000"
+    speed_error = "Invalid Input. Input can only be between 0 and 100000"
+
+    # Defining range and type of the load and material
+    torque = DecimalField('Torque [N m]', validators=[NumberRange(min=0, max=100000, message=torque_error)], default=5)
+    speed = DecimalField('Speed [rpm]', validators=[NumberRange(min=0, max=100000, message=speed_error)], default=1000)
+    material = SelectField('Material', choices=[(key, value["name"]) for key, value in MATERIALS.items()], default="steel")
+
 # This inherited class contains erros, parameters and validation specific to Bevel Gear Calculation
-class BevelFormCalc(BevelForm):
+class BevelFormCalc(BevelForm, StrengthForm):
     # Error
     pitch_dia_error = "Invalid Input. Input can only be between 0 and 500"
 
     # Defining range and type of Bevel Gear Attributes and Submit button
     submit = None
+    backend = None
     pitch_dia2 = DecimalField('Pitch Diameter of Mating Gear [mm]', validators=[NumberRange(min=0, max=500, message=pitch_dia_error), DataRequired()]  , default=60)
     submit2 = SubmitField('Calculate')
 
 # This inherited class contains erros, parameters and validation specific to Spur Gear Calculation
-class SpurFormCalc(SpurForm):
+class SpurFormCalc(SpurForm, StrengthForm):
     # Error
     pitch_dia_error = "Oops1"
 
     # Defining range and type of Bevel Gear Attributes and Submit button
     pitch_dia2 = DecimalField('Pitch Diameter of Mating Gear [mm]', validators=[NumberRange(min=0, max=500, message=pitch_dia_error), DataRequired()]  , default=60)
     submit = None
+    backend = None
     submit2 = SubmitField('Calculate')
 
 # This inherited class contains erros, parameters and validation specific to Helix Gear Form
-class HelixFormCalc(HelixForm):
+class HelixFormCalc(HelixForm, StrengthForm):
     # Error
     pitch_dia_error = "Oops1"
 
     # Defining range and type of Bevel Gear Attributes and Submit button
     submit = None
+    backend = None
     pitch_dia2 = DecimalField('Pitch Diameter of Mating Gear [mm]', validators=[NumberRange(min=0, max=500, message=pitch_dia_error), DataRequired()]  , default=60)
     submit2 = SubmitField('Calculate')
 
 # This inherited class contains erros, parameters and validation specific to Double Helix Form
-class DoubleHelixFormCalc(DoubleHelixForm):
+class DoubleHelixFormCalc(DoubleHelixForm, StrengthForm):
     # Error
     pitch_dia_error = "Oops1"
 
     # Defining range and type of Bevel Gear Attributes and Submit button
     submit = None
+    backend = None
     pitch_dia2 = DecimalField('Pitch Diameter of Mating Gear [mm]', validators=[NumberRange(min=0, max=500, message=pitch_dia_error), DataRequired()]  , default=60)
     submit2 = SubmitField('Calculate')
\ No newline at end of file
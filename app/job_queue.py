@@ -0,0 +1,242 @@
+# =============================================================================
+# File Name     : job_queue.py
+# Description   : This module queues gear generation jobs in SQLite and runs
+#                 them on background threads instead of the web request thread
+# =============================================================================
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+# Statuses a job goes through, queued jobs that are no longer wanted are cancelled
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+# Priorities of the jobs, jobs with a lower number are run first. Speculative jobs make gears
+# the user may submit soon and only run when no submitted job waits
+NORMAL, SPECULATIVE = 0, 1
+
+# Seconds between the heartbeats of a runner, and seconds without a heartbeat after which a running
+# job is taken to belong to a stopped process and is queued again
+HEARTBEAT = 5.0
+STALE_AFTER = 30.0
+
+# This class contains the functions to submit, claim and follow generation jobs
+# Every call opens its own connection so the queue can be shared by threads and processes
+# Running jobs name the runner that claimed them, which keeps their heartbeat fresh while it runs
+class JobQueue:
+
+    # Constructor of the queue which creates the jobs table if needed
+    # path: Path of the SQLite database file (type: string)
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, gear_id TEXT, params TEXT, status TEXT, error TEXT,
+                created REAL, started REAL, finished REAL, priority INTEGER NOT NULL DEFAULT 0,
+                owner TEXT, heartbeat REAL)""")
+            # Databases of earlier versions have no priority, owner or heartbeat column
+            for column in ("priority INTEGER NOT NULL DEFAULT 0", "owner TEXT", "heartbeat REAL"):
+                try:
+                    connection.execute("ALTER TABLE jobs ADD COLUMN " + column)
+                except sqlite3.OperationalError:
+                    pass
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    # This function opens a connection to the database and closes it after use
+    # Returns the connection
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    # This function adds a job at the end of the queue of its priority
+    # params:   Gear parameters (type: dict)
+    # gear_id:  ID of the gear the job generates (type: string)
+    # priority: NORMAL or SPECULATIVE (type: int)
+    # Returns the ID of the job
+    def submit(self, params, gear_id=None, priority=NORMAL):
+        job_id = uuid.uuid4().hex
+        with self._connect() as connection:
+            connection.execute("INSERT INTO jobs (id, gear_id, params, status, created, priority) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (job_id, gear_id, json.dumps(params), QUEUED, time.time(), priority))
+        return job_id
+
+    # This function takes the oldest queued job of the highest priority and marks it as running
+    # speculative_limit:    Most speculative jobs running at once, None for no limit (type: int)
+    # owner:                ID of the runner that claims the job (type: string)
+    # Returns the ID and parameters of the job, or None when the queue is empty
+    def claim(self, speculative_limit=None, owner=None):
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            lowest = SPECULATIVE
+            if speculative_limit is not None and connection.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND priority = ?",
+                    (RUNNING, SPECULATIVE)).fetchone()[0] >= speculative_limit:
+                lowest = NORMAL
+            row = connection.execute("SELECT id, params FROM jobs WHERE status = ? AND priority <= ? "
+                "ORDER BY priority, created LIMIT 1", (QUEUED, lowest)).fetchone()
+            if row is not None:
+                now = time.time()
+                connection.execute("UPDATE jobs SET status = ?, started = ?, owner = ?, heartbeat = ? WHERE id = ?",
+                    (RUNNING, now, owner, now, row["id"]))
+            connection.execute("COMMIT")
+        if row is None:
+            return None
+        return row["id"], json.loads(row["params"])
+
+    # This function marks a job as finished
+    # job_id:   ID of the job (type: string)
+    # error:    Error message when the job failed (type: string)
+    # Returns nothing
+    def finish(self, job_id, error=None):
+        with self._connect() as connection:
+            connection.execute("UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ?",
+                (FAILED if error else DONE, error, time.time(), job_id))
+
+    # This function cancels a job that has not started yet
+    # job_id:   ID of the job (type: string)
+    # Returns True if the job was cancelled, False if it already started or does not exist
+    def cancel(self, job_id):
+        with self._connect() as connection:
+            return connection.execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)).rowcount > 0
+
+    # This function gives a queued or running job the normal priority, when it is submitted by its user
+    # job_id:   ID of the job (type: string)
+    # Returns True if the job is still queued or running, else False
+    def promote(self, job_id):
+        with self._connect() as connection:
+            return connection.execute("UPDATE jobs SET priority = ? WHERE id = ? AND status IN (?, ?)",
+                (NORMAL, job_id, QUEUED, RUNNING)).rowcount > 0
+
+    # This function keeps the running jobs of a runner from being taken as left by a stopped process
+    # owner:    ID of the runner (type: string)
+    # Returns the number of running jobs of the runner
+    def heartbeat(self, owner):
+        with self._connect() as connection:
+            return connection.execute("UPDATE jobs SET heartbeat = ? WHERE status = ? AND owner = ?",
+                (time.time(), RUNNING, owner)).rowcount
+
+    # This function puts jobs left running by a stopped process back in the queue
+    # Jobs whose runner still sends heartbeats are left running, whichever process it is in
+    # stale_after:  Seconds without a heartbeat after which a running job is put back (type: float)
+    # owner:        ID of a runner whose running jobs are all put back, None for none (type: string)
+    # Returns the number of jobs put back
+    def requeue_running(self, stale_after=STALE_AFTER, owner=None):
+        with self._connect() as connection:
+            return connection.execute("UPDATE jobs SET status = ?, started = NULL, owner = NULL, heartbeat = NULL "
+                "WHERE status = ? AND (heartbeat IS NULL OR heartbeat < ? OR owner = ?)",
+                (QUEUED, RUNNING, time.time() - stale_after, owner)).rowcount
+
+    # This function gets the status of a job and its position in the queue
+    # job_id:   ID of the job (type: string)
+    # Returns a dictionary with the status of the job, or None if the job does not exist
+    def status(self, job_id):
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            position = 0
+            if row["status"] == QUEUED:
+                position = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority < ? "
+                    "OR priority = ? AND created <= ?)", (QUEUED, row["priority"], row["priority"], row["created"])
+                    ).fetchone()[0]
+        return {"job": row["id"], "ID": row["gear_id"], "status": row["status"], "position": position,
+            "error": row["error"], "created": row["created"], "started": row["started"],
+            "finished": row["finished"], "speculative": row["priority"] == SPECULATIVE}
+
+    # This function counts the jobs of every status
+    # Returns a dictionary with the number of jobs per status
+    def counts(self):
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+# This class contains background threads that run the jobs of a queue
+class JobRunner:
+
+    # Constructor of the runner
+    # queue:        Queue the jobs are taken from (type: JobQueue)
+    # handler:      Function called with the job ID and parameters of each job
+    # workers:      Number of jobs run at the same time (type: int)
+    # on_finish:    Function called with the job ID, parameters and error (None on success) of each job
+    # poll:         Seconds between checks for jobs submitted by other processes (type: float)
+    # speculative_workers:  Most workers running speculative jobs at once, the others are kept
+    #                       free for submitted jobs (type: int)
+    # heartbeat:    Seconds between the heartbeats of the jobs being run (type: float)
+    # stale_after:  Seconds without a heartbeat after which a job of any runner is queued again (type: float)
+    def __init__(self, queue, handler, workers=2, on_finish=None, poll=0.5, speculative_workers=1,
+            heartbeat=HEARTBEAT, stale_after=STALE_AFTER):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.speculative_workers = speculative_workers
+        self.on_finish = on_finish
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.stale_after = stale_after
+        self.owner = uuid.uuid4().hex
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    # This function starts the worker threads and the heartbeat thread
+    # Returns nothing
+    def start(self):
+        for target in [self._run] * self.workers + [self._beat]:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # This function wakes the workers up after a job was submitted
+    # Returns nothing
+    def notify(self):
+        self._wakeup.set()
+
+    # This function stops the worker threads once their current job is done
+    # Returns nothing
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+
+    # This function takes jobs from the queue and runs them until the runner is stopped
+    # Returns nothing
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.queue.claim(self.speculative_workers, self.owner)
+            if job is None:
+                self._wakeup.wait(self.poll)
+                self._wakeup.clear()
+                continue
+
+            job_id, params = job
+            error = None
+            try:
+                self.handler(job_id, params)
+            except Exception as e:
+                traceback.print_exc()
+                error = f"{type(e).__name__}: {e}"
+            self.queue.finish(job_id, error)
+            if self.on_finish:
+                self.on_finish(job_id, params, error)
+
+    # This function keeps the heartbeat of the jobs being run fresh and queues again the jobs of
+    # runners that stopped sending theirs, until the runner is stopped
+    # Returns nothing
+    def _beat(self):
+        while not self._stop.wait(self.heartbeat):
+            self.queue.heartbeat(self.owner)
+            if self.queue.requeue_running(self.stale_after):
+                self.notify()
@@ -0,0 +1,196 @@
+# =============================================================================
+# File Name     : mesh_raster.py
+# Description   : This module renders triangle meshes into RGB images with NumPy,
+#                 using flat shading and a depth buffer, for the gear previews
+# =============================================================================
+
+import math
+import numpy as np
+
+# This function computes the camera axes of a view like matplotlib's view_init
+# elevation:    Angle of the camera above the xy plane in degrees (type: float)
+# azimuth:      Angle of the camera around the z axis in degrees (type: float)
+# Returns the right, up and towards-the-camera unit vectors as a (3, 3) NumPy array
+def view_axes(elevation, azimuth):
+    elev, azim = math.radians(elevation), math.radians(azimuth)
+    eye = np.array([math.cos(elev) * math.cos(azim), math.cos(elev) * math.sin(azim), math.sin(elev)])
+    right = np.array([-math.sin(azim), math.cos(azim), 0.0])
+    up = np.cross(eye, right)
+    return np.stack([right, up, eye])
+
+# This function computes the unit normal of every triangle
+# vectors:  Triangles as a NumPy array of shape (triangles, 3, 3)
+# normals:  Normals stored with the mesh, recomputed where they are zero (NumPy array of shape (triangles, 3))
+# Returns the unit normals as a NumPy array of shape (triangles, 3)
+def unit_normals(vectors, normals=None):
+    if normals is None:
+        normals = np.cross(vectors[:, 1] - vectors[:, 0], vectors[:, 2] - vectors[:, 0])
+    length = np.linalg.norm(normals, axis=1)
+    missing = length == 0
+    if missing.any():
+        normals = normals.copy()
+        normals[missing] = np.cross(vectors[missing, 1] - vectors[missing, 0], vectors[missing, 2] - vectors[missing, 0])
+        length = np.linalg.norm(normals, axis=1)
+    return normals / np.maximum(length, 1e-12)[:, None]
+
+# This function fills triangles into a depth buffer and a buffer of the nearest triangle
+# Every triangle is cut into the pixel rows it covers and every row into its pixels, all at
+# once, so the work follows the number of covered pixels; the nearest triangle of each pixel wins
+# screen:   Triangles in pixel coordinates as a NumPy array of shape (triangles, 3, 2)
+# depth:    Depth of every corner, larger is nearer (NumPy array of shape (triangles, 3))
+# zbuffer:  Depth buffer, updated in place (NumPy array of shape (height * width,))
+# owner:    Index of the nearest triangle of every pixel, updated in place (NumPy array of shape (height * width,))
+# width:    Width of the image in pixels (type: int)
+# height:   Height of the image in pixels (type: int)
+# Returns nothing
+def fill_triangles(screen, depth, zbuffer, owner, width, height):
+    # Corners sorted from top to bottom: the long edge goes from the first to the last corner,
+    # the two short edges meet at the middle one
+    order = np.argsort(screen[..., 1], axis=1)
+    corners = np.take(screen.reshape(-1, 2), order + 3 * np.arange(len(screen))[:, None], axis=0)
+    (xt, yt), (xm, ym), (xb, yb) = corners[:, 0].T, corners[:, 1].T, corners[:, 2].T
+    long_slope = (xb - xt) / np.where(yb > yt, yb - yt, 1.0)
+    upper_slope = (xm - xt) / np.where(ym > yt, ym - yt, 1.0)
+    lower_slope = (xb - xm) / np.where(yb > ym, yb - ym, 1.0)
+
+    # Depth plane of every triangle, z = z0 + dzdx * x + dzdy * y
+    x, y = screen[..., 0], screen[..., 1]
+    dx1, dy1, dz1 = x[:, 1] - x[:, 0], y[:, 1] - y[:, 0], depth[:, 1] - depth[:, 0]
+    dx2, dy2, dz2 = x[:, 2] - x[:, 0], y[:, 2] - y[:, 0], depth[:, 2] - depth[:, 0]
+    area = dx1 * dy2 - dy1 * dx2
+    flat = np.abs(area) < 1e-12
+    area[flat] = 1.0
+    dzdx = (dz1 * dy2 - dz2 * dy1) / area
+    dzdy = (dz2 * dx1 - dz1 * dx2) / area
+    z0 = depth[:, 0] - dzdx * x[:, 0] - dzdy * y[:, 0]
+
+    # Pixel rows whose centre lies inside the triangle. Rows above the middle corner face the upper
+    # short edge and the others the lower one, so every triangle is cut into these two parts, and
+    # each part lies between two straight edges, x = a + b * y
+    first_row = np.maximum(np.ceil(yt - 0.5), 0).astype(np.int64)
+    last_row = np.minimum(np.ceil(yb - 0.5) - 1, height - 1).astype(np.int64)
+    middle_row = np.minimum(np.maximum(np.ceil(ym - 0.5).astype(np.int64), first_row), last_row + 1)
+    rows = np.stack([middle_row - first_row, last_row + 1 - middle_row], axis=1)
+    rows[flat] = 0
+    rows = np.maximum(rows, 0).ravel()
+    part_first = np.stack([first_row, middle_row], axis=1).ravel()
+    long_a = xt - yt * long_slope
+    short_a = np.stack([xt - yt * upper_slope, xm - ym * lower_slope], axis=1).ravel()
+    short_b = np.stack([upper_slope, lower_slope], axis=1).ravel()
+
+    # Every row of every part. np.repeat is slow on short runs, so it only finds the part of every
+    # row, and the values of the parts are gathered with np.take
+    part = np.repeat(np.arange(len(rows)), rows)
+    tri = (part // 2).astype(owner.dtype)
+    row = np.arange(part.size) + np.take(part_first - (np.cumsum(rows) - rows), part)
+    centre = row + 0.5
+    long_x = np.take(long_a, tri) + np.take(long_slope, tri) * centre
+    short_x = np.take(short_a, part) + np.take(short_b, part) * centre
+    first_col = np.maximum(np.ceil(np.minimum(long_x, short_x) - 0.5), 0).astype(np.int64)
+    last_col = np.minimum(np.ceil(np.maximum(long_x, short_x) - 0.5) - 1, width - 1).astype(np.int64)
+    cols = np.maximum(last_col - first_col + 1, 0)
+
+    # Every pixel of every span with its depth. The pixels of a span follow each other, so their
+    # index and depth grow by the same step from the start of the span
+    span = np.repeat(np.arange(len(cols)), cols)
+    start = np.cumsum(cols) - cols
+    index = np.arange(span.size)
+    pixel = index + np.take(row * width + first_col - start, span)
+    slope = np.take(dzdx, tri)
+    z = index * np.take(slope, span) + np.take(np.take(z0, tri) + np.take(dzdy, tri) * centre + slope * (first_col + 0.5 - start), span)
+
+    np.maximum.at(zbuffer, pixel, z)
+    nearest = z >= np.take(zbuffer, pixel)
+    owner[pixel[nearest]] = np.take(tri, span[nearest])
+
+# This function finds the edges of the triangles that are not hidden behind other faces
+# A visible edge lies where the nearest triangle changes from one pixel to the next one
+# owner:    Index of the nearest triangle of every pixel, -1 for the background (NumPy array of shape (height * width,))
+# width:    Width of the image in pixels (type: int)
+# height:   Height of the image in pixels (type: int)
+# Returns a boolean NumPy array of shape (height * width,), true for the pixels of the lines
+def visible_edges(owner, width, height):
+    grid = owner.reshape(height, width)
+    edge = np.zeros((height, width), dtype=bool)
+    across = grid[:, :-1] != grid[:, 1:]
+    down = grid[:-1] != grid[1:]
+    edge[:, :-1] |= across
+    edge[:-1] |= down
+
+    # On the outline the line is drawn on the mesh side, not on the background
+    edge[:, 1:] |= across & (grid[:, :-1] < 0)
+    edge[1:] |= down & (grid[:-1] < 0)
+    edge &= grid >= 0
+    return edge.reshape(-1)
+
+# This function renders a mesh seen from one view
+# vectors:      Triangles as a NumPy array of shape (triangles, 3, 3)
+# normals:      Normals of the triangles, or None to compute them (NumPy array of shape (triangles, 3))
+# elevation:    Angle of the camera above the xy plane in degrees (type: float)
+# azimuth:      Angle of the camera around the z axis in degrees (type: float)
+# width:        Width of the image in pixels (type: int)
+# height:       Height of the image in pixels (type: int)
+# mesh_color:   RGB color of the faces with values between 0 and 1
+# line_color:   RGB color of the edges, or None to draw no edges
+# line_alpha:   Opacity of the edges between 0 and 1 (type: float)
+# background:   RGB color of the background with values between 0 and 1
+# supersample:  Rendering scale used for anti-aliasing (type: int)
+# extent:       Half size of the scene that fits the image, by default the size of the mesh (type: float)
+# cull:         Leave out the faces turned away from the camera, for closed meshes (type: bool)
+# Returns the image as a NumPy array of shape (height, width, 3) of uint8
+def render(vectors, normals=None, elevation=30, azimuth=-60, width=640, height=480,
+        mesh_color=(0.75, 0.75, 0.75), line_color=(1.0, 0.0, 0.0), line_alpha=0.35,
+        background=(1.0, 1.0, 1.0), supersample=1, extent=None, cull=True):
+    vectors = np.asarray(vectors, dtype=np.float64)
+    axes = view_axes(elevation, azimuth)
+    normals = unit_normals(vectors, None if normals is None else np.asarray(normals, dtype=np.float64))
+
+    # Orthographic projection of all corners at once, as one product of (corners, 3) by (3, 3)
+    projected = (vectors.reshape(-1, 3) @ axes.T).reshape(vectors.shape)
+    if extent is None:
+        extent = max(float(np.abs(projected[..., :2]).max()), 1e-9)
+    w, h = width * supersample, height * supersample
+    scale = 0.45 * min(w, h) / extent
+    screen = np.empty(projected.shape[:2] + (2,))
+    screen[..., 0] = w / 2 + projected[..., 0] * scale
+    screen[..., 1] = h / 2 - projected[..., 1] * scale
+    depth = projected[..., 2]
+
+    # Faces turned away from the camera are hidden by the front of a closed mesh
+    if cull:
+        front = normals @ axes[2] > -1e-9
+        screen, depth, normals = screen[front], depth[front], normals[front]
+
+    # Flat shading lit from the camera and slightly above, both sides of a face are lit
+    light = axes[2] + 0.5 * axes[1]
+    light /= np.linalg.norm(light)
+    shade = 0.35 + 0.65 * np.abs(normals @ light)
+    colors = np.asarray(mesh_color, dtype=np.float64)[None, :] * shade[:, None]
+
+    # Only the box around the mesh is rasterized, with a margin of one pixel so its outline is
+    # still found, the rest of the image is background
+    if len(screen):
+        left, top = np.clip(np.floor(screen.reshape(-1, 2).min(axis=0)) - 1, 0, (w, h)).astype(int)
+        right, bottom = np.clip(np.ceil(screen.reshape(-1, 2).max(axis=0)) + 1, (left, top), (w, h)).astype(int)
+    else:
+        left = top = right = bottom = 0
+    box_w, box_h = right - left, bottom - top
+    zbuffer = np.full(box_w * box_h, -np.inf)
+    owner = np.full(box_w * box_h, -1, dtype=np.int32)
+    fill_triangles(screen - (left, top), depth, zbuffer, owner, box_w, box_h)
+
+    # Colors of the nearest triangles, then the same colors under the lines, the last entry of the
+    # palette is the background. Every pixel is looked up once in the palette
+    palette = np.round(colors * 255)
+    index = owner
+    if line_color is not None:
+        lined = np.round(palette * (1 - line_alpha) + np.asarray(line_color, dtype=np.float64) * (255 * line_alpha))
+        palette = np.vstack([palette, lined])
+        index = owner + visible_edges(owner, box_w, box_h) * np.int32(len(colors))
+    palette = np.vstack([palette, np.round(np.asarray(background, dtype=np.float64) * 255)]).astype(np.uint8)
+    image = np.empty((h, w, 3), dtype=np.uint8)
+    image.reshape(h, w * 3)[:] = np.tile(palette[-1], w)
+    image[top:bottom, left:right] = np.take(palette, index, axis=0).reshape(box_h, box_w, 3)
+    if supersample > 1:
+        image = np.round(image.reshape(height, supersample, width, supersample, 3).mean(axis=(1, 3))).astype(np.uint8)
+    return image
@@ -5,15 +5,34 @@
 
 import sys
 from app.Backend_FreeCAD.gear import BevelGear, InvoluteGear, WormGear
+from app.Backend_FreeCAD.gear_search import search as search_mates
+from app.Backend_FreeCAD.gear_mesh import analyse_batch
+from app.Backend_FreeCAD.gear_strength import evaluate as evaluate_strength, sweep as sweep_strength, strong_enough
+from app.Backend_FreeCAD.artifact_cache import ArtifactCache, stl_info
+from app.Backend_FreeCAD.gear_outline import OUTLINE_FORMATS, OUTLINE_TYPES, export as export_outline
+from app.Backend_FreeCAD.Running import main as generate_gear, main_batch, validate
+from app.Backend_FreeCAD.gear_train import plan as plan_train, train_gears, train_id
+from app.Backend_FreeCAD.planetary import assembly as planetary_assembly, plan as plan_planetary, planetary_gears, planetary_id
+from app.Backend_FreeCAD.assembly import ASSEMBLY_FORMATS, publish as publish_assembly
+from app.Backend_FreeCAD.gear_pair import PAIR_TYPES, assembly as pair_assembly, concurrent, pair_gears, pair_id
+from app.Backend_FreeCAD.workspace import Workspace, clean_stale
+from app.Backend_FreeCAD.gear_params import gear_id, WHEEL_SUFFIX
+from app.job_queue import SPECULATIVE, JobQueue, JobRunner
+from app.socket_rooms import RoomTracker
+from app.speculation import Speculator
+from app.stl_to_gif import stream_views
 sys.path.append("app/Backend_FreeCAD/")
-from flask import render_template, flash, send_from_directory, abort, request, redirect, url_for
+# The generators import gear_profile from the backend folder, the profiles kept are counted in that module
+import gear_profile
+from flask import render_template, flash, send_from_directory, abort, request, redirect, url_for, jsonify
 from app import app
 from app import forms
-from shutil import copyfile
-from flask_socketio import SocketIO, emit
-import subprocess
+from flask_socketio import SocketIO, emit, join_room
+from werkzeug.datastructures import MultiDict
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from decimal import Decimal
 from flask_login import current_user, login_user, logout_user
 from app.models import User, Gear
@@ -24,42 +43,248 @@ from pprint import pprint
 
 
 db = SQLAlchemy(app)
-# ---------------------------------------------------------------------------------
-# This little script will look for freecad so we don't have to manually code
-# in the path
-
-for root, dir, files in os.walk(r"C:\Program Files"):
-      if "FreeCADCmd.exe" in files:
-         freecad = os.path.join(root, "FreeCADCmd.exe")
-         break
-         
-if freecad:
-    print(f"Found FreeCadCmd.exe at {freecad}")
-    
-else:
-    raise OSError("Can't find FreeCADCmd.exe")
+
+# Generated gears are looked up by their full parameters before FreeCAD is run
+cache = ArtifactCache(os.path.join(os.path.dirname(__file__), "Backend_FreeCAD", "Part_files"),
+    os.path.join(os.path.dirname(__file__), "static", "gear_output_gifs"))
 # ---------------------------------------------------------------------------------
 
 # Web App Socket IO Communication
 
 socketio = SocketIO(app)
 
-# This function prints loading on successful to console window on successful connection
+# Every job has a Socket.IO room named after its job ID, joined by the page that submitted it
+rooms = RoomTracker()
+
+# This function is called by the page of a submitted gear once it is connected
+# The page joins the room of its job and only this page is told to show the loading screen
+# message:  Dictionary with the job ID of the page
 @socketio.on('success')
-def success():
+def success(message=None):
     print("success")
-    socketio.emit('loading')
+    job_id = (message or {}).get('job')
+    if job_id:
+        join_room(job_id)
+        rooms.join(request.sid, job_id)
+    emit('loading')
+    rooms.record(1)
+
+    # The job was validated before it was queued, its place in the queue is sent along
+    status = jobs.status(job_id or '')
+    if status:
+        emit('progress', {"job": job_id, "stage": "validated"})
+        rooms.record(1)
+
+        # The 2D outline drawn when the job was submitted is shown while the 3D model is made
+        if os.path.isfile(cache.outline_path(status['ID'], 'svg')):
+            with open(cache.outline_path(status['ID'], 'svg')) as file:
+                emit('outline', {"job": job_id, "svg": file.read()})
+            rooms.record(1)
+        if status['status'] == 'queued':
+            emit('progress', {"job": job_id, "stage": "queued", "position": status['position']})
+            rooms.record(1)
 
-# This function prints a message to console window when generate button is clicked
+# This function is called when the page of a submitted gear starts waiting for it
+# The 'done' event is sent when the job finishes, or right away if it already has
 @socketio.on('generate')
 def generate(message):
-    print("generating models")
-    generate_model(message['data'])
-    socketio.emit('done')
+    print("waiting for models")
+    status = jobs.status(message.get('job', ''))
+    if status and status['status'] in ('done', 'failed'):
+        emit('done', status)
+        rooms.record(1)
+
+# This function is called with the form fields while the user edits them, the page sends them once
+# the user stops typing. A snapshot that passes validation starts a speculative job of its gear
+# when the gear was not made before and the user has budget left. The speculative job of the
+# previous snapshot of the user is cancelled if it has not started yet
+# message:  Dictionary with the form type and the form fields
+@socketio.on('snapshot')
+def snapshot(message):
+    form_type = (message or {}).get('form_type')
+    if form_type not in GEAR_FORMS:
+        return
+    form = GEAR_FORMS[form_type][0](MultiDict(message.get('fields') or {}))
+    if not form.validate():
+        return
+    json_data = form_params(form_type, form)
+    try:
+        validate(json_data)
+    except (ValueError, TypeError):
+        return
+    ID = gear_id(json_data)
+    user = current_user.username if current_user.is_authenticated else request.sid
+    if (cache.has_stl(ID) and cache.has_previews(ID)) or not speculator.wanted(user, ID):
+        return
+
+    json_data["ID"] = ID
+    job_id = jobs.submit(json_data, ID, priority=SPECULATIVE)
+    previous = speculator.started(user, job_id, ID)
+    if previous and jobs.cancel(previous):
+        speculator.cancelled(previous)
+    runner.notify()
+
+# This function forgets the rooms of a page that was closed
+@socketio.on('disconnect')
+def disconnect():
+    rooms.leave_all(request.sid)
+
+# ---------------------------------------------------------------------------------
+
+#   Generation Jobs
+# This function makes the function which sends the progress of a job to the page that submitted it
+# job_id:   ID of the job (type: string)
+# Returns a function of the stage name and its details
+def job_progress(job_id):
+    def progress(stage, **info):
+        socketio.emit('progress', dict(info, job=job_id, stage=stage), to=job_id)
+        rooms.fanout(job_id)
+    return progress
+
+# This function generates the gear and its previews of a queued job
+# job_id:   ID of the job (type: string)
+# params:   Gear parameters with the ID of the gear (type: dict)
+# Returns nothing
+def run_generation(job_id, params):
+    if params.get('gear_type') == 'train':
+        return run_train(job_id, params)
+    if params.get('gear_type') == 'planetary':
+        return run_planetary(job_id, params)
+    if params.get('gear_type') == 'pair':
+        return run_pair(job_id, params)
+    ID = params['ID']
+    progress = job_progress(job_id)
+    progress("started")
+    if not cache.has_stl(ID):
+        generate_gear(params, progress)
+    else:
+        progress("stl_exported", cached=True, **stl_info(cache.stl_path(ID)))
+        if cache.has_stl(ID + WHEEL_SUFFIX):
+            progress("wheel_exported", cached=True, **stl_info(cache.stl_path(ID + WHEEL_SUFFIX)))
+    generate_model(ID, progress)
+
+# This function generates every gear of a gear train job and their previews
+# The gears not generated before are made in one batch, the progress of each gear names its ID
+# job_id:   ID of the job (type: string)
+# params:   Gear parameters of the train with the gears and the ID of the train (type: dict)
+# Returns nothing
+# Raises RuntimeError when a gear of the train could not be generated
+def run_train(job_id, params):
+    progress = job_progress(job_id)
+    gears = params['gears']
+    progress("started", gears=len(gears))
+    failed = []
+
+    # This function reports a gear of the batch as soon as it is done
+    # result:   Result of one gear (type: dict)
+    # Returns nothing
+    def gear_done(result):
+        if result['status'] != 'ok':
+            failed.append(f"{result['ID']}: {result.get('error')}")
+        else:
+            progress("stl_exported", gear=result['ID'], **stl_info(result['path']))
+
+    main_batch([spec for spec in gears if not cache.has_stl(spec['ID'])], on_result=gear_done)
+    for spec in gears:
+        if cache.has_stl(spec['ID']):
+            generate_model(spec['ID'], lambda stage, ID=spec['ID'], **info: progress(stage, gear=ID, **info))
+    if failed:
+        raise RuntimeError("Gear generation failed. " + "; ".join(failed))
+
+# This function generates the gears of an assembly job, the ones generated before are taken as they are
+# The progress of each gear names its ID
+# gears:        Gear parameters with the IDs of the gears (type: list of dict)
+# progress:     Function called with the name and details of each stage of the job (type: function)
+# parallel:     True to generate the gears at the same time, else one after the other (type: bool)
+# Returns nothing
+def generate_parts(gears, progress, parallel=True):
+
+    # This function generates one gear and reports its stages with its ID
+    # spec:     Gear parameters with the ID of the gear (type: dict)
+    # Returns the path of the .stl
+    def make(spec):
+        if cache.has_stl(spec['ID']):
+            progress("stl_exported", cached=True, gear=spec['ID'], **stl_info(cache.stl_path(spec['ID'])))
+            return cache.stl_path(spec['ID'])
+        return generate_gear(spec, lambda stage, **info: progress(stage, gear=spec['ID'], **info))
+
+    with ThreadPoolExecutor(max_workers=len(gears) if parallel else 1) as executor:
+        list(executor.map(make, gears))
+
+# This function generates the sun, planet and ring of a planetary job at the same time, then the
+# assembly with the planet placed at every planet, and the previews of the assembly
+# job_id:   ID of the job (type: string)
+# params:   Gear parameters of the sun, planet and ring, the number of planets and the ID of the set (type: dict)
+# Returns nothing
+def run_planetary(job_id, params):
+    progress = job_progress(job_id)
+    gears = params['gears']
+    progress("started", gears=len(gears))
+    generate_parts(gears, progress)
+    if not cache.has_stl(params['ID']):
+        publish_assembly(planetary_assembly(gears, params['planets'], cache.stl_dir), params['ID'], cache.stl_dir)
+    progress("stl_exported", gear=params['ID'], **stl_info(cache.stl_path(params['ID'])))
+    generate_model(params['ID'], progress)
+
+# This function generates a gear and its mating gear, at the same time when they do not share a FreeCAD
+# template, then the pair in mesh at the centre distance and its previews
+# job_id:   ID of the job (type: string)
+# params:   Gear parameters of the gear and its mating gear and the ID of the pair (type: dict)
+# Returns nothing
+def run_pair(job_id, params):
+    progress = job_progress(job_id)
+    gears = params['gears']
+    progress("started", gears=len(gears))
+    generate_parts(gears, progress, parallel=concurrent(gears))
+    if not cache.has_stl(params['ID']):
+        publish_assembly(pair_assembly(gears, cache.stl_dir), params['ID'], cache.stl_dir)
+    progress("stl_exported", gear=params['ID'], **stl_info(cache.stl_path(params['ID'])))
+    generate_model(params['ID'], progress)
+
+# This function tells the page that submitted a job that it has finished
+# job_id:   ID of the job (type: string)
+# params:   Gear parameters with the ID of the gear (type: dict)
+# error:    Error message when the job failed (type: string)
+# Returns nothing
+def job_finished(job_id, params, error):
+    speculator.finished(job_id)
+    socketio.emit('done', jobs.status(job_id), to=job_id)
+    rooms.fanout(job_id)
+    rooms.close(job_id)
+
+jobs = JobQueue(app.config['JOB_QUEUE_DATABASE'])
+jobs.requeue_running()
+clean_stale()
+runner = JobRunner(jobs, run_generation, workers=app.config['JOB_WORKERS'], on_finish=job_finished,
+    speculative_workers=app.config['SPECULATIVE_WORKERS'])
+speculator = Speculator(budget=app.config['SPECULATION_BUDGET'])
+runner.start()
     
 socketio.run(app)
 # ---------------------------------------------------------------------------------
 
+#   2D Outlines
+# This function draws the 2D outline of a gear as .svg and .dxf next to its .stl
+# Outlines drawn before are kept, they are written in a scratch directory and published once complete
+# params:   Gear parameters with the ID of the gear (type: dict)
+# Returns the .svg as a string, or None when the gear has no 2D outline
+def publish_outline(params):
+    ID = params['ID']
+    if params.get('gear_type') not in OUTLINE_TYPES:
+        return None
+    try:
+        if not all(os.path.isfile(cache.outline_path(ID, fmt)) for fmt in OUTLINE_FORMATS):
+            with Workspace() as workspace:
+                for fmt in OUTLINE_FORMATS:
+                    export_outline(params, fmt, workspace.file(f"{ID}.{fmt}"))
+                    workspace.publish(f"{ID}.{fmt}", cache.stl_dir)
+    except ValueError:
+        return None
+    with open(cache.outline_path(ID, 'svg')) as file:
+        return file.read()
+
+# ---------------------------------------------------------------------------------
+
 #   Routing
 # This function renders the first page on opening website
 # Returns the spur gear form on first opening the page 
@@ -77,6 +302,10 @@ def calculate(form_type = "spur_form"):
     gear_name = None
     my_gear = None
     other_gear = None 
+    mates = []
+    strength = None
+    meshing = None
+    pair = None
     
     # Choosing and parsing Gear Form according to method
     if form_type == "spur_form":
@@ -108,16 +337,18 @@ def calculate(form_type = "spur_form"):
                 hole_diameter = form.hole_dia.data,
                 gear_type = gear_name)
             
-            other_teeth = float(form.pitch_dia2.data)/my_gear.get_module()
+            other_teeth, other_pitch, mates = mating_gears(form, my_gear.get_module())
             
             other_gear = InvoluteGear(
                 teeth_number = other_teeth, 
                 pressure_angle = form.pressure_angle.data,
-                pitch_diameter = form.pitch_dia2.data,
+                pitch_diameter = other_pitch,
                 clearance = form.clearance.data,
                 hole_diameter = form.hole_dia.data,
                 gear_type = gear_name)
             
+            meshing = my_gear.get_mesh_analysis(other_gear)
+
             pprint(vars(my_gear))
             pprint(vars(other_gear))
             
@@ -141,17 +372,273 @@ def calculate(form_type = "spur_form"):
                 gear_type = gear_name,
                 )
             
-            other_teeth = float(form.pitch_dia2.data/my_gear.get_module())
+            other_teeth, other_pitch, mates = mating_gears(form, my_gear.get_module())
             
             other_gear = BevelGear(
                 teeth_number = other_teeth, 
                 pressure_angle = form.pressure_angle.data,
-                pitch_diameter = form.pitch_dia2.data,
+                pitch_diameter = other_pitch,
                 clearance = form.clearance.data,
                 hole_diameter = form.hole_dia.data,
                 gear_type = gear_name)
+
+        # Stresses of the gear pair under the load of the form
+        if other_gear is not None:
+            strength = pair_strength(form, my_gear, other_gear)
+
+        # Parameters of the pair that can be generated in mesh from the page
+        gear_type = form_type[:-len("_form")]
+        if gear_type in PAIR_TYPES and other_gear is not None:
+            pair = {key: value for key, value in form_params(form_type, form).items() if key in ("gear_type",
+                "num_teeth", "pitch_dia", "hole_dia", "height", "pressure_angle", "clearance", "angle_teeth")}
+            pair["mate_teeth"] = int(round(other_gear.teeth_number))
                     
-    return render_template("calc.html", title = "Engineering Calculation", gear_form = form, my_gear = my_gear, other_gear = other_gear, gear_name = gear_name)
+    return render_template("calc.html", title = "Engineering Calculation", gear_form = form, my_gear = my_gear, other_gear = other_gear, gear_name = gear_name, mates = mates, strength = strength, meshing = meshing, pair = pair)
+
+# This function estimates the stresses of a gear pair of a calculation form
+# form:         Validated calculation form with torque, speed and material (type: FlaskForm)
+# my_gear:      Gear the torque is applied to (type: Gear)
+# other_gear:   Mating gear (type: Gear)
+# Returns a dictionary with the stresses and safety factors as floats, and whether both factors reach 1
+def pair_strength(form, my_gear, other_gear):
+    result = evaluate_strength(my_gear.teeth_number, my_gear.get_module(), float(form.height.data),
+        float(form.torque.data), float(form.speed.data), float(form.pressure_angle.data),
+        mate_teeth=other_gear.teeth_number, material=form.material.data)
+    strength = {name: float(value) for name, value in result.items()}
+    strength["strong_enough"] = bool(strong_enough(result))
+    return strength
+
+# This function finds the mating gear of a calculation form with a whole number of teeth, and the
+# best standard pairs for the ratio and centre distance the two pitch diameters give
+# form:     Validated calculation form with pitch_dia2 (type: FlaskForm)
+# module:   Module of the gear of the form (type: float)
+# Returns the teeth number and pitch diameter of the mating gear and the standard pairs
+def mating_gears(form, module):
+    pitch_dia, pitch_dia2 = float(form.pitch_dia.data), float(form.pitch_dia2.data)
+    ratio = pitch_dia2 / pitch_dia
+    nearest = search_mates(ratio=ratio, teeth=form.num_teeth.data, modules=[module], allow_undercut=True, limit=1)
+    if nearest:
+        other_teeth, other_pitch = nearest[0]["mate_teeth"], nearest[0]["mate_pitch_diameter"]
+    else:
+        other_teeth, other_pitch = pitch_dia2 / module, pitch_dia2
+    mates = search_mates(ratio=ratio, centre_distance=(pitch_dia + pitch_dia2) / 2,
+        pressure_angle=form.pressure_angle.data)
+    return other_teeth, other_pitch, mates
+
+# This function searches the Pareto-best pairs of gears for a ratio and/or centre distance
+# Query arguments: ratio, centre_distance, pressure_angle, teeth, allow_undercut and limit
+# Returns the pairs ranked by ratio error as json
+# Raises a 400 error with a message when the arguments give no search
+@app.route('/api/mates')
+def api_mates():
+    try:
+        mates = search_mates(ratio=request.args.get("ratio", type=float),
+            centre_distance=request.args.get("centre_distance", type=float),
+            pressure_angle=request.args.get("pressure_angle", 20, type=float),
+            teeth=request.args.get("teeth", type=int),
+            allow_undercut=request.args.get("allow_undercut", "false").lower() == "true",
+            limit=min(request.args.get("limit", 10, type=int), 100))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(mates)
+
+# This function converts an array to nested lists for json, with None where the array is NaN
+# array:    Array of numbers or booleans (type: array)
+# Returns the nested lists
+def json_array(array):
+    if array.dtype == bool:
+        return array.tolist()
+    return np.where(np.isfinite(array), array, None).tolist()
+
+# This function simulates many pairs of spur gears in mesh
+# Query arguments: teeth and mate_teeth as comma separated lists of the same length, module,
+# pressure_angle, clearance, backlash and centre_offset, the distance added to the pitch radii
+# Returns the contact ratio, tip interference, smallest backlash and transmission error of each pair as json
+# Raises a 400 error with a message when an argument is not valid
+@app.route('/api/mesh')
+def api_mesh():
+    try:
+        teeth = [int(value) for value in request.args.get("teeth", "").split(",") if value.strip()]
+        mate_teeth = [int(value) for value in request.args.get("mate_teeth", "").split(",") if value.strip()]
+        if not teeth or len(teeth) != len(mate_teeth) or len(teeth) > 5000:
+            raise ValueError("Between 1 and 5000 teeth and mate_teeth of the same length are needed")
+        if min(teeth + mate_teeth) < 2:
+            raise ValueError("Gears need at least 2 teeth")
+        module = request.args.get("module", 1, type=float)
+        if not module > 0:
+            raise ValueError("The module must be a positive number")
+        offset = request.args.get("centre_offset", 0, type=float)
+        results = analyse_batch([{"teeth": a, "mate_teeth": b, "module": module,
+            "pressure_angle": request.args.get("pressure_angle", 20, type=float),
+            "clearance": request.args.get("clearance", 0.12, type=float),
+            "backlash": request.args.get("backlash", 0, type=float),
+            "centre_distance": module * (a + b) / 2 + offset} for a, b in zip(teeth, mate_teeth)])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(results)
+
+# This function evaluates the strength of every combination of teeth, modules and face widths
+# Query arguments: teeth, module and face_width as comma separated lists, torque, speed,
+# pressure_angle, mate_teeth, material, mate_material and min_safety
+# Returns the three lists and every result as an array of shape (teeth, modules, face widths) as json
+# Raises a 400 error with a message when an argument is not valid
+@app.route('/api/strength')
+def api_strength():
+    try:
+        axes = {}
+        for name in ("teeth", "module", "face_width"):
+            axes[name] = [float(value) for value in request.args.get(name, "").split(",") if value.strip()]
+            if not axes[name] or len(axes[name]) > 1000:
+                raise ValueError(f"Between 1 and 1000 values of {name} are needed")
+        if len(axes["teeth"]) * len(axes["module"]) * len(axes["face_width"]) > 1000000:
+            raise ValueError("The sweep can have at most 1000000 designs")
+        result = sweep_strength(axes["teeth"], axes["module"], axes["face_width"],
+            torque=request.args.get("torque", 5, type=float), speed=request.args.get("speed", 1000, type=float),
+            pressure_angle=request.args.get("pressure_angle", 20, type=float),
+            mate_teeth=request.args.get("mate_teeth", type=float),
+            material=request.args.get("material", "steel"), mate_material=request.args.get("mate_material"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    body = dict(axes)
+    body.update({name: json_array(values) for name, values in result.items()})
+    body["strong_enough"] = json_array(strong_enough(result, request.args.get("min_safety", 1, type=float)))
+    return jsonify(body)
+
+# This function plans compound gear trains for an overall ratio
+# Query arguments: ratio, max_stages, min_teeth, max_teeth, module, pressure_angle,
+# max_centre_distance, max_diameter, max_stage_ratio, tolerance and limit
+# Returns the trains, best first, as json
+# Raises a 400 error with a message when the arguments give no plan
+@app.route('/api/train')
+def api_train():
+    try:
+        trains = plan_train(request.args.get("ratio", 0, type=float),
+            max_stages=request.args.get("max_stages", 3, type=int),
+            teeth_range=(request.args.get("min_teeth", 2, type=int), request.args.get("max_teeth", 100, type=int)),
+            module=request.args.get("module", 1, type=float),
+            pressure_angle=request.args.get("pressure_angle", 20, type=float),
+            max_centre_distance=request.args.get("max_centre_distance", type=float),
+            max_diameter=request.args.get("max_diameter", type=float),
+            max_stage_ratio=request.args.get("max_stage_ratio", type=float),
+            tolerance=request.args.get("tolerance", 1e-3, type=float),
+            limit=min(request.args.get("limit", 5, type=int), 50))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(trains)
+
+# This function queues the generation of every gear of a chosen train as one job
+# The json body has the stages (teeth and mate_teeth of each), the module, and the height,
+# hole_dia, pressure_angle, clearance, angle_teeth, reverse_pitch and backend shared by the gears
+# Returns the job ID and the IDs of the gears as json
+# Raises a 400 error with a message when a gear of the train is invalid
+@app.route('/api/train', methods=['POST'])
+def api_train_generate():
+    body = request.get_json(silent=True) or {}
+    try:
+        gear = {key: body[key] for key in ("height", "hole_dia", "pressure_angle", "clearance", "angle_teeth",
+            "reverse_pitch", "backend") if key in body}
+        gears = train_gears(body.get("stages") or [], float(body.get("module", 1)), **gear)
+        if not gears:
+            raise ValueError("The train has no stages")
+        for spec in gears:
+            validate(spec)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    ID = train_id(gears)
+    job_id = jobs.submit({"gear_type": "train", "gears": gears, "ID": ID}, ID)
+    runner.notify()
+    return jsonify({"job": job_id, "ID": ID, "gears": [spec["ID"] for spec in gears]}), 202
+
+# This function plans planetary sets (sun, planets and ring) for a ratio
+# Query arguments: ratio, planets, module, min_teeth, max_teeth, pressure_angle, tolerance and limit
+# Returns the sets, best first, as json
+# Raises a 400 error with a message when the arguments give no set
+@app.route('/api/planetary')
+def api_planetary():
+    try:
+        sets = plan_planetary(request.args.get("ratio", 0, type=float),
+            planets=request.args.get("planets", 3, type=int),
+            module=request.args.get("module", 1, type=float),
+            teeth_range=(request.args.get("min_teeth", 2, type=int), request.args.get("max_teeth", 100, type=int)),
+            pressure_angle=request.args.get("pressure_angle", 20, type=float),
+            tolerance=request.args.get("tolerance", 1e-3, type=float),
+            limit=min(request.args.get("limit", 5, type=int), 50))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(sets)
+
+# This function queues the generation of a planetary set and its assembly as one job
+# The json body has the ratio, or the sun and planet teeth, the number of planets and the module, and
+# the height, hole_dia, pressure_angle, clearance, thickness of the ring rim and backend of the gears.
+# With a ratio the best set of plan() is made
+# Returns the job ID, the ID of the set and the IDs of its sun, planet and ring as json
+# Raises a 400 error with a message when the set can not be assembled or a gear is invalid
+@app.route('/api/planetary', methods=['POST'])
+def api_planetary_generate():
+    body = request.get_json(silent=True) or {}
+    try:
+        module = float(body.get("module", 1))
+        planets = int(body.get("planets", 3))
+        if "sun" in body and "planet" in body:
+            stage = {"sun": int(body["sun"]), "planet": int(body["planet"]), "planets": planets}
+        else:
+            stage = plan_planetary(float(body.get("ratio", 0)), planets=planets, module=module,
+                pressure_angle=float(body.get("pressure_angle", 20)), limit=1)[0]
+        gear = {key: body[key] for key in ("height", "hole_dia", "pressure_angle", "clearance", "thickness",
+            "backend") if key in body}
+        gears = planetary_gears(stage, module, **gear)
+        for spec in gears:
+            validate(spec)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    ID = planetary_id(gears, planets)
+    job_id = jobs.submit({"gear_type": "planetary", "gears": gears, "planets": planets, "ID": ID}, ID)
+    runner.notify()
+    return jsonify({"job": job_id, "ID": ID, "sun": gears[0]["ID"], "planet": gears[1]["ID"],
+        "ring": gears[2]["ID"]}), 202
+
+# This function queues the generation of a gear and its mating gear, assembled in mesh, as one job
+# The json body has the parameters of the gear (gear_type spur, helix or double_helix, num_teeth, pitch_dia,
+# hole_dia, height, pressure_angle, clearance, angle_teeth and backend) and the mate_teeth of the mating
+# gear, or its pitch_dia2 which is rounded to whole teeth of the same module
+# Returns the job ID, the ID of the pair and the IDs of both gears as json
+# Raises a 400 error with a message when a gear of the pair is invalid
+@app.route('/api/pair', methods=['POST'])
+def api_pair():
+    body = request.get_json(silent=True) or {}
+    try:
+        gear = {key: body[key] for key in ("gear_type", "num_teeth", "pitch_dia", "hole_dia", "height",
+            "pressure_angle", "clearance", "angle_teeth", "reverse_pitch", "backend") if key in body}
+        mate_teeth = body.get("mate_teeth")
+        if mate_teeth is None:
+            mate_teeth = round(float(body["pitch_dia2"]) * int(gear["num_teeth"]) / float(gear["pitch_dia"]))
+        gears = pair_gears(gear, int(mate_teeth))
+        for spec in gears:
+            validate(spec)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({"error": str(e)}), 400
+    ID = pair_id(gears)
+    job_id = jobs.submit({"gear_type": "pair", "gears": gears, "ID": ID}, ID)
+    runner.notify()
+    return jsonify({"job": job_id, "ID": ID, "gear": gears[0]["ID"], "mate": gears[1]["ID"]}), 202
+
+# Gear forms of every form type and the names of their gears
+GEAR_FORMS = {"spur_form": (forms.SpurForm, "Spur Gear"), "helix_form": (forms.HelixForm, "Helix Gear"),
+    "double_helix_form": (forms.DoubleHelixForm, "Double Helix Gear"), "rack_form": (forms.RackForm, "Rack"),
+    "worm_form": (forms.WormForm, "Worm Gear"), "bevel_form": (forms.BevelForm, "Bevel Gear"),
+    "ring_form": (forms.RingForm, "Ring Gear")}
+
+# This function generates the json of the gear parameters from a filled in gear form
+# form_type:    Type of the form, a key of GEAR_FORMS (type: string)
+# form:         Validated gear form (type: GearForm)
+# Returns the gear parameters as a dictionary
+def form_params(form_type, form):
+    json_data = {"gear_type": form_type.split("_")[0] if not form_type == "double_helix_form" else "double_helix",}
+    for key, value in form.data.items():
+        if isinstance(value, Decimal):
+            value = float(value)
+        json_data[key] = value
+    return json_data
 
 # This function renders the index page of website with different types of gears
 # form_type: Intakes the type of form chosen by the user (type: string)
@@ -160,54 +647,45 @@ def calculate(form_type = "spur_form"):
 def index(form_type = "spur_form", login=False):
     
     ID =''
+    job_id = ''
     # Checking for Gear Form
-    id_flags = ['s','h','d','r','w','b']
-    id_flag = None
     form = forms.SpurForm()
     gear_name = None
 
     # Choosing and parsing Gear Form according to method
-    if form_type == "spur_form":
-        form = forms.SpurForm(request.form)
-        id_flag = id_flags[0]
-        gear_name = "Spur Gear"
-    elif form_type == "helix_form":
-        form = forms.HelixForm(request.form)
-        id_flag = id_flags[1]
-        gear_name = "Helix Gear"
-    elif form_type == "double_helix_form":
-        form = forms.DoubleHelixForm(request.form)
-        id_flag = id_flags[2]
-        gear_name = "Double Helix Gear"
-    elif form_type == "rack_form":
-        form = forms.RackForm(request.form)
-        id_flag = id_flags[3]
-        gear_name = "Rack"
-    elif form_type == "worm_form":
-        form = forms.WormForm(request.form)
-        id_flag = id_flags[4]
-        gear_name = "Worm Gear"
-    elif form_type == "bevel_form":
-        form = forms.BevelForm(request.form)
-        id_flag = id_flags[5]
-        gear_name = "Bevel Gear"
+    if form_type in GEAR_FORMS:
+        form = GEAR_FORMS[form_type][0](request.form)
+        gear_name = GEAR_FORMS[form_type][1]
+    else:
+        form_type = "spur_form"
     
     # Form Validation
     if form.validate_on_submit() and login == False:
         
         # Generating json from form for sending to FreeCAD
-        json_data = {"gear_type": form_type.split("_")[0] if not form_type == "double_helix_form" else "double_helix",}
+        json_data = form_params(form_type, form)
+        outline_only = json_data.pop('outline', False)
         
-        for key, value in form.data.items():
-            if isinstance(value, Decimal):
-                value = float(value)
-            json_data[key] = value
-        
-        # Generating unique ID
-        ID = f"id{int(json_data.get('pitch_dia'))}{json_data.get('num_teeth')}{int(json_data.get('hole_dia'))}{int(json_data.get('height'))}{int(json_data.get('pressure_angle'))}"+id_flag    
+        # Parameters are checked before the job is queued
+        try:
+            validate(json_data)
+        except (ValueError, TypeError) as e:
+            gear_error = str(e)
+            return render_template('index.html' , title = "Home", gear_form = form, form_type = form_type, gear_id = ID, job_id = job_id,
+                gears = history(), gear_name = gear_name, gear_error = gear_error)
+
+        # Generating unique ID from all parameters of the gear
+        ID = cache.lookup(json_data)[0]
         
         json_gear_id = {"ID": ID}
         json_data.update(json_gear_id)
+
+        # The 2D outline is drawn at once, only it is made when no 3D model is wanted
+        outline = publish_outline(json_data)
+        if outline_only:
+            gear_error = None if outline else "This gear has no 2D outline"
+            return render_template('index.html' , title = "Home", gear_form = form, form_type = form_type, gear_id = ID, job_id = job_id,
+                gears = history(), gear_name = gear_name, gear_error = gear_error, outline = outline)
         
         # Add to Database
         if current_user.is_authenticated:
@@ -224,20 +702,26 @@ def index(form_type = "spur_form", login=False):
             db.session.add(gear)
             db.session.commit()
         
+        # Queueing the Backend job which generates the gear and its previews. A speculative job of
+        # the same gear, started while the form was edited, is taken over instead when it has not finished
+        job_id = speculator.adopt(ID)
+        if not (job_id and jobs.promote(job_id)):
+            job_id = jobs.submit(json_data, ID)
+        runner.notify()
+
         # Unique name of the Generated Gear
-        flash({"data": ID})
+        flash({"data": ID, "job": job_id})
 
-        # Running the Backend and Generating gears
-        from app.Backend_FreeCAD.Running import main
-        main(json_data)
+    return render_template('index.html' , title = "Home", gear_form = form, form_type = form_type, gear_id = ID, job_id = job_id, gears = history(), gear_name = gear_name)
 
-    # Display User history form sql database
+# This function gets the gear design history of the user from the sql database
+# Returns the gears of the logged in user, or None
+def history():
     result = None
     if current_user.is_authenticated:
         result = Gear.query.filter_by(username=current_user.username)
         print(result)
-    
-    return render_template('index.html' , title = "Home", gear_form = form, gear_id = ID, gears = result, gear_name = gear_name)
+    return result
 
 # This function gets the file from a directory and allows the user to download the .stl file generated
 # ID: Intakes the ID of the file generated (type: string)
@@ -246,13 +730,27 @@ def index(form_type = "spur_form", login=False):
 @app.route("/download/<ID>")
 def download(ID):
     file = f"{ID}.stl"
-    dirname =os.path.join(os.path.dirname(__file__), r"Backend_FreeCAD\Part_files\\") 
+    dirname = cache.stl_dir
     try:
         return send_from_directory(dirname, file, as_attachment=True)
     except FileNotFoundError:
         print('path', dirname)
         abort(404)
 
+# This function allows the user to download the 2D outline of a gear, or an assembly as .3mf
+# ID:   Intakes the ID of the gear or assembly (type: string)
+# fmt:  File format of the outline, svg or dxf, or of the assembly, stl or 3mf (type: string)
+# Returns the file as an attachment
+# Raises error if the format is not known or the file not found
+@app.route("/download/<ID>/<fmt>")
+def download_outline(ID, fmt):
+    if fmt not in OUTLINE_FORMATS + ASSEMBLY_FORMATS:
+        abort(404)
+    try:
+        return send_from_directory(cache.stl_dir, f"{ID}.{fmt}", as_attachment=True)
+    except FileNotFoundError:
+        abort(404)
+
 # This function allows user to sign in the website when login button is clicked
 # Returns a rendered template according to login.html     
 @app.route('/login', methods=['GET', 'POST'])
@@ -314,35 +812,56 @@ def user_history():
     result = Gear.query.filter_by(username=current_user.username)
     return render_template('gear_all.html', gears = result)
 
+# This function gets the status of a generation job
+# job_id:   ID of the job (type: string)
+# Returns the status of the job (queued, running, done or failed) and its queue position as json
+# Raises error if the job does not exist
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    status = jobs.status(job_id)
+    if status is None:
+        abort(404)
+    return jsonify(status)
+
+# This function reports the counters of the gear generation
+# Returns the hit and miss counts of the gear cache and the tooth profiles, the job counts, the Socket.IO
+# fan-out and the speculative jobs with their wasted-work ratio as json
+@app.route('/metrics')
+def metrics():
+    return jsonify({"cache": cache.stats(), "profiles": gear_profile.stats(), "jobs": jobs.counts(),
+        "sockets": rooms.stats(), "speculation": speculator.stats()})
+
 
 # ---------------------------------------------------------------------------------
                 
 # Converting .stl to .gif 
+# The three preview views of a gear: (elevation, initial azimuth, number of frames) and frame duration
+PREVIEW_VIEWS = [((90, 0, 1), 0.2), ((30, 0, 1), 0.25), ((60, 0, 1), 0.25)]
+PREVIEW_STYLE = {"mesh_color": "silver", "line_color": "red", "line_width": 0.1}
+PREVIEW_URL = "/static/gear_output_gifs/"
+
 # This function generates .gif of the .stl model generated from three different angles
-# IT stores these .gifs in a folder
-# ID: Intake is the ID generated for the gear
+# The .stl is loaded once and every frame goes straight from the renderer to the encoder
+# The .gifs are written in a scratch directory and each one is moved into the folder served
+# to the browser as soon as it is done
+# ID:       Intake is the ID generated for the gear
+# progress: Function called with "preview_ready" and the view and url of each .gif (type: function)
 # Returns nothing
-def generate_model(ID):
-    dirname = os.path.dirname(__file__)
-    stl2gif = os.path.join(dirname, "stl_to_gif.py")
-    stl = os.path.join("Backend_FreeCAD", "Part_files", f"{ID}.stl")
-    gif = os.path.join("Backend_FreeCAD", "Part_files", ID)
-    gif_side_1 = os.path.join("Backend_FreeCAD", "Part_files", ID+"_side_1")
-    gif_side_2 = os.path.join("Backend_FreeCAD", "Part_files", ID+"_side_2")
-    
-    input_flag = "-i"
-    output_flag = "-o"
-    stl_input = os.path.join(dirname, stl)
-    output = os.path.join(dirname, gif)
-    output_side_1 = os.path.join(dirname, gif_side_1)
-    output_side_2 = os.path.join(dirname, gif_side_2)
-    side_flags_1 = '-e 90 -n 1 --mesh_color "silver" --line_color "red" --line_width 0.1 -t 0.2"'
-    side_flags_2 = '-e 30 -n 1 --mesh_color "silver" --line_color "red" --line_width 0.1 -t 0.25"'
-    side_flags_3 = '-e 60 -n 1 --mesh_color "silver" --line_color "red" --line_width 0.1 -t 0.25"'
-    
-    subprocess.run( rf'python "{stl2gif}"  "{input_flag}" "{stl_input}" "{output_flag}" "{output}" {side_flags_1}')
-    subprocess.run( rf'python "{stl2gif}"  "{input_flag}" "{stl_input}" "{output_flag}"  "{output_side_1}" {side_flags_2}')
-    subprocess.run( rf'python "{stl2gif}"  "{input_flag}" "{stl_input}" "{output_flag}"  "{output_side_2}" {side_flags_3}') 
-    copyfile(os.path.join(dirname, f"{gif}.gif"), os.path.join(dirname, "static", "gear_output_gifs", f"{ID}.gif"))
-    copyfile(os.path.join(dirname, f"{gif_side_1}.gif"), os.path.join(dirname, "static", "gear_output_gifs", f"{ID}_side_1.gif"))
-    copyfile(os.path.join(dirname, f"{gif_side_2}.gif"), os.path.join(dirname, "static", "gear_output_gifs", f"{ID}_side_2.gif"))
\ No newline at end of file
+def generate_model(ID, progress=None):
+    progress = progress or (lambda stage, **info: None)
+    names = [os.path.basename(path) for path in cache.preview_paths(ID)]
+
+    # Previews of a gear generated before are served as they are
+    if cache.has_previews(ID):
+        for index, name in enumerate(names):
+            progress("preview_ready", view=index, url=PREVIEW_URL + name)
+        return
+
+    with Workspace() as workspace:
+        # This function publishes a finished view and tells the page
+        def view_ready(index, outputfile):
+            workspace.publish(names[index], cache.gif_dir)
+            progress("preview_ready", view=index, url=PREVIEW_URL + names[index])
+
+        outputs = [(view, workspace.file(name), duration) for (view, duration), name in zip(PREVIEW_VIEWS, names)]
+        stream_views(cache.stl_path(ID), outputs, on_view=view_ready, **PREVIEW_STYLE)
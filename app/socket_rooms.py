@@ -0,0 +1,75 @@
+# =============================================================================
+# File Name     : socket_rooms.py
+# Description   : This module keeps track of which browser sessions wait for which
+#                 job, so job events are sent to their submitter only
+# =============================================================================
+
+import threading
+
+# This class contains the Socket.IO rooms of the jobs and counts the events sent to them
+# Each job has a room named after its job ID which the page of the submitter joins
+class RoomTracker:
+
+    # Constructor of the tracker
+    def __init__(self):
+        self.rooms = {}
+        self.sessions = {}
+        self.events = 0
+        self.deliveries = 0
+        self.largest_fanout = 0
+        self._lock = threading.Lock()
+
+    # This function records that a session joined the room of a job
+    # sid:  Socket.IO session ID (type: string)
+    # room: Room of the job, its job ID (type: string)
+    # Returns nothing
+    def join(self, sid, room):
+        with self._lock:
+            self.rooms.setdefault(room, set()).add(sid)
+            self.sessions.setdefault(sid, set()).add(room)
+
+    # This function forgets a session that disconnected
+    # sid:  Socket.IO session ID (type: string)
+    # Returns nothing
+    def leave_all(self, sid):
+        with self._lock:
+            for room in self.sessions.pop(sid, set()):
+                members = self.rooms.get(room)
+                if members is not None:
+                    members.discard(sid)
+                    if not members:
+                        del self.rooms[room]
+
+    # This function forgets the room of a job that will get no more events
+    # room: Room of the job (type: string)
+    # Returns nothing
+    def close(self, room):
+        with self._lock:
+            for sid in self.rooms.pop(room, set()):
+                self.sessions.get(sid, set()).discard(room)
+
+    # This function counts an event sent to the room of a job
+    # room: Room of the job (type: string)
+    # Returns the number of sessions the event goes to
+    def fanout(self, room):
+        with self._lock:
+            count = len(self.rooms.get(room, ()))
+        self.record(count)
+        return count
+
+    # This function counts an event sent to a number of sessions
+    # count:    Number of sessions the event goes to (type: int)
+    # Returns nothing
+    def record(self, count):
+        with self._lock:
+            self.events += 1
+            self.deliveries += count
+            self.largest_fanout = max(self.largest_fanout, count)
+
+    # This function gets the counts of the rooms and events
+    # Returns a dictionary with open rooms, connected sessions, events, deliveries and fan-out
+    def stats(self):
+        with self._lock:
+            return {"rooms": len(self.rooms), "sessions": len(self.sessions), "events": self.events,
+                "deliveries": self.deliveries, "largest_fanout": self.largest_fanout,
+                "average_fanout": self.deliveries / self.events if self.events else 0.0}
@@ -0,0 +1,125 @@
+# =============================================================================
+# File Name     : speculation.py
+# Description   : This module keeps track of the gears generated speculatively
+#                 while users edit the form, their budget per user and how much
+#                 of the speculative work is wasted
+# =============================================================================
+
+import collections
+import threading
+import time
+
+# Speculative jobs a user may start per window
+SPECULATION_BUDGET = 5
+
+# Seconds of the budget window
+SPECULATION_WINDOW = 600
+
+# Most speculative jobs remembered, older ones are forgotten
+SPECULATION_MEMORY = 1000
+
+# This class contains the speculative jobs of every user and counts how they end
+# A speculative job is used when its gear is submitted, and wasted when it ran but its gear never was
+class Speculator:
+
+    # Constructor of the tracker
+    # budget:   Speculative jobs a user may start per window (type: int)
+    # window:   Seconds of the budget window (type: float)
+    # memory:   Most speculative jobs remembered (type: int)
+    def __init__(self, budget=SPECULATION_BUDGET, window=SPECULATION_WINDOW, memory=SPECULATION_MEMORY):
+        self.budget = budget
+        self.window = window
+        self.memory = memory
+        self.latest = {}
+        self.starts = {}
+        self.jobs = collections.OrderedDict()
+        self.counts = {"snapshots": 0, "started": 0, "over_budget": 0, "cancelled": 0, "finished": 0,
+            "used": 0, "wasted": 0}
+        self._lock = threading.Lock()
+
+    # This function decides if a snapshot of a user starts a speculative job and counts it
+    # user:     User or browser session that sent the snapshot (type: string)
+    # ID:       ID of the gear of the snapshot (type: string)
+    # now:      Time of the snapshot, by default the current time (type: float)
+    # Returns True when the user has budget left and the gear is not already speculated
+    def wanted(self, user, ID, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.counts["snapshots"] += 1
+            if any(job["ID"] == ID for job in self.jobs.values()):
+                return False
+            starts = self.starts.setdefault(user, collections.deque())
+            while starts and starts[0] <= now - self.window:
+                starts.popleft()
+            if len(starts) >= self.budget:
+                self.counts["over_budget"] += 1
+                return False
+            return True
+
+    # This function records a speculative job a user started
+    # The previous speculative job of the user is replaced, it should be cancelled if it has not started.
+    # A job taken over by a submitted gear is not returned
+    # user:     User or browser session (type: string)
+    # job_id:   ID of the job (type: string)
+    # ID:       ID of the gear of the job (type: string)
+    # now:      Time of the start, by default the current time (type: float)
+    # Returns the job ID of the previous speculative job of the user, or None
+    def started(self, user, job_id, ID, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.starts.setdefault(user, collections.deque()).append(now)
+            self.counts["started"] += 1
+            self.jobs[job_id] = {"ID": ID, "finished": False, "used": False}
+            while len(self.jobs) > self.memory:
+                self.jobs.popitem(last=False)
+            previous = self.latest.get(user)
+            self.latest[user] = job_id
+            if previous not in self.jobs or self.jobs[previous]["used"]:
+                return None
+            return previous
+
+    # This function records that a speculative job was cancelled before it started
+    # job_id:   ID of the job (type: string)
+    # Returns nothing
+    def cancelled(self, job_id):
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+            if job is not None:
+                self.counts["cancelled"] += 1
+
+    # This function records that a job finished, jobs that are not speculative are ignored
+    # A speculative job that finished before its gear was submitted counts as wasted until it is used
+    # job_id:   ID of the job (type: string)
+    # Returns nothing
+    def finished(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["finished"]:
+                return
+            job["finished"] = True
+            self.counts["finished"] += 1
+            if not job["used"]:
+                self.counts["wasted"] += 1
+
+    # This function takes over the speculative job of a gear when the gear is submitted
+    # ID:   ID of the submitted gear (type: string)
+    # Returns the ID of the speculative job of the gear, or None
+    def adopt(self, ID):
+        with self._lock:
+            for job_id, job in self.jobs.items():
+                if job["ID"] == ID and not job["used"]:
+                    job["used"] = True
+                    self.counts["used"] += 1
+                    if job["finished"]:
+                        self.counts["wasted"] -= 1
+                    return job_id
+        return None
+
+    # This function gets the counts of the speculative jobs
+    # Returns a dictionary with the counts and the wasted-work ratio: the part of the finished
+    # speculative jobs whose gear was not submitted
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+        stats["wasted_ratio"] = stats["wasted"] / stats["finished"] if stats["finished"] else 0.0
+        return stats
@@ -8,140 +8,143 @@
 ##############################
 
 # Imports
-import os, re, math, sys
-import sys, getopt, shutil
+import os, math, sys
+import getopt
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.colors import to_rgb
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from mpl_toolkits import mplot3d
 from stl import mesh
 import imageio
-
-plt.switch_backend('agg')
-
-# USERs VARIABLES
-# General parameters
-inputfile = None
-outputfile = None
-
-# GIFs parameters
-frames = 1
-duration_frame = 0.1
-
-# Visualization parameters
-init_angle = 0
-elevation = 90
-rotation_axises = [1.0, 0.0, 0.0]
-rotation_angle = 0
-x_offset = 0
-y_offset = 0
-z_offset = 0
-mesh_color = "deepskyblue"
-line_color = "crimson"
-line_width = 0.1
-edge_color = None
-face_color = None 
-
-path = os.path.join(os.getcwd(), "frames")
-
-# Checks that input paratmeters are correct
-def initialize():
-    global frames, duration_frame, outputfile
-    
-    if (frames<=0):
-        print("Setting default of frames to 25")
-        frames = 25
-
-    if (duration_frame<=0):
-        print("Setting default duration to 0.1")
-        duration_frame = 0.1
-
-    if inputfile == None:
-        print("Error: Inputfile not specified")
-        sys.exit(2)
-
-    if outputfile == None:
-        outputfile = "output.gif"
-
-# Loads the STL file
-def loadSTL():
-    global stl_mesh
+from PIL import Image
+sys.path.append(os.path.dirname(__file__))
+import mesh_raster
+
+# Default visualization parameters
+STYLE = {
+    "mesh_color": "deepskyblue",
+    "line_color": "crimson",
+    "line_width": 0.1,
+    "edge_color": None,
+    "face_color": None,
+}
+
+# Renderers of render_views: "raster" draws with NumPy (mesh_raster.py), "matplotlib" with mplot3d
+RENDERERS = ["raster", "matplotlib"]
+
+# Loads the STL file, rotates it and centers it on the origin
+# The mesh can then be rendered from any number of views
+def load_mesh(inputfile, rotation_axis=(1.0, 0.0, 0.0), rotation_angle=0, offset=(0, 0, 0)):
     stl_mesh = mesh.Mesh.from_file(inputfile)
-
-# Rotate the STL
-def rotateSTL():
-    stl_mesh.rotate(rotation_axises, math.radians(rotation_angle))
-
-# Creates frames for the gif
-def createFrames():
+    if rotation_angle:
+        stl_mesh.rotate(list(rotation_axis), math.radians(rotation_angle))
 
     # Center the STL
-    x_min = stl_mesh.vectors[:,:,0].min()
-    x_max = stl_mesh.vectors[:,:,0].max()
-    y_min = stl_mesh.vectors[:,:,1].min()
-    y_max = stl_mesh.vectors[:,:,1].max()
-    z_min = stl_mesh.vectors[:,:,2].min()
-    z_max = stl_mesh.vectors[:,:,2].max() 
-
-    x_center_offset = (x_max + x_min)/2.0
-    y_center_offset = (y_max + y_min)/2.0
-    z_center_offset = (z_max + z_min)/2.0
-
-    stl_mesh.vectors[:,:,0] = stl_mesh.vectors[:,:,0] - x_center_offset - x_offset
-    stl_mesh.vectors[:,:,1] = stl_mesh.vectors[:,:,1] - y_center_offset - y_offset
-    stl_mesh.vectors[:,:,2] = stl_mesh.vectors[:,:,2] - z_center_offset - z_offset
-    
-    # Create a new plot
-    figure = plt.figure()
-    axes = mplot3d.Axes3D(figure)
+    minimum = stl_mesh.vectors.reshape(-1, 3).min(axis=0)
+    maximum = stl_mesh.vectors.reshape(-1, 3).max(axis=0)
+    stl_mesh.vectors -= (maximum + minimum) / 2.0 + np.asarray(offset, dtype=stl_mesh.vectors.dtype)
+    return stl_mesh
+
+# Creates a figure showing the mesh, without the pyplot state so renders can run side by side
+def createFigure(stl_mesh, mesh_color, line_color, line_width, edge_color=None, face_color=None):
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(projection="3d")
 
     # Add STL vectors to the plot
     axes.add_collection3d(mplot3d.art3d.Poly3DCollection(stl_mesh.vectors,color=mesh_color, edgecolors=edge_color, facecolors=face_color))
     axes.add_collection3d(mplot3d.art3d.Line3DCollection(stl_mesh.vectors,color=line_color,linewidth=line_width))
-    axes.view_init(elev=35., azim=-45)
 
     # Auto scale to the mesh size
-    scale = stl_mesh.points.flatten()#-1)
+    scale = stl_mesh.points.flatten()
     axes.auto_scale_xyz(scale, scale, scale)
 
     # Deactivate Axes
-    plt.axis('off')
-
-    # Delete folder containing frames from previous runs
-    if os.path.exists(path):
-        shutil.rmtree(path)        
-
-    # Create a folder to contain the frames
-    try: 
-        os.makedirs(path)
-    except OSError:
-        if not os.path.isdir(path):
-            raise
-
-    print(f'init_angle: {init_angle}')
-    for i in range(frames):    
+    axes.set_axis_off()
+    return figure, axes
+
+# Renders a list of views of a mesh into memory
+# views: list of (elevation, initial azimuth, number of frames), one frame list is returned per view
+# renderer: "raster" for the NumPy depth buffer renderer, "matplotlib" for mplot3d
+def render_views(stl_mesh, views, renderer="raster", **style):
+    frame = frame_renderer(stl_mesh, renderer, **style)
+    return [list(view_frames(frame, view)) for view in views]
+
+# Prepares a mesh for rendering
+# Every renderer has its own figure or buffers, so renders can run side by side in threads
+# Returns a function of (elevation, azimuth) which draws one frame as an RGB array
+def frame_renderer(stl_mesh, renderer="raster", **style):
+    if isinstance(stl_mesh, str):
+        stl_mesh = load_mesh(stl_mesh)
+    style = dict(STYLE, **style)
+    if renderer == "raster":
+        return raster_frame(stl_mesh, **style)
+    elif renderer == "matplotlib":
+        return figure_frame(stl_mesh, **style)
+    raise ValueError(f"Unknown renderer {renderer}")
+
+# Renders the frames of one view one at a time, so they can go to an encoder as they are made
+# view: (elevation, initial azimuth, number of frames)
+def view_frames(frame, view):
+    elevation, init_angle, frames = view
+    for i in range(max(1, int(frames))):
         # Rotate the view
-
-        axes.view_init(elev=elevation, azim=init_angle + 360/frames*i)
-    
-        # Save frame
-        frame_i = "frame_" + str(i) + ".png"
-        print("Saved frames: " + str(i+1) + "/" + str(frames))
-        plt.savefig(os.path.join(path, frame_i))
-
-# Loads frames and creates gif
-def createGif():
-    images = []
-    files = os.listdir(path)
-    ordered_files = sorted(files, key=lambda x: (int(re.sub('\D','',x)),x))
-    for file_name in ordered_files:
-        if file_name.endswith('.png'):
-            file_path = os.path.join(path, file_name)
-            images.append(imageio.imread(file_path))
-    imageio.mimsave(outputfile, images, duration = duration_frame)
+        yield frame(elevation, init_angle + 360/frames*i)
+
+# Prepares the matplotlib figure of a mesh
+# Returns a function of (elevation, azimuth) which draws one frame
+def figure_frame(stl_mesh, **style):
+    figure, axes = createFigure(stl_mesh, **style)
+    def frame(elevation, azimuth):
+        axes.view_init(elev=elevation, azim=azimuth)
+        figure.canvas.draw()
+        return np.asarray(figure.canvas.buffer_rgba())[:, :, :3].copy()
+    return frame
+
+# Prepares the NumPy renderer of a mesh (mesh_raster.py)
+# The scene size is fixed by the whole mesh so the gear does not change size while it turns,
+# the corners and unit normals are converted once for all the frames
+# Returns a function of (elevation, azimuth) which draws one frame
+def raster_frame(stl_mesh, mesh_color, line_color, line_width, edge_color=None, face_color=None):
+    vectors = np.asarray(stl_mesh.vectors, dtype=np.float64)
+    normals = mesh_raster.unit_normals(vectors, np.asarray(stl_mesh.normals, dtype=np.float64))
+    extent = float(np.linalg.norm(vectors.reshape(-1, 3), axis=1).max())
+    colors = {"mesh_color": to_rgb(face_color or mesh_color),
+        "line_color": to_rgb(edge_color or line_color) if line_width else None,
+        "line_alpha": min(1.0, 0.25 + line_width)}
+    def frame(elevation, azimuth):
+        return mesh_raster.render(vectors, normals, elevation, azimuth, extent=extent, **colors)
+    return frame
+
+# Writes frames as an animation, the format (.gif or .webp) follows the file extension
+# Frames are passed to the encoder one by one, so any iterable of frames can be streamed
+# Pillow writes the animation, its frame duration is in milliseconds in every version
+# duration: display time of each frame in seconds
+def save_animation(images, outputfile, duration=0.1):
+    frames = (Image.fromarray(image) for image in images)
+    first = next(frames)
+    first.save(outputfile, save_all=True, append_images=frames, duration=int(round(duration * 1000)), loop=0)
+
+# Renders views of a mesh straight into animation files, without keeping the frames
+# outputs: list of (view, output file, frame duration), see render_views for the views
+# on_view: function called with (index, output file) as soon as each file is written
+def stream_views(stl_mesh, outputs, renderer="raster", on_view=None, **style):
+    frame = frame_renderer(stl_mesh, renderer, **style)
+    for index, (view, outputfile, duration) in enumerate(outputs):
+        save_animation(view_frames(frame, view), outputfile, duration)
+        if on_view:
+            on_view(index, outputfile)
+
+# Saves frames as numbered PNG files in a folder
+def save_frames(images, path):
+    os.makedirs(path, exist_ok=True)
+    for i, image in enumerate(images):
+        imageio.imwrite(os.path.join(path, "frame_" + str(i) + ".png"), image)
 
 # Separate the string into a list of floats
 def getList(strlist,separator=","):
-    
+
     try:
         valueList = list(map(float,strlist.split(separator)))
 
@@ -149,24 +152,28 @@ def getList(strlist,separator=","):
         print("Error: Input the values only separated by a comma (,) . I.e: 1,0,0")
         sys.exit(2)
 
-
-    
-    return list(map(float,strlist.split(separator)))
+    return valueList
 
 
 # MAIN
 def main(argv):
-    
+
     # Main variables
-    global inputfile, outputfile, path
-    
+    inputfile = None
+    outputfile = None
+    path = None
+
     # GIFs parameters
-    global frames, duration_frame
-    
+    frames = 1
+    duration_frame = 0.1
+
     # Visualization parameters
-    global init_angle, elevation, rotation_axises, rotation_angle, x_offset, y_offset, z_offset, \
-    mesh_color, line_color, line_width, edge_color, face_color
-               
+    init_angle = 0
+    elevation = 90
+    rotation_axises = [1.0, 0.0, 0.0]
+    rotation_angle = 0
+    offsets = [0, 0, 0]
+    style = dict(STYLE)
 
     try:
          opts, args = getopt.getopt(argv,"h:i:o:p:n:t:a:e:d:r:z:x:y:X:Y:Z",["help","ifile=","ofile=","nframes=", "duration=", "initangle=", "elevation=",\
@@ -180,104 +187,102 @@ def main(argv):
             print("Usage: GCode_to_Robtargets [-h | -i <inputfile> -o <outputfile>] ")
             print('Options and arguments:')
             print("-h     : Print this help message and exit")
-            
+
             print("-i arg : Input the file to be get the frames for the gif (also --ifile)")
-            print("-o arg : Output filename of the gif (also --ofile)")
-            print("-p arg : Folder in where the frames will be saved (also --path). If it doesn't exist, it will be created automatically (Default folder: frames)")
-            
+            print("-o arg : Output filename of the gif, or of a .webp when it ends with .webp (also --ofile)")
+            print("-p arg : Folder in where the frames will also be saved as PNG files (also --path). If it doesn't exist, it will be created automatically")
+
             print("-n arg : Amount of frames to generate (also --nframes). Default: 25")
-            print("-t arg : Duration (in seconds) of display of each frame (also --duration). Default: 0.1")            
-           
+            print("-t arg : Duration (in seconds) of display of each frame (also --duration). Default: 0.1")
+
             print("-a arg : Starting angle of the first frame (also --initangle). Default: 0")
             print("-e arg : Elevation of the STL (also --elevation). Default: 0")
-            
+
             print("-d arg : Degrees to rotate the stl (also --rotation_angle). Default: 0")
             print("-r arg : Specify the rotation axis of the STL (also --rotation_axis). Default: [1,0,0]")
-            
+
             print("--offset arg : Displaces the center from which the STL will revolve. Default: [0,0,0]")
 
             sys.exit()
-            
+
         elif opt in ("-i", "--ifile"):
             inputfile = arg
             print(inputfile)
-            
+
         elif opt in ("-o", "--ofile"):
-            outputfile = arg + ".gif"
+            outputfile = arg if arg.lower().endswith((".gif", ".webp")) else arg + ".gif"
 
         elif opt in ("-p", "--path"):
-            path = arg
-            path = os.path.join(os.getcwd(), path)
-            
+            path = os.path.join(os.getcwd(), arg)
+
         elif opt in ("-n", "--nframes"):
             frames = int(arg)
-            
+
         elif opt in ("-t", "--duration"):
             duration_frame = float(arg)
 
         elif opt in ("-a", "--initangle"):
             init_angle = float(arg)
-            
+
         elif opt in ("-e", "--elevation"):
             elevation = float(arg)
-            
-           
-                               
+
         elif opt in ("-d", "--rotation_angle"):
-            rotation_angle = float(arg)     
-                                
-        elif opt in ("-r", "--rotation_axis"):            
-            rotation_axises = getList(arg)   
-            
+            rotation_angle = float(arg)
+
+        elif opt in ("-r", "--rotation_axis"):
+            rotation_axises = getList(arg)
+
         elif opt in ("--offset"):
             offsets = getList(arg)
 
-            x_offset = offsets[0]
-            y_offset = offsets[1]
-            z_offset = offsets[2]
-            
         elif opt in ("-z", "--mesh_color"):
-            print(arg)
-            mesh_color = arg  
-            
+            style["mesh_color"] = arg
+
         elif opt in ("-y", "--line_color"):
-            print(arg)
-            line_color = arg 
-            
+            style["line_color"] = arg
+
         elif opt in ("-x", "--line_width"):
-            print(arg)
-            line_width = float(arg)
-            
+            style["line_width"] = float(arg)
+
         elif opt in ("-Z", "--edge_color"):
-            print(arg)
-            edge_color = arg  
-            
+            style["edge_color"] = arg
+
         elif opt in ("-Y", "--face_color"):
-            print(arg)
-            face_color = arg 
-            
-    
-    
-    initialize()
-    
+            style["face_color"] = arg
+
+    # Checks that input paratmeters are correct
+    if (frames<=0):
+        print("Setting default of frames to 25")
+        frames = 25
+
+    if (duration_frame<=0):
+        print("Setting default duration to 0.1")
+        duration_frame = 0.1
+
+    if inputfile == None:
+        print("Error: Inputfile not specified")
+        sys.exit(2)
+
+    if outputfile == None:
+        outputfile = "output.gif"
+
     print("Loading STL")
-    loadSTL()
-    rotateSTL()
-    
-    print("Creating frames")
-    createFrames()
-    
+    stl_mesh = load_mesh(inputfile, rotation_axises, rotation_angle, offsets)
+
+    if path:
+        print("Creating frames")
+        images = render_views(stl_mesh, [(elevation, init_angle, frames)], **style)[0]
+        save_frames(images, path)
+    else:
+        # Frames go straight to the encoder
+        images = view_frames(frame_renderer(stl_mesh, **style), (elevation, init_angle, frames))
+
     print("Creating gif")
-    createGif()
-    
+    save_animation(images, outputfile, duration_frame)
+
     print("Finished")
-    
+
 if __name__ == "__main__":
     print("Started")
     main(sys.argv[1:])
-    
-
-
-
-
-
@@ -6,4 +6,14 @@ class Config(object):
     
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Gear generation jobs are queued in their own SQLite database
+    JOB_QUEUE_DATABASE = os.environ.get('JOB_QUEUE_DATABASE') or \
+        os.path.join(basedir, 'jobs.db')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+
+    # Workers that may run speculative jobs, gears made while the form is edited, and how many
+    # speculative jobs a user may start in ten minutes
+    SPECULATIVE_WORKERS = int(os.environ.get('SPECULATIVE_WORKERS') or 1)
+    SPECULATION_BUDGET = int(os.environ.get('SPECULATION_BUDGET') or 5)
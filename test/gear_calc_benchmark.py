@@ -0,0 +1,94 @@
+# =============================================================================
+# File Name     : gear_calc_benchmark.py
+# Description   : Benchmark of the batch gear calculation on a million gears against
+#                 the gear classes one gear at a time, of the mating gear search, of
+#                 the gear train planner and of the mesh simulation of many pairs
+#                 Run with: python test/gear_calc_benchmark.py
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import time
+import numpy as np
+import gear
+from gear_calc import calculate
+from gear_search import search
+from gear_train import plan
+from gear_mesh import analyse_batch
+
+ROWS = 1_000_000
+
+# Number of gears calculated with the gear classes, the time is scaled up to ROWS
+CLASS_ROWS = 2_000
+
+# This function times the batch calculation of random gears, a few of them invalid
+# Returns the best seconds of three runs and the number of valid rows
+def time_batch():
+    rng = np.random.default_rng(0)
+    teeth = rng.integers(0, 101, ROWS).astype(float)
+    pitch = rng.uniform(5, 500, ROWS)
+    mate_teeth = rng.integers(2, 101, ROWS).astype(float)
+    mate_pitch = pitch / teeth.clip(1) * mate_teeth
+    best = None
+    for i in range(3):
+        start = time.perf_counter()
+        result = calculate(teeth, pitch, 20.0, 0.12, mate_teeth, mate_pitch)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, int(result["valid"].sum())
+
+# This function times the gear classes calculating the same quantities one gear at a time
+# Returns the seconds per gear
+def time_classes():
+    start = time.perf_counter()
+    for i in range(CLASS_ROWS):
+        spur = gear.InvoluteGear(teeth_number=20 + i % 50, pressure_angle=20, pitch_diameter=60,
+            clearance=0.12, hole_diameter=5, gear_type="Spur Gear")
+        (spur.get_module(), spur.get_addendum(), spur.get_dedendum(), spur.get_tooth_depth(), spur.get_tip_diameter(),
+            spur.get_root_diameter(), spur.get_tip_clearance(), spur.get_centre_distance(spur))
+    return (time.perf_counter() - start) / CLASS_ROWS
+
+# This function times searches of the whole space of teeth pairs and standard modules
+# Returns the best seconds of three runs of each search
+def time_search():
+    targets = [{"ratio": 2.5}, {"centre_distance": 80}, {"ratio": 3.14, "centre_distance": 100}]
+    seconds = {}
+    for target in targets:
+        runs = []
+        for i in range(3):
+            start = time.perf_counter()
+            search(**target)
+            runs.append(time.perf_counter() - start)
+        seconds[str(target)] = min(runs)
+    return seconds
+
+# This function times plans of gear trains with more and more stages
+# Returns the seconds of each plan
+def time_train():
+    seconds = {}
+    for ratio, stages in ((12.5, 2), (37.3, 4), (314.159, 6)):
+        start = time.perf_counter()
+        plan(ratio, max_stages=stages)
+        seconds[f"ratio {ratio}, {stages} stages"] = time.perf_counter() - start
+    return seconds
+
+# This function times the mesh simulation of every pair of 17 to 60 teeth
+# Returns the number of pairs and the seconds they took
+def time_mesh():
+    pairs = [{"teeth": a, "mate_teeth": b, "module": 2} for a in range(17, 61) for b in range(a, 61)]
+    start = time.perf_counter()
+    analyse_batch(pairs)
+    return len(pairs), time.perf_counter() - start
+
+if __name__ == '__main__':
+    seconds, valid = time_batch()
+    print(f"batch: {ROWS} rows ({valid} valid) in {seconds * 1000:.1f} ms")
+    per_gear = time_classes()
+    print(f"classes: {per_gear * 1e6:.1f} us per gear, {per_gear * ROWS:.1f} s for {ROWS} rows")
+    for target, seconds in time_search().items():
+        print(f"search {target}: {seconds * 1000:.1f} ms")
+    for target, seconds in time_train().items():
+        print(f"train {target}: {seconds * 1000:.1f} ms")
+    pairs, seconds = time_mesh()
+    print(f"mesh: {pairs} pairs in {seconds:.2f} s ({seconds / pairs * 1000:.2f} ms per pair)")
@@ -0,0 +1,100 @@
+# =============================================================================
+# File Name     : render_benchmark.py
+# Description   : Benchmark of the preview renderers on a reference gear and a large gear,
+#                 and of writing an animation through PNG files against streaming it
+#                 Run with: python test/render_benchmark.py
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import re
+import tempfile
+import time
+import imageio
+import native_gear
+from stl_to_gif import load_mesh, render_views, save_animation, stream_views, RENDERERS
+
+REFERENCE = os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD", "Reference")
+
+# Views and style of the web previews (see routes.py)
+VIEWS = [(90, 0, 1), (30, 0, 1), (60, 0, 1)]
+STYLE = {"mesh_color": "silver", "line_color": "red", "line_width": 0.1}
+
+# Large helical gear with about a hundred thousand facets
+LARGE_GEAR = {"gear_type": "helix", "num_teeth": 60, "pitch_dia": 120, "height": 40, "hole_dia": 10,
+    "angle_teeth": 30}
+
+# This function times the rendering of the preview views of a mesh with every renderer
+# stl_mesh: Loaded mesh (numpy-stl Mesh)
+# repeat:   Number of timed runs, the best one is kept (type: int)
+# Returns the seconds per view of each renderer as a dictionary
+def time_renderers(stl_mesh, repeat=3):
+    seconds = {}
+    for renderer in RENDERERS:
+        best = None
+        for i in range(repeat):
+            start = time.perf_counter()
+            render_views(stl_mesh, VIEWS, renderer=renderer, **STYLE)
+            elapsed = (time.perf_counter() - start) / len(VIEWS)
+            best = elapsed if best is None else min(best, elapsed)
+        seconds[renderer] = best
+    return seconds
+
+# Frames of the turning animation used to compare the ways of writing it
+TURN = (30, 0, 25)
+
+# This function writes an animation the way it was done before: every frame saved as a PNG,
+# then listed, sorted, read back and encoded
+# stl_mesh: Loaded mesh (numpy-stl Mesh)
+# folder:   Folder of the frames and the animation (type: string)
+# Returns nothing
+def png_round_trip(stl_mesh, folder):
+    frames = os.path.join(folder, "frames")
+    os.makedirs(frames)
+    for i, image in enumerate(render_views(stl_mesh, [TURN], **STYLE)[0]):
+        imageio.imwrite(os.path.join(frames, f"frame_{i}.png"), image)
+    names = sorted(os.listdir(frames), key=lambda name: int(re.findall(r"\d+", name)[0]))
+    images = [imageio.imread(os.path.join(frames, name)) for name in names]
+    save_animation(images, os.path.join(folder, "turn.gif"), 0.1)
+
+# This function writes an animation with the frames streamed from the renderer to the encoder
+# stl_mesh: Loaded mesh (numpy-stl Mesh)
+# folder:   Folder of the animation (type: string)
+# Returns nothing
+def streamed(stl_mesh, folder):
+    stream_views(stl_mesh, [(TURN, os.path.join(folder, "turn.gif"), 0.1)], **STYLE)
+
+# This function times a way of writing the animation and measures the bytes it writes to disk
+# write:    Function of (stl_mesh, folder) writing the animation
+# stl_mesh: Loaded mesh (numpy-stl Mesh)
+# Returns the seconds taken and the bytes written
+def time_writer(write, stl_mesh):
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        write(stl_mesh, folder)
+        elapsed = time.perf_counter() - start
+        written = sum(os.path.getsize(os.path.join(root, name)) for root, dirs, names in os.walk(folder) for name in names)
+    return elapsed, written
+
+# This function prints the benchmark of every mesh
+# Returns nothing
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        meshes = {name: os.path.join(REFERENCE, f"{name}.stl") for name in ("Spur", "Double_Helix")}
+        meshes["Large helix"] = native_gear.generate(LARGE_GEAR, os.path.join(folder, "large.stl"))
+        for name, path in meshes.items():
+            stl_mesh = load_mesh(path)
+            seconds = time_renderers(stl_mesh)
+            print(f"{name}: {len(stl_mesh.vectors)} facets, " +
+                ", ".join(f"{renderer} {1000 * value:.1f} ms/view" for renderer, value in seconds.items()) +
+                f", speedup {seconds['matplotlib'] / seconds['raster']:.1f}x")
+
+        stl_mesh = load_mesh(meshes["Spur"])
+        for name, write in (("PNG round trip", png_round_trip), ("Streamed", streamed)):
+            elapsed, written = time_writer(write, stl_mesh)
+            print(f"{name}: {TURN[2]} frame gif in {1000 * elapsed:.0f} ms, {written / 1024:.0f} KiB written")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# =============================================================================
+# File Name     : test_artifact_cache.py
+# Description   : Unit Test of the gear parameter normalization and artifact cache
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+import gear_params
+from stl import mesh
+from artifact_cache import ArtifactCache, stl_info
+
+REFERENCE = os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD", "Reference")
+
+# This class contains unittest cases for the canonical parameters and ID of a gear
+class TestGearParams(unittest.TestCase):
+
+    # Helix Gear Parameters as sent by the web form
+    helix = {"gear_type": "helix", "pitch_dia": 60.0, "num_teeth": 20, "hole_dia": 5.0,
+        "height": 10.0, "pressure_angle": 20, "clearance": 0.12, "angle_teeth": 20,
+        "submit": True, "csrf_token": "abc"}
+
+    # This function checks that defaults are filled in and unrelated fields dropped
+    # Returns nothing
+    def test_normalize(self):
+        canonical = gear_params.normalize({"gear_type": "bevel", "pitch_dia": 60, "num_teeth": 20,
+            "hole_dia": 5, "height": 10})
+        self.assertEqual(canonical["pitch_angle"], 45)
+        self.assertEqual(canonical["clearance"], 0.12)
+        self.assertNotIn("reverse_pitch", canonical)
+        ring = {"gear_type": "ring", "pitch_dia": 60, "num_teeth": 20, "hole_dia": 5, "height": 10}
+        self.assertEqual(gear_params.normalize(dict(ring, backend="freecad"))["backend"], "native")
+        self.assertEqual(gear_params.normalize(dict(ring, gear_type="rack"))["backend"], "freecad")
+
+    # This function checks that every parameter of the gear changes its ID
+    # Returns nothing
+    def test_id_uses_all_parameters(self):
+        ID = gear_params.gear_id(self.helix)
+        self.assertNotEqual(ID, gear_params.gear_id(dict(self.helix, angle_teeth=25)))
+        self.assertNotEqual(ID, gear_params.gear_id(dict(self.helix, clearance=0.2)))
+        self.assertEqual(len(ID), 16)
+        self.assertTrue(ID.endswith("h"))
+
+    # This function checks that rounding and form only fields do not change the ID
+    # Returns nothing
+    def test_id_is_canonical(self):
+        same = dict(self.helix, pitch_dia=60.000001, submit=False)
+        del same["csrf_token"]
+        self.assertEqual(gear_params.gear_id(self.helix), gear_params.gear_id(same))
+
+    # This function checks that an unknown gear type is rejected
+    # Returns nothing
+    def test_invalid_type(self):
+        with self.assertRaises(ValueError):
+            gear_params.normalize({"gear_type": "square"})
+
+# This class contains unittest cases for the artifact cache
+class TestArtifactCache(unittest.TestCase):
+
+    # This function checks the hit and miss counts as artifacts appear
+    # Returns nothing
+    def test_lookup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ArtifactCache(directory, directory)
+            params = {"gear_type": "spur", "pitch_dia": 60, "num_teeth": 20, "hole_dia": 5, "height": 10}
+            ID, hit = cache.lookup(params)
+            self.assertFalse(hit)
+
+            for path in [cache.stl_path(ID)] + cache.preview_paths(ID):
+                open(path, "w").close()
+            self.assertEqual(cache.lookup(params), (ID, True))
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    # This function checks the triangle count and size read from binary and text .stl files
+    # Returns nothing
+    def test_stl_info(self):
+        path = os.path.join(REFERENCE, "Spur.stl")
+        triangles = len(mesh.Mesh.from_file(path).vectors)
+        self.assertEqual(stl_info(path), {"triangles": triangles, "size": os.path.getsize(path)})
+        with tempfile.TemporaryDirectory() as folder:
+            text = os.path.join(folder, "text.stl")
+            mesh.Mesh.from_file(path).save(text, mode=mesh.stl.Mode.ASCII)
+            self.assertEqual(stl_info(text)["triangles"], triangles)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# =============================================================================
+# File Name     : test_assembly.py
+# Description   : Unit Test of the assemblies written as .stl and .3mf
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import math
+import tempfile
+import unittest
+import zipfile
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+import assembly
+import native_gear
+
+# This class contains functions which test the placing and writing of assemblies
+class TestAssembly(unittest.TestCase):
+
+    # Gear Attributes of a small spur gear and the placements of two copies
+    dic = {"gear_type": "spur", "num_teeth": 10, "pitch_dia": 20, "hole_dia": 5, "height": 5,
+        "pressure_angle": 20, "clearance": 0.12}
+    placements = [(0.0, (0, 0, 0)), (math.pi / 2, (30, 0, 0))]
+
+    # This function gets the parts of the assembly
+    # Returns a list with one part placed twice
+    def parts(self):
+        return [{"name": "gear", "triangles": native_gear.involute_gear(**self.dic), "placements": self.placements}]
+
+    # This function checks that a part is turned counter clockwise about z and then moved
+    def test_place(self):
+        triangle = np.array([[[1.0, 0, 0], [0, 1, 0], [0, 0, 1]]])
+        np.testing.assert_allclose(assembly.place(triangle, math.pi / 2, (10, 0, 2)),
+            [[[10, 1, 2], [9, 0, 2], [10, 0, 3]]], atol=1e-12)
+
+    # This function checks that the .stl has every copy of the part at its place
+    def test_stl(self):
+        triangles = self.parts()[0]["triangles"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = assembly.export(self.parts(), "stl", os.path.join(directory, "pair.stl"))
+            written = assembly.read_part(path)
+        self.assertEqual(len(written), 2 * len(triangles))
+        np.testing.assert_allclose(written[len(triangles):], assembly.place(triangles, math.pi / 2, (30, 0, 0)),
+            atol=1e-4)
+
+    # This function checks that the .3mf has the part as one object and a build item for each placement
+    def test_3mf(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = assembly.export(self.parts(), "3mf", os.path.join(directory, "pair.3mf"))
+            with zipfile.ZipFile(path) as package:
+                self.assertIn("[Content_Types].xml", package.namelist())
+                self.assertIn("_rels/.rels", package.namelist())
+                model = ElementTree.fromstring(package.read("3D/3dmodel.model"))
+        namespace = {"m": assembly.MODEL_NAMESPACE}
+        self.assertEqual(len(model.findall("m:resources/m:object", namespace)), 1)
+        items = model.findall("m:build/m:item", namespace)
+        self.assertEqual(len(items), 2)
+        np.testing.assert_allclose([float(value) for value in items[1].get("transform").split()],
+            [0, 1, 0, -1, 0, 0, 0, 0, 1, 30, 0, 0], atol=1e-6)
+
+        # Every triangle of the mesh has three different vertices that exist
+        vertices = model.findall("m:resources/m:object/m:mesh/m:vertices/m:vertex", namespace)
+        for triangle in model.findall("m:resources/m:object/m:mesh/m:triangles/m:triangle", namespace):
+            indices = {int(triangle.get(key)) for key in ("v1", "v2", "v3")}
+            self.assertEqual(len(indices), 3)
+            self.assertLess(max(indices), len(vertices))
+
+    # This function checks that both files are published and an unknown format is rejected
+    def test_publish(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = assembly.publish(self.parts(), "pair", directory)
+            self.assertEqual(sorted(os.listdir(directory)), ["pair.3mf", "pair.stl"])
+            self.assertEqual(paths, [os.path.join(directory, "pair.stl"), os.path.join(directory, "pair.3mf")])
+        with self.assertRaises(ValueError):
+            assembly.export(self.parts(), "obj", "pair.obj")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# =============================================================================
+# File Name     : test_gear_calc.py
+# Description   : Unit Test of the gear quantities calculated for many gears at once
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import math
+import unittest
+import numpy as np
+import gear
+from gear_calc import calculate, from_table, COLUMNS
+
+SPUR = {"teeth_number": 20, "pressure_angle": 20, "pitch_diameter": 60, "clearance": 0.12,
+    "hole_diameter": 5, "gear_type": "Spur Gear"}
+
+# This class contains functions which test the batch calculation
+class TestGearCalc(unittest.TestCase):
+
+    # This function checks that every row gives the quantities of the gear classes, both those of
+    # get_quantities and those of the getters, which work them out one at a time
+    def test_matches_gear_classes(self):
+        teeth = np.array([20, 12, 45, 7])
+        pitch = np.array([60, 30, 90, 14])
+        result = calculate(teeth, pitch, 20, 0.12, teeth[::-1], pitch[::-1])
+        for i in range(len(teeth)):
+            my_gear = gear.InvoluteGear(**dict(SPUR, teeth_number=teeth[i], pitch_diameter=pitch[i]))
+            other_gear = gear.InvoluteGear(**dict(SPUR, teeth_number=teeth[-1 - i], pitch_diameter=pitch[-1 - i]))
+            expected = my_gear.get_quantities(other_gear)
+            for name in COLUMNS:
+                self.assertAlmostEqual(result[name][i], expected[name])
+            bevel = gear.BevelGear(**dict(SPUR, teeth_number=teeth[i], pitch_diameter=pitch[i]))
+            worm = gear.WormGear(**dict(SPUR, teeth_number=teeth[i], pitch_diameter=pitch[i]))
+            getters = {"module": my_gear.get_module(), "addendum": my_gear.get_addendum(),
+                "dedendum": my_gear.get_dedendum(), "tooth_depth": my_gear.get_tooth_depth(),
+                "tip_diameter": my_gear.get_tip_diameter(), "root_diameter": my_gear.get_root_diameter(),
+                "tip_clearance": my_gear.get_tip_clearance(), "centre_distance": my_gear.get_centre_distance(other_gear),
+                "lead_angle": worm.get_lead_angle(), "axial_pitch": worm.get_axial_pitch(),
+                "reference_cone_angle": bevel.get_my_reference_cone_angle(other_gear),
+                "mate_reference_cone_angle": bevel.get_other_reference_cone_angle(other_gear)}
+            for name in COLUMNS:
+                self.assertAlmostEqual(getters[name], expected[name])
+        self.assertAlmostEqual(result["tip_diameter"][0], 66)
+        self.assertAlmostEqual(result["root_diameter"][0], 53.25)
+        self.assertAlmostEqual(result["centre_distance"][0], 37)
+
+    # This function checks that rows which make no gear are masked and leave the others alone
+    def test_invalid_rows(self):
+        result = calculate([20, 0, -5, 20, 20, np.nan], [60, 60, 60, 60, 60, 60], [20, 20, 20, 95, 20, 20],
+            [0.1, 0.1, 0.1, 0.1, -1, 0.1])
+        self.assertEqual(result["valid"].tolist(), [True, False, False, False, False, False])
+        self.assertAlmostEqual(result["module"][0], 3)
+        self.assertTrue(np.isnan(result["module"][1:]).all())
+        self.assertEqual(gear.InvoluteGear(**dict(SPUR, teeth_number=0)).get_module(), 0)
+        self.assertEqual(gear.InvoluteGear(**dict(SPUR, pressure_angle=95, clearance=-1)).get_module(), 3)
+        self.assertEqual(gear.Gear_Utility.get_teeth_number(0, 60), 0)
+
+    # This function checks the reference cone angles of bevel gears on axes at 90 degrees
+    def test_bevel_cone_angles(self):
+        result = from_table({"teeth_number": [20, 15], "pitch_diameter": [60, 45],
+            "mate_teeth_number": [20, 45], "mate_pitch_diameter": [60, 135]})
+        self.assertAlmostEqual(result["reference_cone_angle"][0], math.pi / 4)
+        self.assertAlmostEqual(result["reference_cone_angle"][1], math.atan(15 / 45))
+        np.testing.assert_allclose(result["reference_cone_angle"] + result["mate_reference_cone_angle"],
+            math.pi / 2)
+
+    # This function checks that the cone angles of a bevel pair add up to the shaft angle
+    def test_bevel_axis_total(self):
+        bevel = dict(SPUR, gear_type="Bevel Gear")
+        my_gear = gear.BevelGear(**bevel)
+        other_gear = gear.BevelGear(**dict(bevel, teeth_number=45, pitch_diameter=135))
+        self.assertAlmostEqual(my_gear.get_axis_single_total(other_gear), math.pi / 2)
+        self.assertAlmostEqual(my_gear.get_addendum(other_gear), 60 + 6 * math.cos(math.atan(20 / 45)))
+
+if __name__ == '__main__':
+    unittest.main()
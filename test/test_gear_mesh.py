@@ -0,0 +1,50 @@
+# =============================================================================
+# File Name     : test_gear_mesh.py
+# Description   : Unit Test of the simulation of gear pairs in mesh
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import math
+import unittest
+import gear
+from gear_mesh import analyse, analyse_batch
+
+# This class contains functions which test the mesh simulation
+class TestGearMesh(unittest.TestCase):
+
+    # This function checks that a standard pair meshes without backlash, interference or transmission error
+    def test_standard_pair(self):
+        result = analyse(20, 40, 3)
+        self.assertFalse(result["tip_interference"])
+        self.assertAlmostEqual(result["min_backlash"], 0, delta=0.005)
+        self.assertLess(result["transmission_error"], 0.005)
+        self.assertAlmostEqual(result["contact_ratio"], result["theoretical_contact_ratio"], delta=0.1)
+        self.assertAlmostEqual(result["theoretical_contact_ratio"], 1.635, places=3)
+
+    # This function checks the backlash of a wider centre distance and of thinner teeth
+    def test_backlash(self):
+        result = analyse(20, 40, 3, centre_distance=90.5)
+        working = math.acos(90 * math.cos(math.radians(20)) / 90.5)
+        self.assertAlmostEqual(result["min_backlash"], 2 * 0.5 * math.sin(working) / math.cos(math.radians(20)),
+            delta=0.01)
+        self.assertLess(result["contact_ratio"], analyse(20, 40, 3)["contact_ratio"])
+        self.assertAlmostEqual(analyse(30, 30, 2, backlash=0.1)["min_backlash"], 0.2, delta=0.005)
+
+    # This function checks that a small pinion with a low pressure angle is found to interfere
+    def test_tip_interference(self):
+        result = analyse(10, 90, 1, pressure_angle=14.5)
+        self.assertTrue(result["tip_interference"])
+        self.assertLess(result["min_backlash"], 0)
+
+    # This function checks that the gear classes and the batch give the same results
+    def test_gear_classes(self):
+        spur = {"pressure_angle": 20, "clearance": 0.12, "hole_diameter": 5, "gear_type": "Spur Gear"}
+        my_gear = gear.InvoluteGear(teeth_number=20, pitch_diameter=60, **spur)
+        other_gear = gear.InvoluteGear(teeth_number=40, pitch_diameter=120, **spur)
+        self.assertEqual(my_gear.get_mesh_analysis(other_gear),
+            analyse_batch([{"teeth": 20, "mate_teeth": 40, "module": 3}])[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# =============================================================================
+# File Name     : test_gear_outline.py
+# Description   : Unit Test of the 2D gear outlines in SVG and DXF
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+import gear_outline
+
+# This class contains functions which test the outlines of the gears
+class TestGearOutline(unittest.TestCase):
+
+    # Gear Attributes of the form defaults
+    dic = {"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60, "hole_dia": 5, "height": 10,
+        "pressure_angle": 20, "clearance": 0.12, "ID": "outline_test"}
+
+    # This function checks the size of the outline and its bore
+    def test_outline(self):
+        points, bore = gear_outline.outline_xy(self.dic)
+        radius = np.hypot(points[:, 0], points[:, 1])
+        self.assertAlmostEqual(radius.max(), 33)
+        self.assertAlmostEqual(radius.min(), 30 - 3 * 1.12)
+        self.assertEqual(bore, 2.5)
+        self.assertEqual(gear_outline.outline_xy(dict(self.dic, gear_type="helix", angle_teeth=20))[0].shape,
+            points.shape)
+
+    # This function checks that the SVG is a document with the outline and the bore in mm
+    def test_svg(self):
+        root = ElementTree.fromstring(gear_outline.to_svg(self.dic))
+        self.assertEqual(root.get("width"), root.get("height"))
+        self.assertAlmostEqual(float(root.get("width")[:-2]), 66 * (1 + gear_outline.SVG_MARGIN), places=3)
+        path = root.find("{http://www.w3.org/2000/svg}path").get("d")
+        self.assertEqual(path.count("M"), 2)
+        self.assertEqual(path.count("A"), 2)
+        self.assertEqual(ElementTree.fromstring(gear_outline.to_svg(dict(self.dic, hole_dia=0)))
+            .find("{http://www.w3.org/2000/svg}path").get("d").count("M"), 1)
+
+    # This function checks the polyline and circle of the DXF
+    def test_dxf(self):
+        lines = gear_outline.to_dxf(self.dic).splitlines()
+        pairs = list(zip(lines[::2], lines[1::2]))
+        points = gear_outline.outline_xy(self.dic)[0]
+        self.assertEqual(pairs.count(("0", "VERTEX")), len(points))
+        self.assertEqual(pairs.count(("0", "CIRCLE")), 1)
+        self.assertEqual(pairs[pairs.index(("0", "CIRCLE")) + 5], ("40", "2.5000"))
+        self.assertEqual(pairs[-1], ("0", "EOF"))
+
+    # This function checks the errors of gears without an outline and of bores which cut the teeth
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            gear_outline.outline_xy(dict(self.dic, gear_type="worm"))
+        with self.assertRaises(ValueError):
+            gear_outline.to_dxf(dict(self.dic, hole_dia=54))
+        with self.assertRaises(ValueError):
+            gear_outline.export(self.dic, "pdf", "gear.pdf")
+
+    # This function checks that the outline is written to a file
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = gear_outline.export(self.dic, "dxf", os.path.join(directory, "gear.dxf"))
+            with open(path) as file:
+                self.assertEqual(file.read(), gear_outline.to_dxf(self.dic))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# =============================================================================
+# File Name     : test_gear_pair.py
+# Description   : Unit Test of the gear pairs assembled in mesh
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+import numpy as np
+from assembly import read_part
+import gear_pair
+import gear_profile
+from gear_params import gear_id
+import native_gear
+from Running import validate
+from test_planetary import radius_at
+
+# This class contains functions which test the gear pairs
+class TestGearPair(unittest.TestCase):
+
+    # This function checks the gears of a pair and that gears of one template are made one after the other
+    def test_pair_gears(self):
+        gear = {"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60, "hole_dia": 5, "height": 10,
+            "pressure_angle": 20, "clearance": 0.12, "backend": "native"}
+        gears = gear_pair.pair_gears(gear, 31)
+        self.assertEqual([spec["num_teeth"] for spec in gears], [20, 31])
+        self.assertAlmostEqual(gears[1]["pitch_dia"], 93)
+        self.assertNotEqual(gears[0]["ID"], gears[1]["ID"])
+        for spec in gears:
+            validate(spec)
+        self.assertAlmostEqual(gear_pair.centre_distance(gears), 76.5)
+        self.assertEqual(gear_pair.pair_id(gears), gear_pair.pair_id(gear_pair.pair_gears(gear, 31)))
+        self.assertTrue(gear_pair.concurrent(gears))
+        self.assertFalse(gear_pair.concurrent(gear_pair.pair_gears(dict(gear, backend="freecad"), 31)))
+        with self.assertRaises(ValueError):
+            gear_pair.pair_gears(dict(gear, gear_type="bevel"), 31)
+
+    # This function checks that the mating gear touches the gear without cutting into it, and that
+    # without the half tooth turn it would cut into it
+    def test_placements(self):
+        gears = gear_pair.pair_gears({"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60}, 31)
+        (gear_place,), ((turn, (x, y, z)),) = gear_pair.placements(gears)
+        gear_outline = gear_profile.outline(3, 20, 20, 0.12)
+        mate_r, mate_theta = gear_profile.outline(3, 31, 20, 0.12)
+        for extra, touches in ((0, True), (np.pi / 31, False)):
+            px = mate_r * np.cos(mate_theta + turn + extra) + x
+            py = mate_r * np.sin(mate_theta + turn + extra) + y
+            gap = np.hypot(px, py) - radius_at(*gear_outline, 0, np.arctan2(py, px))
+            self.assertEqual(0 <= gap.min() < 0.1, touches)
+
+    # This function checks that the mating gear of a helix or double helix gear is made with the other
+    # hand, the mirror image of the same gear with the hand of the gear, and that the mating gear of a
+    # spur gear is left as it is
+    def test_assembly(self):
+        for gear_type, angle in (("helix", 20), ("double_helix", 20), ("spur", 0)):
+            gears = gear_pair.pair_gears({"gear_type": gear_type, "num_teeth": 12, "pitch_dia": 12, "height": 5,
+                "angle_teeth": angle, "backend": "native"}, 15)
+            self.assertEqual(gears[1].get("reverse_pitch", False), bool(angle))
+            same_hand = dict(gears[1], reverse_pitch=False)
+            same_hand["ID"] = gear_id(same_hand)
+            self.assertEqual(same_hand["ID"] != gears[1]["ID"], bool(angle))
+            with tempfile.TemporaryDirectory() as directory:
+                for spec in gears + [same_hand]:
+                    native_gear.generate(spec, os.path.join(directory, f"{spec['ID']}.stl"))
+                parts = gear_pair.assembly(gears, directory)
+                mate = read_part(os.path.join(directory, f"{gears[1]['ID']}.stl"))
+                other = read_part(os.path.join(directory, f"{same_hand['ID']}.stl"))
+            self.assertEqual([part["name"] for part in parts], ["gear", "mate"])
+            self.assertEqual([len(part["placements"]) for part in parts], [1, 1])
+            np.testing.assert_array_equal(parts[1]["triangles"], mate)
+            flip = np.array([1, -1 if angle else 1, 1])
+            corners = lambda triangles: np.unique(np.round(triangles.reshape(-1, 3), 4), axis=0)
+            np.testing.assert_array_equal(corners(mate), corners(other * flip))
+
+if __name__ == '__main__':
+    unittest.main()
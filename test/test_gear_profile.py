@@ -0,0 +1,52 @@
+# =============================================================================
+# File Name     : test_gear_profile.py
+# Description   : Unit Test of the shared tooth profiles of involute gears
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import math
+import unittest
+import numpy as np
+import gear_profile
+
+# This class contains functions which test the tooth profiles and the cache of them
+class TestGearProfile(unittest.TestCase):
+
+    def setUp(self):
+        gear_profile.clear()
+
+    # This function checks that the outline is the tooth turned by one pitch for every tooth
+    def test_outline(self):
+        r, theta = gear_profile.tooth(2, 20, 20, 0.25)
+        outline_r, outline_theta = gear_profile.outline(2, 20, 20, 0.25)
+        self.assertEqual(outline_r.size, 20 * r.size)
+        np.testing.assert_allclose(outline_r[5 * r.size:6 * r.size], r)
+        np.testing.assert_allclose(outline_theta[5 * r.size:6 * r.size], theta + 5 * 2 * math.pi / 20)
+        self.assertTrue(np.all(np.diff(outline_theta) > 0))
+        self.assertAlmostEqual(r.max(), 22)
+        self.assertAlmostEqual(r.min(), 20 - 2 * 1.25)
+
+    # This function checks the involute flank on the pitch circle and the flank resolution
+    def test_tooth(self):
+        r, theta = gear_profile.tooth(1, 30, 20, 0.25, flank_points=200)
+        flank = (r > 14) & (theta > 0)
+        half = np.interp(15, r[flank][::-1], theta[flank][::-1])
+        self.assertAlmostEqual(half, math.pi / 60, places=4)
+        self.assertGreater(r.size, gear_profile.tooth(1, 30, 20, 0.25)[0].size)
+
+    # This function checks that the same design is computed once, whatever types its numbers have
+    def test_cache(self):
+        first = gear_profile.outline(1.5, 24, 20, 0.25)
+        self.assertIs(gear_profile.outline(1.5, 24.0, 20, 0.25)[0], first[0])
+        stats = gear_profile.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 2))
+        self.assertFalse(first[0].flags.writeable)
+        with self.assertRaises(ValueError):
+            first[1][0] = 0
+        gear_profile.outline(1.5, 25, 20, 0.25)
+        self.assertEqual(gear_profile.stats()["misses"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
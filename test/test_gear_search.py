@@ -0,0 +1,55 @@
+# =============================================================================
+# File Name     : test_gear_search.py
+# Description   : Unit Test of the search of mating gears
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import unittest
+from gear_search import search, min_teeth
+
+# This class contains functions which test the search of mating gears
+class TestGearSearch(unittest.TestCase):
+
+    # This function checks the undercut limits of the common pressure angles
+    def test_min_teeth(self):
+        self.assertEqual(min_teeth(20), 17)
+        self.assertEqual(min_teeth(14.5), 32)
+
+    # This function checks that a reachable ratio and centre distance are found exactly
+    def test_exact_pair(self):
+        best = search(ratio=2, centre_distance=60)[0]
+        self.assertEqual((best["ratio_error"], best["centre_error"]), (0, 0))
+        self.assertEqual(best["mate_teeth"], 2 * best["teeth"])
+        self.assertAlmostEqual(best["module"] * (best["teeth"] + best["mate_teeth"]) / 2, 60)
+
+    # This function checks that the pairs are ranked by ratio error, are not dominated by each other
+    # and keep to the constraints
+    def test_pareto_front(self):
+        options = search(ratio=3.14, centre_distance=100, pressure_angle=20, limit=20)
+        errors = [option["ratio_error"] for option in options]
+        self.assertEqual(errors, sorted(errors))
+        keys = [(o["ratio_error"], o["centre_error"], o["centre_distance"]) for o in options]
+        for a in keys:
+            for b in keys:
+                self.assertFalse(all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b)))
+        for option in options:
+            self.assertGreaterEqual(min(option["teeth"], option["mate_teeth"]), 17)
+            self.assertLessEqual(max(option["pitch_diameter"], option["mate_pitch_diameter"]), 500)
+
+    # This function checks the whole number of teeth of a mate for a gear already chosen
+    def test_fixed_gear(self):
+        nearest = search(ratio=61 / 60, teeth=20, modules=[3], allow_undercut=True, limit=1)
+        self.assertEqual(nearest[0]["mate_teeth"], 20)
+        self.assertEqual(nearest[0]["mate_pitch_diameter"], 60)
+
+    # This function checks that a search without a target is refused
+    def test_no_target(self):
+        with self.assertRaises(ValueError):
+            search()
+        with self.assertRaises(ValueError):
+            search(ratio=-1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# =============================================================================
+# File Name     : test_gear_strength.py
+# Description   : Unit Test of the bending and contact stress estimates
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import math
+import unittest
+import numpy as np
+from gear_strength import evaluate, sweep, lewis_factor, strong_enough, MATERIALS
+
+# This class contains functions which test the strength estimates
+class TestGearStrength(unittest.TestCase):
+
+    # This function checks the stresses of a steel pair against a hand calculation
+    def test_hand_calculation(self):
+        result = evaluate(20, 3, 30, 50, 1000, mate_teeth=40)
+        load = 2000 * 50 / 60
+        kv = (6.1 + math.pi * 60 * 1000 / 60000) / 6.1
+        self.assertAlmostEqual(float(result["bending_stress"]), kv * load / (30 * 3 * 0.322))
+        steel = MATERIALS["steel"]
+        cp = math.sqrt(1 / (math.pi * 2 * (1 - steel["poisson"] ** 2) / steel["elastic_modulus"]))
+        angle = math.radians(20)
+        curvature = 2 / (60 * math.sin(angle)) + 2 / (120 * math.sin(angle))
+        self.assertAlmostEqual(float(result["contact_stress"]), cp * math.sqrt(kv * load / (30 * math.cos(angle)) * curvature))
+        self.assertAlmostEqual(float(result["bending_safety"]), steel["bending"] / float(result["bending_stress"]))
+
+    # This function checks the form factors between and outside the table rows
+    def test_lewis_factor(self):
+        np.testing.assert_allclose(lewis_factor([20, 23, 400, 1000]), [0.322, 0.334, 0.480, 0.480])
+        self.assertTrue(np.isnan(lewis_factor(8)))
+
+    # This function checks that a sweep gives every combination in one call
+    def test_sweep(self):
+        result = sweep(np.arange(10, 101), [1, 2, 3], [5, 10, 20], torque=10, speed=500, material="pla")
+        self.assertEqual(result["bending_stress"].shape, (91, 3, 3))
+        self.assertFalse(result["valid"][:2].any())
+        self.assertTrue(result["valid"][2:].all())
+        stress = result["bending_stress"][2:]
+        self.assertTrue((np.diff(stress, axis=2) < 0).all())
+        self.assertTrue((np.diff(stress, axis=1) < 0).all())
+        passed = strong_enough(result, 1.5)
+        self.assertTrue(passed.any() and not passed.all())
+        self.assertFalse(passed[:2].any())
+
+    # This function checks that an unknown material is refused
+    def test_unknown_material(self):
+        with self.assertRaises(ValueError):
+            evaluate(20, 3, 30, 50, 1000, material="wood")
+
+if __name__ == '__main__':
+    unittest.main()
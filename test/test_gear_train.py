@@ -0,0 +1,78 @@
+# =============================================================================
+# File Name     : test_gear_train.py
+# Description   : Unit Test of the gear train planner
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import itertools
+import math
+import unittest
+import gear_train
+from gear_train import plan, stage_options, train_gears, train_id
+from Running import validate
+
+# This class contains functions which test the gear train planner
+class TestGearTrain(unittest.TestCase):
+
+    # This function checks that a ratio with an exact two stage train is found with the fewest stages
+    def test_exact_ratio(self):
+        best = plan(12.5, max_stages=4)[0]
+        self.assertLess(best["error"], 1e-12)
+        self.assertEqual(len(best["stages"]), 2)
+        self.assertAlmostEqual(math.prod(stage["ratio"] for stage in best["stages"]), 12.5)
+
+    # This function checks the best train against every train of up to two stages
+    def test_against_every_train(self):
+        teeth = range(17, 41)
+        pairs = [(a, b) for a in teeth for b in teeth if b > a]
+        ratio = 5.37
+        best = min(abs(b / a * d / c / ratio - 1) for (a, b), (c, d) in itertools.product(pairs, pairs))
+        found = plan(ratio, max_stages=2, teeth_range=(17, 40), tolerance=0)[0]
+        self.assertLess(found["error"], best + gear_train.RESOLUTION)
+
+    # This function checks that a train that speeds up has the large gears driving
+    def test_speed_up(self):
+        best = plan(0.3, max_stages=2)[0]
+        self.assertAlmostEqual(best["ratio"], 0.3)
+        for stage in best["stages"]:
+            self.assertGreater(stage["teeth"], stage["mate_teeth"])
+
+    # This function checks that the centre distance and envelope limits are kept
+    def test_limits(self):
+        for train in plan(40, max_stages=4, module=2, max_centre_distance=70, max_diameter=110, limit=10):
+            for stage in train["stages"]:
+                self.assertLessEqual(stage["centre_distance"], 70)
+                self.assertLessEqual((stage["mate_teeth"] + 2) * 2, 110)
+
+    # This function checks that the stages of the same constraints are worked out once
+    def test_memoized_stages(self):
+        stage_options((17, 60), 1.5, 20)
+        hits = gear_train._stage_options.cache_info().hits
+        plan(7, teeth_range=(17, 60), module=1.5)
+        self.assertEqual(gear_train._stage_options.cache_info().hits, hits + 1)
+
+    # This function checks that the gears of a train are valid and named by their parameters
+    def test_train_gears(self):
+        best = plan(6, max_stages=2, module=2)[0]
+        gears = train_gears(best, 2, height=10, hole_dia=5, pressure_angle=20, clearance=0.12,
+            angle_teeth=20, backend="native")
+        self.assertEqual(len(gears), 2 * len(best["stages"]))
+        for spec in gears:
+            validate(spec)
+            self.assertEqual(spec["gear_type"], "helix")
+            self.assertEqual(spec["pitch_dia"], 2 * spec["num_teeth"])
+        for driver, driven in zip(gears[::2], gears[1::2]):
+            self.assertEqual(driven["reverse_pitch"], not driver["reverse_pitch"])
+            self.assertNotEqual(driven["ID"], train_gears([{"teeth": driver["num_teeth"], "mate_teeth":
+                driven["num_teeth"]}], 2, height=10, hole_dia=5, pressure_angle=20, clearance=0.12,
+                angle_teeth=20, reverse_pitch=True, backend="native")[1]["ID"])
+        spur = train_gears(best, 2, height=10, hole_dia=5, pressure_angle=20, clearance=0.12, backend="native")
+        self.assertTrue(all("reverse_pitch" not in spec for spec in spur))
+        self.assertEqual(train_id(gears), train_id(list(gears)))
+        with self.assertRaises(ValueError):
+            plan(1)
+
+if __name__ == '__main__':
+    unittest.main()
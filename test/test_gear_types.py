@@ -0,0 +1,121 @@
+# =============================================================================
+# File Name     : test_gear_types.py
+# Description   : Unit Test of the FreeCAD templates kept open between jobs, with
+#                 the FreeCAD modules replaced by stubs
+# =============================================================================
+
+import importlib
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import types
+import unittest
+from unittest import mock
+
+# This class stands for a FreeCAD document whose objects hold the properties of the template
+class FakeDocument():
+
+    # Constructor of the document with the properties of each of its objects
+    # objects: Properties of every object by its name (type: dict of dict)
+    def __init__(self, objects):
+        self.objects = {name: types.SimpleNamespace(**props) for name, props in objects.items()}
+        self.recomputes = 0
+
+    # This function gets an object of the document by its name
+    def getObject(self, name):
+        return self.objects[name]
+
+    # This function counts the recomputes of the document
+    def recompute(self):
+        self.recomputes += 1
+
+# Properties of the involute gear template
+TEMPLATE = {"involutegear": {"height": "5 mm", "teeth": 15, "beta": "0 deg", "module": "1 mm", "clearance": 0.25,
+    "double_helix": False}, "Cylinder": {"Radius": "2 mm", "Height": "6 mm"}, "Cut": {}}
+
+# This function imports Gear_types with stubs of the FreeCAD modules, which are only in sys.modules
+# while it is imported
+# Returns the Gear_types module and the stub of FreeCAD
+def load_gear_types():
+    documents = {}
+    freecad = types.SimpleNamespace(setActiveDocument=lambda name: None, getDocument=documents.get)
+    freecad.openDocument = mock.Mock(side_effect=lambda file: documents.setdefault(
+        os.path.splitext(os.path.basename(file))[0], FakeDocument(TEMPLATE)))
+    stubs = {name: types.ModuleType(name) for name in ("Sketcher", "Mesh", "PartDesign", "Part")}
+    stubs["Mesh"].export = mock.Mock()
+    stubs["FreeCAD"] = freecad
+    with mock.patch.dict(sys.modules, stubs):
+        sys.modules.pop("Gear_types", None)
+        module = importlib.import_module("Gear_types")
+    return module, freecad
+
+# This class contains functions which test that the templates are opened once and reset between jobs
+class TestTemplateRegistry(unittest.TestCase):
+
+    # This function loads Gear_types with a new registry for every test
+    def setUp(self):
+        self.gear_types, self.freecad = load_gear_types()
+        self.templates = self.gear_types.Template_registry()
+        self.file = os.path.join("Part_files", "Involute_Gear.FCStd")
+
+    # This function runs one job on the template with the given property values
+    # values:   New values of the properties of the involute gear (type: dict)
+    # Returns the template document
+    def job(self, **values):
+        document = self.templates.open(self.file, "Involute_Gear")
+        for prop, value in values.items():
+            self.templates.set("Involute_Gear", "involutegear", prop, value)
+        self.templates.recompute("Involute_Gear")
+        return document
+
+    # This function checks that a template is opened once and reused by the next jobs
+    def test_open_once(self):
+        first = self.job(teeth=20)
+        second = self.job(teeth=30)
+        self.assertIs(first, second)
+        self.freecad.openDocument.assert_called_once_with(self.file)
+
+    # This function checks that the properties a job does not set are back to their template values,
+    # and that a job which changes nothing is not recomputed
+    def test_restore(self):
+        document = self.job(teeth=20, beta="15 deg")
+        gear = document.getObject("involutegear")
+        self.assertEqual((gear.teeth, gear.beta, document.recomputes), (20, "15 deg", 1))
+
+        self.job(teeth=20)
+        self.assertEqual((gear.teeth, gear.beta, document.recomputes), (20, "0 deg", 2))
+
+        self.job(teeth=20)
+        self.assertEqual(document.recomputes, 2)
+
+        self.job()
+        self.assertEqual((gear.teeth, gear.beta, document.recomputes), (15, "0 deg", 3))
+        self.assertEqual(gear.clearance, 0.25)
+
+    # This function checks that values set since the last job are dropped when a job is started
+    def test_open_resets_pending(self):
+        self.templates.open(self.file, "Involute_Gear")
+        self.templates.set("Involute_Gear", "involutegear", "beta", "30 deg")
+        document = self.job(teeth=20)
+        self.assertEqual(document.getObject("involutegear").beta, "0 deg")
+
+    # This function checks that on_recompute is told of every job
+    def test_on_recompute(self):
+        seen = []
+        self.templates.on_recompute = seen.append
+        self.job(teeth=20)
+        self.job(teeth=20)
+        self.assertEqual(seen, ["Involute_Gear", "Involute_Gear"])
+
+    # This function checks that a double helix gear leaves nothing behind for the spur gear made after it
+    def test_gears_between_jobs(self):
+        spur = {"height": 10, "num_teeth": 20, "pitch_dia": 40, "hole_dia": 5, "clearance": 0.12, "ID": "spur"}
+        self.gear_types.Gear_double_helix(**dict(spur, angle_teeth=20, reverse_pitch=True, ID="double_helix"))
+        gear = self.freecad.getDocument("Involute_Gear").getObject("involutegear")
+        self.assertEqual((gear.beta, gear.double_helix), ("-20 deg", True))
+        self.gear_types.Gear_involute(**spur)
+        self.assertEqual((gear.beta, gear.double_helix, gear.teeth, gear.module), ("0 deg", False, 20, "2.0 mm"))
+        self.freecad.openDocument.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# =============================================================================
+# File Name     : test_job_queue.py
+# Description   : Unit Test of the SQLite generation job queue and its runner
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+import tempfile
+import threading
+import unittest
+from job_queue import SPECULATIVE, JobQueue, JobRunner
+
+# This class contains unittest cases for the job queue
+class TestJobQueue(unittest.TestCase):
+
+    # This function creates an empty queue before each test
+    # Returns nothing
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.directory.name, "jobs.db"))
+
+    # This function removes the queue after each test
+    # Returns nothing
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # This function checks the status and position of queued jobs
+    # Returns nothing
+    def test_position(self):
+        first = self.queue.submit({"n": 1}, "id1")
+        second = self.queue.submit({"n": 2}, "id2")
+        self.assertEqual(self.queue.status(first)["position"], 1)
+        self.assertEqual(self.queue.status(second)["position"], 2)
+        self.assertEqual(self.queue.status(second)["ID"], "id2")
+        self.assertIsNone(self.queue.status("missing"))
+
+    # This function checks that jobs are claimed oldest first and finished
+    # Returns nothing
+    def test_claim_and_finish(self):
+        first = self.queue.submit({"n": 1})
+        second = self.queue.submit({"n": 2})
+        self.assertEqual(self.queue.claim(), (first, {"n": 1}))
+        self.assertEqual(self.queue.status(first)["status"], "running")
+        self.assertEqual(self.queue.status(second)["position"], 1)
+
+        self.queue.finish(first, "RuntimeError: boom")
+        self.assertEqual(self.queue.status(first)["status"], "failed")
+        self.assertEqual(self.queue.claim()[0], second)
+        self.queue.finish(second)
+        self.assertIsNone(self.queue.claim())
+        self.assertEqual(self.queue.counts(), {"queued": 0, "running": 0, "done": 1, "failed": 1, "cancelled": 0})
+
+    # This function checks that speculative jobs wait for submitted ones and only use the workers allowed
+    # Returns nothing
+    def test_priority(self):
+        speculative = self.queue.submit({"n": 1}, "id1", priority=SPECULATIVE)
+        submitted = self.queue.submit({"n": 2}, "id2")
+        self.assertEqual(self.queue.status(submitted)["position"], 1)
+        self.assertEqual(self.queue.status(speculative)["position"], 2)
+        self.assertTrue(self.queue.status(speculative)["speculative"])
+        self.assertEqual(self.queue.claim(speculative_limit=1)[0], submitted)
+        self.assertEqual(self.queue.claim(speculative_limit=1)[0], speculative)
+
+        second = self.queue.submit({"n": 3}, "id3", priority=SPECULATIVE)
+        self.assertIsNone(self.queue.claim(speculative_limit=1))
+        self.assertTrue(self.queue.promote(second))
+        self.assertEqual(self.queue.claim(speculative_limit=1)[0], second)
+        self.assertFalse(self.queue.status(second)["speculative"])
+
+    # This function checks that only jobs which have not started can be cancelled
+    # Returns nothing
+    def test_cancel(self):
+        first = self.queue.submit({}, priority=SPECULATIVE)
+        second = self.queue.submit({}, priority=SPECULATIVE)
+        self.queue.claim()
+        self.assertFalse(self.queue.cancel(first))
+        self.assertTrue(self.queue.cancel(second))
+        self.assertFalse(self.queue.promote(second))
+        self.assertIsNone(self.queue.claim())
+        self.assertEqual(self.queue.counts()["cancelled"], 1)
+
+    # This function checks that jobs of a stopped process are queued again, and that jobs whose runner
+    # still sends heartbeats are left running
+    # Returns nothing
+    def test_requeue_running(self):
+        job = self.queue.submit({})
+        self.queue.claim(owner="other")
+        self.assertEqual(self.queue.requeue_running(), 0)
+        self.assertEqual(self.queue.heartbeat("other"), 1)
+        self.assertEqual(self.queue.heartbeat("mine"), 0)
+        self.assertEqual(self.queue.requeue_running(stale_after=-1), 1)
+        self.assertEqual(self.queue.status(job)["status"], "queued")
+        self.queue.claim(owner="mine")
+        self.assertEqual(self.queue.requeue_running(owner="mine"), 1)
+
+    # This function checks that the runner runs every job and reports failures
+    # Returns nothing
+    def test_runner(self):
+        finished = []
+        all_done = threading.Event()
+
+        def handler(job_id, params):
+            if params.get("fail"):
+                raise ValueError("bad gear")
+
+        def on_finish(job_id, params, error):
+            finished.append((params["n"], error))
+            if len(finished) == 3:
+                all_done.set()
+
+        runner = JobRunner(self.queue, handler, workers=2, on_finish=on_finish, poll=0.05)
+        runner.start()
+        for n in range(3):
+            self.queue.submit({"n": n, "fail": n == 1})
+        runner.notify()
+        self.assertTrue(all_done.wait(10))
+        runner.stop()
+        self.assertEqual(sorted(finished), [(0, None), (1, "ValueError: bad gear"), (2, None)])
+
+    # This function checks that a job running longer than the stale time is not run again by the
+    # runner of another process, as long as its own runner sends heartbeats
+    # Returns nothing
+    def test_heartbeat(self):
+        runs = []
+        done = threading.Event()
+
+        def handler(job_id, params):
+            runs.append(job_id)
+            done.wait(10)
+
+        runners = [JobRunner(self.queue, handler, workers=1, poll=0.05, heartbeat=0.05, stale_after=0.3)
+            for _ in range(2)]
+        for runner in runners:
+            runner.start()
+        self.queue.submit({})
+        threading.Event().wait(1)
+        done.set()
+        for runner in runners:
+            runner.stop()
+        self.assertEqual(len(runs), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# =============================================================================
+# File Name     : test_main.py
+# Description   : Unit Test of the worker mode of Main.py, with Gear_types replaced
+#                 by a stub so FreeCAD is not needed
+# =============================================================================
+
+import importlib
+import io
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import types
+import unittest
+from unittest import mock
+from worker_pool import RESULT_PREFIX
+
+# This class contains functions which test the replies of a FreeCAD worker
+class TestServe(unittest.TestCase):
+
+    # This function runs Main.py in worker mode on the given stdin lines
+    # lines:    Lines sent to the worker (type: list of string)
+    # Returns the replies of the worker and the stub of Gear_types
+    def serve(self, lines):
+        gear_types = types.ModuleType("Gear_types")
+        gear_types.templates = types.SimpleNamespace(on_recompute=None)
+        gear_types.Gear_involute = mock.Mock()
+        stdout = io.StringIO()
+        with mock.patch.dict(sys.modules, {"Gear_types": gear_types}), \
+                mock.patch.dict(os.environ, {"GEAR_WORKER": "1"}), \
+                mock.patch("sys.stdin", io.StringIO("".join(line + "\n" for line in lines))), \
+                mock.patch("sys.stdout", stdout):
+            sys.modules.pop("Main", None)
+            importlib.import_module("Main")
+            sys.modules.pop("Main", None)
+        replies = [json.loads(line[len(RESULT_PREFIX):]) for line in stdout.getvalue().splitlines()]
+        return replies, gear_types
+
+    # This function checks that a line which is not a job is answered with an error and the worker
+    # goes on with the next lines
+    def test_bad_lines(self):
+        spur = {"gear_type": "spur", "ID": "idspur"}
+        replies, gear_types = self.serve(["{not json", "[1, 2]", json.dumps({"command": "ping"}),
+            json.dumps(spur), json.dumps({"command": "exit"}), json.dumps(spur)])
+        self.assertEqual([reply.get("status") for reply in replies], ["error", "error", "pong", "ok"])
+        self.assertIn("JSONDecodeError", replies[0]["error"])
+        self.assertIsNone(replies[0]["ID"])
+        self.assertEqual(replies[3]["ID"], "idspur")
+        gear_types.Gear_involute.assert_called_once_with(**spur)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# =============================================================================
+# File Name     : test_mesh_raster.py
+# Description   : Unit Test of the NumPy mesh renderer used for the gear previews
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+import unittest
+import numpy as np
+import mesh_raster
+from stl_to_gif import render_views
+
+REFERENCE = os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD", "Reference")
+
+# This function builds a square facing up
+# z:        Height of the square (type: float)
+# size:     Half size of the square (type: float)
+# Returns the two triangles as a NumPy array of shape (2, 3, 3)
+def square(z, size=1.0):
+    a, b, c, d = [-size, -size, z], [size, -size, z], [size, size, z], [-size, size, z]
+    return np.array([[a, b, c], [a, c, d]], dtype=float)
+
+# This class contains functions which test the rendered images
+class TestMeshRaster(unittest.TestCase):
+
+    # This function checks the size and type of an image and that the mesh covers its centre
+    def test_image(self):
+        image = mesh_raster.render(square(0), elevation=90, azimuth=0, width=64, height=48, line_color=None)
+        self.assertEqual(image.shape, (48, 64, 3))
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertTrue(np.all(image[0, 0] == 255))
+        self.assertTrue(np.all(image[24, 32] < 255))
+
+    # This function checks that the nearest face hides the one behind it from both sides
+    # The outline of the smaller square shows only where it is in front
+    def test_depth(self):
+        triangles = np.concatenate([square(0), square(1, 0.5)])
+        options = {"width": 64, "height": 48, "line_color": (1, 0, 0), "cull": False, "extent": 1.0}
+        for elevation, hidden in ((90, False), (-90, True)):
+            both = mesh_raster.render(triangles, elevation=elevation, azimuth=0, **options)
+            back = mesh_raster.render(square(0), elevation=elevation, azimuth=0, **options)
+            self.assertEqual(np.array_equal(both, back), hidden)
+
+    # This function checks that the faces turned away from the camera are left out
+    def test_cull(self):
+        image = mesh_raster.render(square(0), elevation=-90, azimuth=0, width=64, height=48, line_color=None)
+        self.assertTrue(np.all(image == 255))
+
+    # This function checks that edges are drawn on the mesh only
+    def test_edges(self):
+        plain = mesh_raster.render(square(0), elevation=90, azimuth=0, width=64, height=48, line_color=None)
+        lined = mesh_raster.render(square(0), elevation=90, azimuth=0, width=64, height=48, line_color=(1, 0, 0))
+        changed = np.any(plain != lined, axis=2)
+        self.assertTrue(changed.any())
+        self.assertFalse(np.any(changed & np.all(plain == 255, axis=2)))
+
+    # This function checks the preview views of a reference gear
+    def test_render_views(self):
+        views = render_views(os.path.join(REFERENCE, "Spur.stl"), [(90, 0, 1), (30, 0, 2)],
+            mesh_color="silver", line_color="red", line_width=0.1)
+        self.assertEqual([len(frames) for frames in views], [1, 2])
+        self.assertEqual(views[1][0].shape, (480, 640, 3))
+        self.assertFalse(np.array_equal(views[1][0], views[1][1]))
+
+if __name__ == '__main__':
+    unittest.main()
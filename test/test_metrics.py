@@ -0,0 +1,53 @@
+# =============================================================================
+# File Name     : test_metrics.py
+# Description   : Unit Test of the counts reported by the /metrics page
+# =============================================================================
+
+import importlib.util
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+from unittest import mock
+import gear_profile
+from gear_outline import to_svg
+
+# This class contains functions which test the /metrics page, the web application is loaded
+# without starting its server
+@unittest.skipUnless(importlib.util.find_spec("flask_socketio"), "Flask is not installed")
+class TestMetrics(unittest.TestCase):
+
+    # This function loads the web application with its databases in a scratch folder
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = tempfile.TemporaryDirectory()
+        environ = {"DATABASE_URL": "sqlite:///" + os.path.join(cls.folder.name, "app.db"),
+            "JOB_QUEUE_DATABASE": os.path.join(cls.folder.name, "jobs.db"), "GEAR_SCRATCH_DIR": cls.folder.name}
+        with mock.patch.dict(os.environ, environ), mock.patch("flask_socketio.SocketIO.run"):
+            from app import app, routes
+        cls.client = app.test_client()
+        cls.routes = routes
+
+    # This function stops the job workers and removes the scratch folder
+    @classmethod
+    def tearDownClass(cls):
+        cls.routes.runner.stop()
+        cls.folder.cleanup()
+
+    # This function checks that the profile counts are those of the cache the generators fill
+    def test_profiles(self):
+        gear_profile.clear()
+        spur = {"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60, "hole_dia": 5, "pressure_angle": 20,
+            "clearance": 0.12}
+        to_svg(spur)
+        to_svg(spur)
+        profiles = self.client.get("/metrics").get_json()["profiles"]
+        self.assertIs(self.routes.gear_profile, gear_profile)
+        self.assertEqual(profiles["misses"], gear_profile.stats()["misses"])
+        self.assertGreater(profiles["misses"], 0)
+        self.assertGreater(profiles["hits"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
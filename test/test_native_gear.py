@@ -0,0 +1,185 @@
+# =============================================================================
+# File Name     : test_native_gear.py
+# Description   : Unit Test of the native gear generator against the FreeCAD references
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+import numpy as np
+from stl import mesh
+import gear_profile
+import native_gear
+from Running import check_wheel_teeth
+
+REFERENCE = os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD", "Reference")
+
+# This function checks that every edge of a mesh is shared by exactly two triangles
+# triangles:    Triangles as a NumPy array of shape (triangles, 3, 3)
+# Returns True if the mesh is closed else False
+def is_closed(triangles):
+    points, faces = np.unique(np.round(triangles, 6).reshape(-1, 3), axis=0, return_inverse=True)
+    faces = faces.reshape(-1, 3)
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    return bool(np.all(np.unique(edges, axis=0, return_counts=True)[1] == 2))
+
+# This function computes the volume of a closed mesh
+# triangles:    Triangles as a NumPy array of shape (triangles, 3, 3)
+# Returns the volume as float
+def volume(triangles):
+    return float(np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6)
+
+# This class contains a function which tests the native gears against the FreeCAD reference files
+class TestNativeInvoluteGear(unittest.TestCase):
+
+    # Gear Attributes of the reference files
+    dic = {"num_teeth": 20, "pressure_angle": 20, "pitch_dia": 60, "clearance": 0.12,
+        "hole_dia": 5, "height": 10, "angle_teeth": 20, "ID": "native_test"}
+
+    # This function compares size and volume of a native gear and a FreeCAD reference gear
+    # gear_type:    Type of the gear (type: string)
+    # reference:    Name of the reference file (type: string)
+    # Returns nothing
+    def compare(self, gear_type, reference):
+        triangles = native_gear.involute_gear(**dict(self.dic, gear_type=gear_type))
+        expected = mesh.Mesh.from_file(os.path.join(REFERENCE, reference)).vectors.astype(float)
+
+        self.assertTrue(is_closed(triangles))
+        np.testing.assert_allclose(triangles.reshape(-1, 3).min(axis=0), expected.reshape(-1, 3).min(axis=0), atol=0.05)
+        np.testing.assert_allclose(triangles.reshape(-1, 3).max(axis=0), expected.reshape(-1, 3).max(axis=0), atol=0.05)
+        self.assertAlmostEqual(volume(triangles) / volume(expected), 1, delta=0.01)
+
+    # This function compares a native spur gear with the reference
+    # Returns nothing
+    def test_spur(self):
+        self.compare("spur", "Spur.stl")
+
+    # This function compares a native helix gear with the reference
+    # Returns nothing
+    def test_helix(self):
+        self.compare("helix", "Helix.stl")
+
+    # This function compares a native double helix gear with the reference
+    # Returns nothing
+    def test_double_helix(self):
+        self.compare("double_helix", "Double_Helix.stl")
+
+    # This function compares a native spiral bevel gear with the reference, the teeth of the reference
+    # start at another angle so the tip radius is compared instead of the bounds in x and y
+    # Returns nothing
+    def test_bevel(self):
+        dic = dict(self.dic, gear_type="bevel", pitch_angle=45, backlash=0)
+        triangles = native_gear.bevel_gear(**dic)
+        expected = mesh.Mesh.from_file(os.path.join(REFERENCE, "Bevel.stl")).vectors.astype(float)
+
+        self.assertTrue(is_closed(triangles))
+        for points in (triangles.reshape(-1, 3), expected.reshape(-1, 3)):
+            self.assertAlmostEqual(np.hypot(points[:, 0], points[:, 1]).max(), 34.57, delta=0.05)
+            self.assertAlmostEqual(points[:, 2].max() - points[:, 2].min(), 10, places=6)
+        self.assertAlmostEqual(volume(triangles) / volume(expected), 1, delta=0.01)
+        self.assertAlmostEqual(volume(native_gear.bevel_gear(**dict(dic, angle_teeth=0))) / volume(expected), 1,
+            delta=0.01)
+        with self.assertRaises(ValueError):
+            native_gear.bevel_gear(**dict(dic, height=30))
+
+    # This function compares a native worm with the reference, the teeth are the starts of the worm
+    # Returns nothing
+    def test_worm(self):
+        dic = dict(self.dic, gear_type="worm")
+        triangles = native_gear.worm_gear(**dic)
+        expected = mesh.Mesh.from_file(os.path.join(REFERENCE, "Worm.stl")).vectors.astype(float)
+
+        self.assertTrue(is_closed(triangles))
+        points = triangles.reshape(-1, 3)
+        radius = np.hypot(points[:, 0], points[:, 1])
+        self.assertAlmostEqual(radius.max(), 33)
+        self.assertAlmostEqual(radius[radius > 2.5 + 1e-6].min(), 30 - 3 * 1.12)
+        self.assertAlmostEqual(volume(triangles) / volume(expected), 1, delta=0.01)
+        self.assertAlmostEqual(volume(native_gear.worm_gear(**dict(dic, reverse_pitch=True))) / volume(triangles), 1,
+            delta=0.001)
+
+    # This function checks that the worm wheel is closed, follows the throat of the worm and is written
+    # next to the worm by generate
+    # Returns nothing
+    def test_worm_wheel(self):
+        dic = dict(self.dic, gear_type="worm", wheel_teeth=30)
+        points = native_gear.worm_wheel(**dic).reshape(-1, 3)
+        self.assertTrue(is_closed(native_gear.worm_wheel(**dic)))
+        radius = np.hypot(points[:, 0], points[:, 1])
+        middle = np.abs(points[:, 2] - points[:, 2].max() / 2) < 1e-6
+        self.assertAlmostEqual(radius[middle].max(), 45 + 3, delta=1e-6)
+        self.assertGreater(radius.max(), 48)
+        with self.assertRaises(ValueError):
+            native_gear.worm_wheel(**dict(dic, num_teeth=2, pitch_dia=10))
+        with self.assertRaises(ValueError):
+            check_wheel_teeth(**dict(dic, num_teeth=2))
+        check_wheel_teeth(**dict(dic, num_teeth=3))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = native_gear.generate(dic, os.path.join(directory, "worm.stl"))
+            self.assertTrue(os.path.isfile(os.path.join(directory, "worm_wheel.stl")))
+            native_gear.generate(dict(dic, wheel_teeth=0), os.path.join(directory, "plain.stl"))
+            self.assertEqual(sorted(os.listdir(directory)), ["plain.stl", "worm.stl", "worm_wheel.stl"])
+
+    # This function checks the size and volume of native racks against the area of their profile
+    # Returns nothing
+    def test_rack(self):
+        dic = dict(self.dic, gear_type="rack", thickness=5, head=0)
+        triangles = native_gear.rack_gear(**dic)
+        self.assertTrue(is_closed(triangles))
+        points = triangles.reshape(-1, 3)
+        np.testing.assert_allclose(points.min(axis=0)[1:], [-3 * 1.12 - 5, 0], atol=1e-9)
+        np.testing.assert_allclose(points.max(axis=0)[1:], [3, 10], atol=1e-9)
+
+        # Teeth are trapezoids on a body from the first to the last flank foot, along the height
+        half_root, half_tip = np.pi * 3 / 4 + np.array([3.36, -3]) * np.tan(np.radians(20))
+        area = 20 * (half_root + half_tip) * 6.36 + (19 * np.pi * 3 + 2 * half_root) * 5
+        self.assertAlmostEqual(volume(triangles), area * 10, places=6)
+
+        endings = native_gear.rack_gear(**dict(dic, add_endings=True))
+        bottom = endings.reshape(-1, 3)[endings.reshape(-1, 3)[:, 2] == 0]
+        np.testing.assert_allclose([bottom[:, 0].min(), bottom[:, 0].max()], [0, 20 * np.pi * 3], atol=1e-9)
+        self.assertAlmostEqual(volume(endings), volume(triangles) + (3 * np.pi - 2 * half_root) * 5 * 10)
+        for options in ({"double_helix": True}, {"head": 10}, {"pressure_angle": 0}):
+            self.assertTrue(is_closed(native_gear.rack_gear(**dict(dic, **options))))
+        with self.assertRaises(ValueError):
+            native_gear.rack_gear(**dict(dic, thickness=0))
+
+    # This function checks the radii of a native ring gear and that its spaces are the teeth of a spur gear
+    # Returns nothing
+    def test_ring(self):
+        dic = dict(self.dic, gear_type="ring", thickness=5, head=0, angle_teeth=0)
+        triangles = native_gear.ring_gear(**dic)
+        self.assertTrue(is_closed(triangles))
+        points = triangles.reshape(-1, 3)
+        radius = np.hypot(points[:, 0], points[:, 1])
+        self.assertAlmostEqual(radius.min(), 27)
+        self.assertAlmostEqual(radius.max(), 30 + 3 * 1.12 + 5)
+
+        # The rim minus the outline of a spur gear with the head and clearance swapped, along the height
+        r, theta = gear_profile.outline(3, 20, 20, 0, head=0.12)
+        rim = np.full(r.size, radius.max())
+        areas = [np.sum(a * np.roll(a, -1) * np.sin(np.roll(theta, -1) - theta)) / 2 for a in (rim, r)]
+        self.assertAlmostEqual(volume(triangles), (areas[0] - areas[1]) * 10, places=6)
+        self.assertTrue(is_closed(native_gear.ring_gear(**dict(dic, angle_teeth=20, double_helix=True))))
+        with self.assertRaises(ValueError):
+            native_gear.ring_gear(**dict(dic, num_teeth=2, pitch_dia=6, head=1))
+
+    # This function checks that the .stl written is a binary file that reads back the same
+    # Returns nothing
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = native_gear.generate(dict(self.dic, gear_type="spur"), os.path.join(directory, "gear.stl"))
+            gear = mesh.Mesh.from_file(path)
+            self.assertEqual(os.path.getsize(path), 84 + 50 * len(gear.vectors))
+
+    # This function checks that a bore larger than the root circle is rejected
+    # Returns nothing
+    def test_invalid_bore(self):
+        with self.assertRaises(ValueError):
+            native_gear.involute_gear(**dict(self.dic, gear_type="spur", hole_dia=54))
+
+if __name__ == '__main__':
+    unittest.main()
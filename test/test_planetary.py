@@ -0,0 +1,90 @@
+# =============================================================================
+# File Name     : test_planetary.py
+# Description   : Unit Test of the planetary gear set planner and assembly
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+import numpy as np
+import gear_profile
+import native_gear
+import planetary
+from Running import validate
+
+# This function gets the radius of a gear outline in some directions
+# r, theta:     Outline of the gear in polar coordinates (NumPy arrays)
+# turn:         Angle the gear is turned by (type: float)
+# angles:       Directions (NumPy array)
+# Returns the radii of the outline in the directions
+def radius_at(r, theta, turn, angles):
+    theta = (theta + turn) % (2 * np.pi)
+    order = np.argsort(theta)
+    return np.interp(angles % (2 * np.pi), theta[order], r[order], period=2 * np.pi)
+
+# This class contains functions which test the planetary sets
+class TestPlanetary(unittest.TestCase):
+
+    # This function checks that the sets found can be assembled and have the ratio
+    def test_plan(self):
+        sets = planetary.plan(5, planets=3, module=2)
+        self.assertEqual((sets[0]["sun"], sets[0]["planet"], sets[0]["ring"]), (18, 27, 72))
+        for found in planetary.plan(4.3, planets=4, limit=10):
+            planetary.check(found["sun"], found["planet"], found["ring"], 4)
+            self.assertAlmostEqual(found["ratio"], 1 + found["ring"] / found["sun"])
+            self.assertLessEqual(found["ring"], 100)
+        with self.assertRaises(ValueError):
+            planetary.plan(1.5)
+
+    # This function checks every assembly condition
+    def test_check(self):
+        planetary.check(18, 27, 72, 3)
+        for teeth in ((18, 27, 70, 3), (18, 27, 72, 4), (10, 40, 90, 10), (18, 27, 72, 1)):
+            with self.assertRaises(ValueError):
+                planetary.check(*teeth)
+
+    # This function checks that every planet touches the sun and the ring without cutting into them,
+    # and that a ring turned by half a tooth would cut into the planets
+    def test_placements(self):
+        sun, planet, ring, module = 18, 27, 72, 2
+        sun_place, planet_places, ring_place = planetary.placements(sun, planet, 3, module)
+        sun_outline = gear_profile.outline(module, sun, 20, 0.12)
+        planet_r, planet_theta = gear_profile.outline(module, planet, 20, 0.12)
+        ring_outline = gear_profile.outline(module, ring, 20, 0, head=0.12)
+        ring_turn = ring_place[0][0]
+        self.assertEqual(len(planet_places), 3)
+        for turn, (x, y, z) in planet_places:
+            px = planet_r * np.cos(planet_theta + turn) + x
+            py = planet_r * np.sin(planet_theta + turn) + y
+            radius, angle = np.hypot(px, py), np.arctan2(py, px)
+            sun_gap = radius - radius_at(*sun_outline, 0, angle)
+            ring_gap = radius_at(*ring_outline, ring_turn, angle) - radius
+            self.assertTrue(0 <= sun_gap.min() < 0.05)
+            self.assertTrue(0 <= ring_gap.min() < 0.05)
+            self.assertLess((radius_at(*ring_outline, ring_turn + np.pi / ring, angle) - radius).min(), -0.5)
+
+    # This function checks the gears of a set and that the assembly places the planet at every planet
+    def test_assembly(self):
+        stage = planetary.plan(4, planets=3, module=1)[0]
+        gears = planetary.planetary_gears(stage, 1, height=5, hole_dia=3, pressure_angle=20, clearance=0.12,
+            thickness=4, backend="native")
+        self.assertEqual([spec["gear_type"] for spec in gears], ["spur", "spur", "ring"])
+        self.assertEqual(gears[2]["num_teeth"], stage["sun"] + 2 * stage["planet"])
+        for spec in gears:
+            validate(spec)
+        self.assertEqual(planetary.planetary_id(gears, 3), planetary.planetary_id(list(gears), 3))
+        self.assertNotEqual(planetary.planetary_id(gears, 3), planetary.planetary_id(gears, 4))
+
+        with tempfile.TemporaryDirectory() as directory:
+            for spec in gears:
+                native_gear.generate(spec, os.path.join(directory, f"{spec['ID']}.stl"))
+            parts = planetary.assembly(gears, 3, directory)
+        self.assertEqual([part["name"] for part in parts], ["sun", "planet", "ring"])
+        self.assertEqual([len(part["placements"]) for part in parts], [1, 3, 1])
+        with self.assertRaises(ValueError):
+            planetary.planetary_gears(dict(stage, planets=5), 1)
+
+if __name__ == '__main__':
+    unittest.main()
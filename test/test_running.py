@@ -0,0 +1,81 @@
+# =============================================================================
+# File Name     : test_running.py
+# Description   : Unit Test of the input checks run before FreeCAD is started
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import unittest
+from unittest import mock
+import Running
+
+# This class contains unittest cases for the validation of single gears and batches
+class TestValidation(unittest.TestCase):
+
+    # Spur Gear Parameters
+    spur = {"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60, "hole_dia": 5, "height": 10,
+        "clearance": 0.12, "pressure_angle": 20}
+
+    # This function checks that a valid gear passes and invalid ones are rejected
+    # Returns nothing
+    def test_validate(self):
+        Running.validate(self.spur)
+        with self.assertRaises(ValueError):
+            Running.validate(dict(self.spur, hole_dia=55))
+        with self.assertRaises(ValueError):
+            Running.validate(dict(self.spur, gear_type="helix", angle_teeth=60))
+
+    # This function checks that a bevel gear is straight with a teeth angle of 0 or spiral from 5 to 45 degrees
+    # Returns nothing
+    def test_bevel_angle(self):
+        bevel = dict(self.spur, gear_type="bevel", pitch_angle=45)
+        for angle in (0, "0", 5, 45):
+            Running.validate(dict(bevel, angle_teeth=angle))
+        Running.validate(bevel)
+        for angle in (3, 50):
+            with self.assertRaises(ValueError):
+                Running.validate(dict(bevel, angle_teeth=angle))
+        with self.assertRaises(ValueError):
+            Running.validate(dict(self.spur, gear_type="helix", angle_teeth=0))
+
+    # This function checks that a batch is rejected as a whole before FreeCAD is started,
+    # with every invalid gear listed
+    # Returns nothing
+    def test_batch_validation(self):
+        batch = [dict(self.spur, num_teeth=1), self.spur, dict(self.spur, height=1)]
+        with self.assertRaises(ValueError) as error:
+            Running.main_batch(batch)
+        self.assertIn("Gear 0", str(error.exception))
+        self.assertIn("Gear 2", str(error.exception))
+        self.assertNotIn("Gear 1", str(error.exception))
+
+    # This function checks the progress stages reported while a gear is generated
+    # Returns nothing
+    def test_progress(self):
+        stages = []
+        with tempfile.TemporaryDirectory() as folder, mock.patch.dict(os.environ, {"GEAR_SCRATCH_DIR": folder}), \
+                mock.patch.object(Running, "PART_FILES", folder):
+            path = Running.main(dict(self.spur, backend="native", ID="progress"),
+                lambda stage, **info: stages.append((stage, info)))
+            self.assertEqual([stage for stage, info in stages], ["recompute_started", "stl_exported"])
+            self.assertEqual(stages[0][1], {"backend": "native"})
+            self.assertEqual(stages[1][1]["size"], os.path.getsize(path))
+            self.assertGreater(stages[1][1]["triangles"], 0)
+
+    # This function checks that the gears of a batch lost when FreeCAD stops are reported as errors
+    # Main.py can not import FreeCAD when run by Python, so it exits before making any gear
+    # Returns nothing
+    def test_batch_crash(self):
+        batch = [dict(self.spur, backend="native", ID="native"), dict(self.spur, backend="freecad", ID="freecad")]
+        with tempfile.TemporaryDirectory() as folder, mock.patch.dict(os.environ, {"GEAR_SCRATCH_DIR": folder}), \
+                mock.patch.object(Running, "PART_FILES", folder), \
+                mock.patch.object(Running, "find_freecad", return_value=sys.executable):
+            results = Running.main_batch(batch)
+        self.assertEqual([result["status"] for result in results], ["ok", "error"])
+        self.assertEqual(results[1]["ID"], "freecad")
+        self.assertIn("exited with code 1", results[1]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
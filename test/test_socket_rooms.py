@@ -0,0 +1,42 @@
+# =============================================================================
+# File Name     : test_socket_rooms.py
+# Description   : Unit Test of the job rooms used to send events to their submitter only
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+import unittest
+from socket_rooms import RoomTracker
+
+# This class contains functions which test the rooms and fan-out counts
+class TestRoomTracker(unittest.TestCase):
+
+    # This function checks that an event of a job only counts the sessions of its room
+    def test_fanout(self):
+        rooms = RoomTracker()
+        rooms.join("browser_1", "job_1")
+        rooms.join("browser_2", "job_2")
+        rooms.join("browser_3", "job_2")
+        self.assertEqual(rooms.fanout("job_1"), 1)
+        self.assertEqual(rooms.fanout("job_2"), 2)
+        self.assertEqual(rooms.fanout("job_3"), 0)
+        stats = rooms.stats()
+        self.assertEqual((stats["events"], stats["deliveries"], stats["largest_fanout"]), (3, 3, 2))
+        self.assertEqual(stats["average_fanout"], 1.0)
+
+    # This function checks that closed rooms and disconnected sessions are forgotten
+    def test_leave(self):
+        rooms = RoomTracker()
+        rooms.join("browser_1", "job_1")
+        rooms.join("browser_1", "job_2")
+        rooms.join("browser_2", "job_2")
+        rooms.close("job_1")
+        self.assertEqual(rooms.stats()["rooms"], 1)
+        rooms.leave_all("browser_1")
+        self.assertEqual(rooms.fanout("job_2"), 1)
+        rooms.leave_all("browser_2")
+        self.assertEqual((rooms.stats()["rooms"], rooms.stats()["sessions"]), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# =============================================================================
+# File Name     : test_speculation.py
+# Description   : Unit Test of the speculative jobs started while the form is edited
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+import unittest
+from speculation import Speculator
+
+# This class contains functions which test the budget and counts of the speculative jobs
+class TestSpeculator(unittest.TestCase):
+
+    # This function checks that a user gets no more jobs than the budget within the window
+    def test_budget(self):
+        speculator = Speculator(budget=2, window=60)
+        for n in range(2):
+            self.assertTrue(speculator.wanted("user", f"gear{n}", now=n))
+            speculator.started("user", f"job{n}", f"gear{n}", now=n)
+        self.assertFalse(speculator.wanted("user", "gear2", now=10))
+        self.assertTrue(speculator.wanted("other", "gear2", now=10))
+        self.assertTrue(speculator.wanted("user", "gear2", now=61))
+        self.assertFalse(speculator.wanted("other", "gear1", now=61))
+        self.assertEqual(speculator.stats()["over_budget"], 1)
+
+    # This function checks that a newer snapshot replaces the job of the previous one
+    def test_replace(self):
+        speculator = Speculator()
+        self.assertIsNone(speculator.started("user", "job1", "gear1"))
+        self.assertEqual(speculator.started("user", "job2", "gear2"), "job1")
+        speculator.cancelled("job1")
+        self.assertIsNone(speculator.adopt("gear1"))
+        self.assertEqual(speculator.adopt("gear2"), "job2")
+        self.assertIsNone(speculator.started("user", "job3", "gear3"))
+        self.assertEqual(speculator.stats()["cancelled"], 1)
+
+    # This function checks the wasted-work ratio of jobs used before and after they finished
+    def test_wasted_ratio(self):
+        speculator = Speculator()
+        for n in range(4):
+            speculator.started(f"user{n}", f"job{n}", f"gear{n}")
+        self.assertEqual(speculator.adopt("gear0"), "job0")
+        for n in range(4):
+            speculator.finished(f"job{n}")
+        speculator.finished("submitted_job")
+        self.assertEqual(speculator.adopt("gear1"), "job1")
+        stats = speculator.stats()
+        self.assertEqual((stats["finished"], stats["used"], stats["wasted"]), (4, 2, 2))
+        self.assertEqual(stats["wasted_ratio"], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
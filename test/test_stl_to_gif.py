@@ -0,0 +1,65 @@
+# =============================================================================
+# File Name     : test_stl_to_gif.py
+# Description   : Unit Test of the preview animations written from memory
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+import tempfile
+import threading
+import unittest
+import numpy as np
+from PIL import Image
+from stl_to_gif import load_mesh, render_views, stream_views
+
+REFERENCE = os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD", "Reference")
+STYLE = {"mesh_color": "silver", "line_color": "red", "line_width": 0.1}
+
+# This function reads the frame count and frame durations of an animation
+# path:     Path of the .gif or .webp (type: string)
+# Returns the number of frames and the list of durations in milliseconds
+def animation_info(path):
+    with Image.open(path) as image:
+        durations = []
+        for i in range(image.n_frames):
+            image.seek(i)
+            image.load()
+            durations.append(image.info.get("duration"))
+        return image.n_frames, durations
+
+# This class contains functions which test the animations and concurrent renders
+class TestStlToGif(unittest.TestCase):
+
+    # This function checks that every view is streamed into its own file and nothing else is written
+    def test_stream_views(self):
+        with tempfile.TemporaryDirectory() as folder:
+            outputs = [((30, 0, 3), os.path.join(folder, "turn.gif"), 0.25),
+                ((60, 0, 2), os.path.join(folder, "turn.webp"), 0.2)]
+            ready = []
+            stream_views(os.path.join(REFERENCE, "Spur.stl"), outputs,
+                on_view=lambda index, path: ready.append((index, os.path.exists(path))), **STYLE)
+            self.assertEqual(ready, [(0, True), (1, True)])
+            self.assertEqual(sorted(os.listdir(folder)), ["turn.gif", "turn.webp"])
+            self.assertEqual(animation_info(outputs[0][1]), (3, [250, 250, 250]))
+            self.assertEqual(animation_info(outputs[1][1]), (2, [200, 200]))
+
+    # This function checks that renders running side by side give the same frames as one by one
+    def test_concurrent_renders(self):
+        stl_mesh = load_mesh(os.path.join(REFERENCE, "Helix.stl"))
+        views = [(30, 0, 2)]
+        for renderer in ("raster", "matplotlib"):
+            expected = render_views(stl_mesh, views, renderer, **STYLE)
+            results = [None] * 4
+            def render(index):
+                results[index] = render_views(stl_mesh, views, renderer, **STYLE)
+            threads = [threading.Thread(target=render, args=(i,)) for i in range(len(results))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for result in results:
+                self.assertTrue(all(np.array_equal(a, b) for a, b in zip(result[0], expected[0])))
+
+if __name__ == '__main__':
+    unittest.main()
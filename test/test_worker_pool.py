@@ -0,0 +1,104 @@
+# =============================================================================
+# File Name     : test_worker_pool.py
+# Description   : Unit Test of the FreeCAD worker pool using a stand-in worker
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import tempfile
+import time
+import unittest
+from worker_pool import WorkerPool
+
+# Stand-in for Main.py in worker mode, it answers with the same protocol without FreeCAD
+FAKE_WORKER = r'''
+import json, os, sys
+for line in sys.stdin:
+    job = json.loads(line)
+    if job.get("command") == "ping":
+        if os.path.exists(os.environ.get("HANG_FILE", "")):
+            continue
+        print("GEARJOB " + json.dumps({"status": "pong"}), flush=True)
+        continue
+    if job.get("command") == "exit":
+        break
+    if job.get("crash"):
+        sys.exit(1)
+    print("FreeCAD noise on stdout", flush=True)
+    print("GEARJOB " + json.dumps({"event": "recompute_started", "ID": job.get("ID")}), flush=True)
+    print("GEARJOB " + json.dumps({"ID": job.get("ID"), "status": "ok", "pid": os.getpid()}), flush=True)
+'''
+
+# This class contains unittest cases for the worker pool
+class TestWorkerPool(unittest.TestCase):
+
+    # This function starts a pool of stand-in workers before each test
+    # Returns nothing
+    def setUp(self):
+        self.pool = WorkerPool([sys.executable, "-c", FAKE_WORKER], size=2, max_jobs=3, timeout=10)
+
+    # This function stops the pool after each test
+    # Returns nothing
+    def tearDown(self):
+        self.pool.close()
+
+    # This function checks that a job result is read past other output of the worker
+    # Returns nothing
+    def test_submit(self):
+        result = self.pool.submit({"ID": "id1", "gear_type": "spur"})
+        self.assertEqual(result["ID"], "id1")
+        self.assertEqual(result["status"], "ok")
+
+    # This function checks that progress events are passed on before the result is returned
+    # Returns nothing
+    def test_events(self):
+        events = []
+        result = self.pool.submit({"ID": "id1"}, on_event=events.append)
+        self.assertEqual(events, [{"event": "recompute_started", "ID": "id1"}])
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(self.pool.submit({"ID": "id2"})["ID"], "id2")
+
+    # This function checks that workers are reused and replaced after max_jobs jobs
+    # Returns nothing
+    def test_recycle(self):
+        pids = [self.pool.submit({"ID": f"id{i}"})["pid"] for i in range(12)]
+        self.assertLess(len(set(pids)), 12)
+        self.assertEqual(self.pool.recycled, 4)
+
+    # This function checks that a crashed worker is replaced by a fresh one
+    # Returns nothing
+    def test_crash(self):
+        with self.assertRaises(RuntimeError):
+            self.pool.submit({"ID": "id1", "crash": True})
+        self.assertEqual(self.pool.submit({"ID": "id2"})["status"], "ok")
+
+    # This function checks the health check of idle workers
+    # Returns nothing
+    def test_health_check(self):
+        self.assertEqual(self.pool.health_check(), 0)
+
+    # This function checks that the health checks replace an idle worker that stops answering pings,
+    # without any job being submitted
+    # Returns nothing
+    def test_periodic_health_check(self):
+        with tempfile.TemporaryDirectory() as folder:
+            hang = os.path.join(folder, "hang")
+            pool = WorkerPool([sys.executable, "-c", FAKE_WORKER], size=1, timeout=10,
+                env=dict(os.environ, HANG_FILE=hang))
+            try:
+                pool.start_health_checks(0.05, timeout=0.5)
+                time.sleep(0.3)
+                self.assertEqual(pool.replaced, 0)
+                open(hang, "w").close()
+                deadline = time.time() + 10
+                while pool.replaced == 0 and time.time() < deadline:
+                    time.sleep(0.05)
+                self.assertGreater(pool.replaced, 0)
+                os.remove(hang)
+                self.assertEqual(pool.submit({"ID": "id1"})["status"], "ok")
+            finally:
+                pool.close()
+
+if __name__ == '__main__':
+    unittest.main()
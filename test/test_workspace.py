@@ -0,0 +1,103 @@
+# =============================================================================
+# File Name     : test_workspace.py
+# Description   : Unit Test of the job scratch directories and the atomic publishing
+# =============================================================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "Backend_FreeCAD"))
+import errno
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from stl import mesh
+import workspace
+import Running
+from workspace import Workspace, publish, clean_stale
+
+# This class contains functions which test the scratch directories
+class TestWorkspace(unittest.TestCase):
+
+    # This function makes a scratch root for every test
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.folder.name, "scratch")
+        self.served = os.path.join(self.folder.name, "served")
+        os.makedirs(self.served)
+
+    # This function removes the scratch root
+    def tearDown(self):
+        self.folder.cleanup()
+
+    # This function checks that a workspace is removed when its job ends and keeps published files
+    def test_publish(self):
+        with Workspace(self.root) as job:
+            with open(job.file("gear.stl"), "w") as file:
+                file.write("new")
+            path = job.publish("gear.stl", self.served)
+        self.assertEqual(os.listdir(self.root), [])
+        with open(path) as file:
+            self.assertEqual(file.read(), "new")
+
+    # This function checks that a file from another file system is copied next to its
+    # destination before it is renamed over the old one
+    def test_publish_across_file_systems(self):
+        destination = os.path.join(self.served, "gear.stl")
+        with open(destination, "w") as file:
+            file.write("old")
+        source = os.path.join(self.folder.name, "gear.stl")
+        with open(source, "w") as file:
+            file.write("new")
+
+        rename = os.replace
+        calls = []
+        def replace(src, dst):
+            calls.append(src)
+            if len(calls) == 1:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            rename(src, dst)
+        with mock.patch.object(workspace.os, "replace", replace):
+            publish(source, destination)
+        self.assertEqual(os.path.dirname(calls[1]), self.served)
+        self.assertEqual(os.listdir(self.served), ["gear.stl"])
+        self.assertFalse(os.path.exists(source))
+        with open(destination) as file:
+            self.assertEqual(file.read(), "new")
+
+    # This function checks that only old scratch directories are removed
+    def test_clean_stale(self):
+        os.makedirs(self.root)
+        with Workspace(self.root) as job:
+            old = tempfile.mkdtemp(prefix=workspace.PREFIX, dir=self.root)
+            os.makedirs(os.path.join(self.root, "other"))
+            past = time.time() - 7200
+            os.utime(old, (past, past))
+            self.assertEqual(clean_stale(self.root, max_age=3600), 1)
+            self.assertEqual(sorted(os.listdir(self.root)), sorted([os.path.basename(job.path), "other"]))
+
+    # This function checks that jobs making the same gear side by side all publish a whole .stl
+    def test_concurrent_jobs(self):
+        spur = {"gear_type": "spur", "num_teeth": 20, "pitch_dia": 60, "hole_dia": 5, "height": 10,
+            "clearance": 0.12, "pressure_angle": 20, "backend": "native", "ID": "same_gear"}
+        errors = []
+        def run():
+            try:
+                Running.main(spur)
+            except Exception as e:
+                errors.append(e)
+        with mock.patch.dict(os.environ, {"GEAR_SCRATCH_DIR": self.root}), \
+                mock.patch.object(Running, "PART_FILES", self.served):
+            threads = [threading.Thread(target=run) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.served), ["same_gear.stl"])
+        self.assertEqual(os.listdir(self.root), [])
+        self.assertGreater(len(mesh.Mesh.from_file(os.path.join(self.served, "same_gear.stl")).vectors), 0)
+
+if __name__ == '__main__':
+    unittest.main()